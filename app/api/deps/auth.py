@@ -1,25 +1,64 @@
-# app/api/deps/auth.py - Enhanced with role-based authorization
+# app/api/deps/auth.py - Enhanced with role-based authorization (with a verified-token cache)
+import hashlib
+import time
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event, inspect, select
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.db import get_db
 from app.core.security import decode_token
 from app.models.user import User
 from uuid import UUID
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
-    """
-    Decode JWT and return user + claims.
-    Returns: {"user": User, "claims": dict}
-    """
-    token = credentials.credentials
+
+@dataclass(frozen=True)
+class VerifiedToken:
+    """A decoded, validated JWT; ``user`` is a detached snapshot once get_current_user has loaded it."""
+    user_id: UUID
+    claims: Dict[str, Any]
+    user: Optional[User] = None
+
+
+# Keyed on the SHA-256 of the raw token. Entries never outlive the token's
+# exp, and are dropped when the user row changes (deactivation, roles, ...).
+_token_cache = TTLCache(
+    ttl=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+    name="verified_tokens",
+)
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _cache_token(key: bytes, entry: VerifiedToken) -> None:
+    """Cache until the configured TTL or the token's expiry, whichever is sooner"""
+    if settings.AUTH_TOKEN_CACHE_TTL_SECONDS <= 0:
+        return
+    ttl = min(settings.AUTH_TOKEN_CACHE_TTL_SECONDS, float(entry.claims.get("exp", 0)) - time.time())
+    if ttl > 0:
+        _token_cache.set(key, entry, ttl=ttl)
+
+
+def invalidate_user_tokens(user_id) -> None:
+    """Drop cached tokens of a user (call on deactivation, role or other user changes)"""
+    user_id = str(user_id)
+    _token_cache.invalidate_where(lambda key, entry: str(entry.user_id) == user_id)
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    """Cache counters for health/metrics endpoints"""
+    return _token_cache.stats()
+
+
+def _verify_token(token: str) -> VerifiedToken:
     try:
         claims = decode_token(token)
     except Exception as e:
@@ -46,6 +85,48 @@ def get_current_user(
             detail="Invalid user ID format"
         )
     
+    return VerifiedToken(user_id=user_uuid, claims=claims)
+
+
+def get_token_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> Dict[str, Any]:
+    """
+    Decode JWT without touching the database (cached per token).
+    Returns: {"user_id": UUID, "claims": dict, "verified": VerifiedToken, "token_key": bytes}
+    """
+    key = _token_key(credentials.credentials)
+    entry = _token_cache.get(key)
+    if entry is None:
+        entry = _verify_token(credentials.credentials)
+        _cache_token(key, entry)
+    
+    return {
+        "user_id": entry.user_id,
+        "claims": entry.claims,
+        "verified": entry,
+        "token_key": key
+    }
+
+def get_current_user(
+    token: Dict[str, Any] = Depends(get_token_claims),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Decode JWT and return user + claims.
+    Returns: {"user": User, "claims": dict}
+    """
+    claims = token["claims"]
+    user_uuid = token["user_id"]
+    
+    entry = token["verified"]
+    if entry.user is not None:
+        # Attach a per-request copy of the cached (active) user without a SELECT
+        return {
+            "user": db.merge(entry.user, load=False),
+            "claims": claims
+        }
+    
     # Fetch user from database
     user = db.execute(
         select(User).where(User.id == user_uuid)
@@ -64,8 +145,13 @@ def get_current_user(
             detail="Account deactivated"
         )
     
+    # Cache a detached snapshot so it is not expired by this request's commits;
+    # the request keeps working with a merged copy
+    db.expunge(user)
+    _cache_token(token["token_key"], VerifiedToken(user_id=user_uuid, claims=claims, user=user))
+    
     return {
-        "user": user,
+        "user": db.merge(user, load=False),
         "claims": claims
     }
 
@@ -135,4 +221,38 @@ def require_accountant(ctx = Depends(get_current_user)):
     return ctx
 
 # Alias for backward compatibility
-verify_auth_and_get_context = get_current_user
\ No newline at end of file
+verify_auth_and_get_context = get_current_user
+
+
+# --- Invalidation hooks ------------------------------------------------------
+# Any flush that touches a user drops that user's cached tokens straight away,
+# and again once the transaction commits so that a concurrent request cannot
+# re-cache the pre-commit row (e.g. a just-deactivated account) for a full TTL.
+
+_PENDING_KEY = "token_cache_invalidate"
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session, flush_context) -> None:
+    user_ids = {
+        # Read the already-loaded state only; never trigger a refresh here
+        inspect(obj).dict.get("id")
+        for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, User)
+    }
+    user_ids.discard(None)
+    if user_ids:
+        for user_id in user_ids:
+            invalidate_user_tokens(user_id)
+        session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user_tokens(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
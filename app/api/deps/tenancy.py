@@ -1,53 +1,263 @@
+# app/api/deps/tenancy.py - Resolve the active school for a request (with per-process cache)
+import logging
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
+from uuid import UUID
+
 from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy import and_, event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
 
-from app.core.db import get_db, set_rls_context
-from app.api.deps.auth import get_current_user
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import get_async_db, get_db, set_rls_context, set_rls_context_async
+from app.api.deps.auth import get_token_claims
 from app.models.school import School, SchoolMember
+from app.models.user import User
 
-def require_school(
-    ctx: Dict[str, Any] = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    x_school_id: Optional[str] = Header(default=None, alias="X-School-ID"),
-) -> Dict[str, Any]:
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TenancyEntry:
+    """Resolved (user, school) pair. ``user`` is a detached, fully loaded snapshot."""
+    user: User
+    school_id: str
+    role: str
+
+
+@dataclass(frozen=True)
+class SchoolMembership:
+    """One of a user's schools, as listed for chat metadata"""
+    school_id: str
+    name: str
+    role: str
+
+
+# Keyed on (user_id, school_id); school_id is None when the school was
+# inferred from the user's only membership.
+_tenancy_cache = TTLCache(
+    ttl=settings.TENANCY_CACHE_TTL_SECONDS,
+    max_entries=settings.TENANCY_CACHE_MAX_ENTRIES,
+    name="tenancy",
+)
+
+# Keyed on user_id; a tuple of SchoolMembership ordered by school name.
+# Shares the tenancy TTL and is invalidated by the same hooks.
+_membership_cache = TTLCache(
+    ttl=settings.TENANCY_CACHE_TTL_SECONDS,
+    max_entries=settings.TENANCY_CACHE_MAX_ENTRIES,
+    name="memberships",
+)
+
+
+def invalidate_user_tenancy(user_id) -> None:
+    """Drop cached tenancy and memberships for a user (call on user or membership changes)"""
+    user_id = str(user_id)
+    _tenancy_cache.invalidate_where(lambda key, entry: key[0] == user_id)
+    _membership_cache.invalidate(user_id)
+
+
+def invalidate_school_tenancy(school_id) -> None:
+    """Drop cached tenancy for every member of a school"""
+    school_id = str(school_id)
+    _tenancy_cache.invalidate_where(lambda key, entry: entry.school_id == school_id)
+    _membership_cache.invalidate_where(
+        lambda key, memberships: any(m.school_id == school_id for m in memberships)
+    )
+
+
+def tenancy_cache_stats() -> Dict[str, Any]:
+    """Cache counters for health/metrics endpoints"""
+    return _tenancy_cache.stats()
+
+
+def membership_cache_stats() -> Dict[str, Any]:
+    """Cache counters for health/metrics endpoints"""
+    return _membership_cache.stats()
+
+
+async def get_user_schools(db: AsyncSession, user_id) -> Tuple[SchoolMembership, ...]:
+    """The user's schools (id, name, role) ordered by name, cached per user"""
+    cache_key = str(user_id)
+    memberships = _membership_cache.get(cache_key)
+    if memberships is None:
+        rows = (await db.execute(
+            select(School.id, School.name, SchoolMember.role)
+            .join(SchoolMember, School.id == SchoolMember.school_id)
+            .where(SchoolMember.user_id == user_id)
+            .order_by(School.name)
+        )).all()
+        memberships = tuple(SchoolMembership(str(school_id), name, role) for school_id, name, role in rows)
+        if settings.TENANCY_CACHE_TTL_SECONDS > 0:
+            _membership_cache.set(cache_key, memberships)
+    return memberships
+
+
+def _tenancy_query(user_id: UUID, school_id: Optional[UUID]):
     """
-    Resolve active school for the request and return context dict
+    One round-trip: the user plus either the requested membership or all of
+    the user's memberships. The FK from schoolmember to schools means a
+    membership row also proves the school exists.
     """
-    claims = ctx["claims"]
-    user = ctx["user"]
+    if school_id is not None:
+        member_join = and_(SchoolMember.user_id == User.id, SchoolMember.school_id == school_id)
+    else:
+        member_join = SchoolMember.user_id == User.id
+
+    return (
+        select(User, SchoolMember.school_id, SchoolMember.role)
+        .outerjoin(SchoolMember, member_join)
+        .where(User.id == user_id)
+    )
 
-    school_id = x_school_id or claims.get("active_school_id")
 
-    if not school_id:
-        memberships = (
-            db.query(SchoolMember.school_id)
-              .filter(SchoolMember.user_id == user.id)
-              .all()
-        )
+def _entry_from_rows(db, rows: List[Tuple], school_id: Optional[UUID]) -> TenancyEntry:
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    user = rows[0][0]
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Account deactivated")
+
+    memberships = [(row[1], row[2]) for row in rows if row[1] is not None]
+
+    if school_id is not None:
+        if not memberships:
+            raise HTTPException(status_code=403, detail="Not a member of this school")
+    else:
         if not memberships:
             raise HTTPException(status_code=404, detail="You are not a member of any school")
-        if len(memberships) == 1:
-            school_id = memberships[0][0]
-        else:
+        if len(memberships) > 1:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Multiple schools detected. Provide X-School-ID or call /auth/activate-school to set an active school."
             )
 
-    # membership + existence checks
-    is_member = (
-        db.query(SchoolMember)
-          .filter(SchoolMember.school_id == school_id, SchoolMember.user_id == user.id)
-          .first()
-    )
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Not a member of this school")
+    resolved_school_id, role = memberships[0]
+
+    # Detach a snapshot so it can be shared across requests without being
+    # expired by this request's commits.
+    db.expunge(user)
+    return TenancyEntry(user=user, school_id=str(resolved_school_id), role=role)
+
+
+def _requested_school(token: Dict[str, Any], x_school_id: Optional[str]) -> Optional[UUID]:
+    requested = x_school_id or token["claims"].get("active_school_id")
+    if not requested:
+        return None
+    try:
+        return UUID(str(requested))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid school ID format")
 
-    if not db.query(School.id).filter(School.id == school_id).first():
-        raise HTTPException(status_code=404, detail="School not found")
 
-    set_rls_context(db, user_id=user.id, school_id=school_id)
+def _cache_entry(cache_key: Tuple, entry: TenancyEntry) -> None:
+    if settings.TENANCY_CACHE_TTL_SECONDS > 0:
+        _tenancy_cache.set(cache_key, entry)
+
+
+def require_school(
+    token: Dict[str, Any] = Depends(get_token_claims),
+    db: Session = Depends(get_db),
+    x_school_id: Optional[str] = Header(default=None, alias="X-School-ID"),
+) -> Dict[str, Any]:
+    """
+    Resolve active school for the request and return context dict
+
+    For sync handlers using ``get_db``: FastAPI shares that Session with the
+    handler, so the RLS settings apply to the handler's own queries.
+    """
+    user_id = token["user_id"]
+    school_id = _requested_school(token, x_school_id)
+
+    cache_key = (str(user_id), str(school_id) if school_id else None)
+    entry = _tenancy_cache.get(cache_key)
+    if entry is None:
+        entry = _entry_from_rows(db, db.execute(_tenancy_query(user_id, school_id)).all(), school_id)
+        _cache_entry(cache_key, entry)
+
+    # Attach a per-request copy of the cached user without another SELECT
+    user = db.merge(entry.user, load=False)
+
+    set_rls_context(db, user_id=user_id, school_id=entry.school_id)
 
     # Return dict with both user and school_id for downstream endpoints
-    return {"user": user, "school_id": school_id}
\ No newline at end of file
+    return {"user": user, "school_id": entry.school_id, "claims": token["claims"], "role": entry.role}
+
+
+async def require_school_async(
+    token: Dict[str, Any] = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db),
+    x_school_id: Optional[str] = Header(default=None, alias="X-School-ID"),
+) -> Dict[str, Any]:
+    """
+    ``require_school`` for async handlers using ``get_async_db``.
+
+    Resolves tenancy and sets the RLS context on the handler's AsyncSession,
+    so the request holds one pooled connection and its queries run with the
+    tenant context.
+    """
+    user_id = token["user_id"]
+    school_id = _requested_school(token, x_school_id)
+
+    cache_key = (str(user_id), str(school_id) if school_id else None)
+    entry = _tenancy_cache.get(cache_key)
+    if entry is None:
+        rows = (await db.execute(_tenancy_query(user_id, school_id))).all()
+        entry = _entry_from_rows(db, rows, school_id)
+        _cache_entry(cache_key, entry)
+
+    user = await db.merge(entry.user, load=False)
+
+    await set_rls_context_async(db, user_id=user_id, school_id=entry.school_id)
+
+    return {"user": user, "school_id": entry.school_id, "claims": token["claims"], "role": entry.role}
+
+
+# --- Invalidation hooks ------------------------------------------------------
+# Any flush that touches users, memberships or schools drops the affected
+# entries straight away, and again once the transaction commits so that a
+# concurrent request cannot re-cache the pre-commit state for a full TTL.
+
+_PENDING_KEY = "tenancy_invalidate"
+
+
+def _invalidate(changes) -> None:
+    for kind, ident in changes:
+        if kind == "user":
+            invalidate_user_tenancy(ident)
+        else:
+            invalidate_school_tenancy(ident)
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session, flush_context) -> None:
+    changes = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        # Read the already-loaded state only; never trigger a refresh here
+        state = inspect(obj).dict
+        if isinstance(obj, User):
+            changes.add(("user", state.get("id")))
+        elif isinstance(obj, SchoolMember):
+            changes.add(("user", state.get("user_id")))
+        elif isinstance(obj, School):
+            changes.add(("school", state.get("id")))
+    changes.discard(("user", None))
+    changes.discard(("school", None))
+    if changes:
+        _invalidate(changes)
+        session.info.setdefault(_PENDING_KEY, set()).update(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        _invalidate(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -14,6 +14,8 @@ from app.models.academic import AcademicYear, AcademicTerm, EnrollmentStatusEven
 from app.models.enrollment import Enrollment
 from app.models.student import Student
 from app.models.class_model import Class
+from app.services.enrollment_promoter import PromotionError, promote_enrollments
+from app.services.school_overview import invalidate_school_overview
 from app.schemas.academic import (
     AcademicYearCreate, AcademicYearOut,
     AcademicTermCreate, AcademicTermOut,
@@ -758,10 +760,16 @@ async def deactivate_academic_year(
 async def promote_students_to_next_term(
     term_id: str,
     promotion_data: dict,  # {target_term_id: str, student_ids?: List[str], class_mappings?: dict}
+    dry_run: bool = Query(False, description="Return the per-student diff without writing"),
     ctx: Dict[str, Any] = Depends(require_school),
     db: Session = Depends(get_db)
 ):
-    """Promote students from current term to next term with optional class changes"""
+    """
+    Promote students from current term to next term with optional class changes.
+    
+    All target enrollments are written with one upsert; students already
+    enrolled in their target class are left untouched.
+    """
     user = ctx["user"]
     school_id = ctx["school_id"]
     
@@ -795,70 +803,36 @@ async def promote_students_to_next_term(
             detail="Source or target term not found"
         )
     
-    # Get students to promote (specific list or all enrolled)
-    student_ids = promotion_data.get("student_ids")
-    if student_ids:
-        # Promote specific students
-        enrollments_query = select(Enrollment).where(
-            Enrollment.term_id == current_term_uuid,
-            Enrollment.student_id.in_([UUID(sid) for sid in student_ids]),
-            Enrollment.status == "ENROLLED"
-        )
-    else:
-        # Promote all students from current term
-        enrollments_query = select(Enrollment).where(
-            Enrollment.term_id == current_term_uuid,
-            Enrollment.status == "ENROLLED"
-        )
-    
-    current_enrollments = db.execute(enrollments_query).scalars().all()
-    
-    if not current_enrollments:
+    # Students to promote (specific list or all enrolled) and class mappings (e.g., Grade 3 → Grade 4)
+    try:
+        student_ids = promotion_data.get("student_ids")
+        if student_ids is not None:
+            student_ids = [UUID(sid) for sid in student_ids]
+        class_mappings = {
+            UUID(source): UUID(target)
+            for source, target in (promotion_data.get("class_mappings") or {}).items()
+        }
+    except (ValueError, TypeError, AttributeError):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No eligible students found for promotion"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid student or class ID format"
         )
     
-    # Class mappings for promotion (e.g., Grade 3 → Grade 4)
-    class_mappings = promotion_data.get("class_mappings", {})
-    promoted_count = 0
-    
     try:
-        for enrollment in current_enrollments:
-            # Determine target class
-            current_class_id = str(enrollment.class_id)
-            target_class_id = class_mappings.get(current_class_id, current_class_id)
-            
-            # Check if student already enrolled in target term
-            existing_enrollment = db.execute(
-                select(Enrollment).where(
-                    Enrollment.student_id == enrollment.student_id,
-                    Enrollment.term_id == target_term_uuid
-                )
-            ).scalar_one_or_none()
-            
-            if existing_enrollment:
-                # Update existing enrollment
-                existing_enrollment.class_id = UUID(target_class_id)
-                existing_enrollment.status = "ENROLLED"
-                existing_enrollment.joined_on = date.today()
-            else:
-                # Create new enrollment
-                new_enrollment = Enrollment(
-                    school_id=UUID(school_id),
-                    student_id=enrollment.student_id,
-                    class_id=UUID(target_class_id),
-                    term_id=target_term_uuid,
-                    status="ENROLLED",
-                    joined_on=date.today()
-                )
-                db.add(new_enrollment)
-            
-            promoted_count += 1
-        
-        db.commit()
-        logger.info(f"{promoted_count} students promoted from {current_term.title} to {target_term.title} by {user.email}")
-        
+        result = promote_enrollments(
+            db,
+            school_id=UUID(school_id),
+            source_term_id=current_term_uuid,
+            target_term_id=target_term_uuid,
+            student_ids=student_ids,
+            class_mappings=class_mappings,
+            dry_run=dry_run,
+        )
+        if not dry_run:
+            db.commit()
+    except PromotionError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         db.rollback()
         logger.error(f"Error promoting students: {e}")
@@ -867,9 +841,36 @@ async def promote_students_to_next_term(
             detail="Error promoting students"
         )
     
+    if not (result.promoted or result.unchanged):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No eligible students found for promotion"
+        )
+    
+    summary = {
+        "created_count": result.created,
+        "updated_count": result.updated,
+        "unchanged_count": result.unchanged,
+    }
+    if dry_run:
+        db.rollback()
+        return {
+            "message": f"Dry run: {result.promoted} students would be promoted from {current_term.title} to {target_term.title}",
+            "promoted_count": result.promoted,
+            **summary,
+            "dry_run": True,
+            "changes": [change.as_dict() for change in result.changes],
+        }
+    
+    # The upsert is a Core statement, so the ORM flush hooks never saw it
+    invalidate_school_overview(school_id)
+    logger.info(f"{result.promoted} students promoted from {current_term.title} to {target_term.title} by {user.email}")
+    
     return {
-        "message": f"Successfully promoted {promoted_count} students from {current_term.title} to {target_term.title}",
-        "promoted_count": promoted_count
+        "message": f"Successfully promoted {result.promoted} students from {current_term.title} to {target_term.title}",
+        "promoted_count": result.promoted,
+        **summary,
+        "dry_run": False,
     }
 
 
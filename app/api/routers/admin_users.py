@@ -7,7 +7,7 @@ from datetime import datetime, timedelta
 import logging
 
 from app.core.db import get_db
-from app.core.security import password_manager
+from app.core.security import password_manager, password_hasher
 from app.api.deps.tenancy import require_school
 from app.models.user import User, UserRole
 from app.models.school import SchoolMember
@@ -364,7 +364,7 @@ async def create_user(
             )
     
     # Create user
-    hashed_password = password_manager.hash_password(user_data.password)
+    hashed_password = await password_hasher.hash_password(user_data.password)
     new_user = User(
         email=user_data.email.lower(),
         full_name=user_data.full_name,
@@ -10,6 +10,7 @@ from app.core.db import get_db
 from app.core.security import (
     token_manager,  # Use the new token_manager instance
     password_manager,  # Use the new password_manager instance
+    password_hasher,  # bcrypt work runs here, off the event loop
     reset_token_manager,  # Use the new reset_token_manager instance
 )
 from app.api.deps.auth import get_current_user
@@ -59,8 +60,8 @@ async def register(
             detail="User with this email already exists"
         )
     
-    # Create new user with new password_manager
-    hashed_password = password_manager.hash_password(user_data.password)
+    # Create new user (password hashed on the hashing pool)
+    hashed_password = await password_hasher.hash_password(user_data.password)
     new_user = User(
         email=user_data.email.lower(),
         full_name=user_data.full_name,
@@ -115,8 +116,15 @@ async def login(
         select(User).where(User.email == credentials.email.lower())
     ).scalar_one_or_none()
     
-    # Use new password_manager for verification
-    if not user or not password_manager.verify_password(credentials.password, user.password_hash):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
+    # Verified on the hashing pool; a hash made with an outdated cost is upgraded
+    valid, new_hash = await password_hasher.verify_and_update(credentials.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -128,8 +136,10 @@ async def login(
             detail="Account is deactivated"
         )
     
-    # Update last login
+    # Update last login (and the rehashed password, saved in the same commit)
     user.last_login = datetime.utcnow()
+    if new_hash:
+        user.password_hash = new_hash
     
     # Get user's school memberships for token
     memberships = db.execute(
@@ -367,8 +377,8 @@ async def reset_password(
     
     client_ip = getattr(request, "client", {}).get("host", "unknown")
     
-    # Update password using new password_manager
-    user.password_hash = password_manager.hash_password(reset_data.password)
+    # Update password (hashed on the hashing pool)
+    user.password_hash = await password_hasher.hash_password(reset_data.password)
     reset_token.mark_used(ip_address=client_ip)
     
     try:
@@ -1,19 +1,25 @@
 # app/api/routers/chat.py - Updated to use Rasa with proper authentication
-from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
-from typing import Dict, Any, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, tuple_
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from uuid import UUID
+import asyncio
+import json
 import logging
 import time
 import os
 import httpx
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from app.core.db import get_db
+from app.core.db import get_async_db
 from app.core.config import settings
-from app.api.deps.tenancy import require_school
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, count_rows
+from app.api.deps.tenancy import require_school_async, get_user_schools
+from app.services.rasa_client import rasa_client
+from app.services.chat_writer import chat_writer, context_snapshot
 from app.models.chat import ChatConversation, ChatMessage, MessageType
 from app.schemas.chat import (
     ChatMessage as ChatMessageSchema,
@@ -32,10 +38,55 @@ from app.schemas.chat import (
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Shown to the user when a turn cannot be answered
+FALLBACK_REPLY = "I'm sorry, I'm having trouble processing your message right now. Please try again."
+
+# Saves of streamed turns whose client disconnected mid-stream (kept referenced until done)
+_pending_stream_saves: set = set()
+
 # Rasa configuration
 RASA_SERVER_URL = os.getenv("RASA_SERVER_URL", "https://schoolrasaai.olaji.co/rasa")
 API_BASE_URL = os.getenv("API_BASE_URL", "https://schoolrasaai.olaji.co")
 
+def decode_keyset_cursor(cursor: str):
+    """(timestamp, id) from a chat history cursor; 400 if it is malformed"""
+    timestamp, last_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(timestamp), UUID(last_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def reply_timestamp(message_timestamp: datetime) -> datetime:
+    """
+    created_at for the assistant row of a turn: strictly after the user's
+    message, so (created_at, id) ordering never puts a reply before its question
+    """
+    return max(datetime.now(timezone.utc), message_timestamp + timedelta(microseconds=1))
+
+def paginate_messages(conversation_id: UUID, cursor: Optional[str], limit: int):
+    """
+    Newest ``limit`` messages older than ``cursor`` plus one look-ahead row,
+    ordered (created_at, id) descending so the page is an index range scan
+    """
+    query = select(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+    if cursor:
+        query = query.where(
+            tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(*decode_keyset_cursor(cursor))
+        )
+    return query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit + 1)
+
+def message_page(response: Response, messages, limit: int) -> Tuple[List[MessageResponse], bool]:
+    """
+    Trim the look-ahead row, set the cursor for the next (older) page and
+    return the page in chronological order, with whether older messages exist
+    """
+    has_older = len(messages) > limit
+    if has_older:
+        messages = messages[:limit]
+        oldest = messages[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor((oldest.created_at, oldest.id))
+    return [MessageResponse.from_attributes(msg) for msg in reversed(messages)], has_older
+
 def extract_auth_token(request: Request) -> Optional[str]:
     """Extract JWT token from Authorization header"""
     authorization = request.headers.get("Authorization")
@@ -60,36 +111,35 @@ async def send_message_to_rasa(
         Dict containing Rasa's response
     """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            payload = {
-                "sender": sender_id,
-                "message": message
+        payload = {
+            "sender": sender_id,
+            "message": message
+        }
+        
+        if metadata:
+            payload["metadata"] = metadata
+        
+        logger.info(f"Sending to Rasa: sender={sender_id}, metadata keys={list(metadata.keys()) if metadata else []}")
+        
+        response = await rasa_client.post(
+            f"{RASA_SERVER_URL}/webhooks/rest/webhook",
+            json=payload
+        )
+        
+        if response.status_code == 200:
+            rasa_responses = response.json()
+            logger.info(f"Rasa responded with {len(rasa_responses)} messages")
+            return {
+                "success": True,
+                "responses": rasa_responses
+            }
+        else:
+            logger.error(f"Rasa returned status code {response.status_code}: {response.text}")
+            return {
+                "success": False,
+                "error": f"Rasa server error: {response.status_code}"
             }
             
-            if metadata:
-                payload["metadata"] = metadata
-            
-            logger.info(f"Sending to Rasa: sender={sender_id}, metadata keys={list(metadata.keys()) if metadata else []}")
-            
-            response = await client.post(
-                f"{RASA_SERVER_URL}/webhooks/rest/webhook",
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                rasa_responses = response.json()
-                logger.info(f"Rasa responded with {len(rasa_responses)} messages")
-                return {
-                    "success": True,
-                    "responses": rasa_responses
-                }
-            else:
-                logger.error(f"Rasa returned status code {response.status_code}: {response.text}")
-                return {
-                    "success": False,
-                    "error": f"Rasa server error: {response.status_code}"
-                }
-                
     except httpx.TimeoutException:
         logger.error("Rasa request timed out")
         return {
@@ -103,15 +153,146 @@ async def send_message_to_rasa(
             "error": str(e)
         }
 
+async def stream_messages_from_rasa(
+    message: str,
+    sender_id: str,
+    metadata: Dict[str, Any] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Send a message to Rasa and yield each bot message as soon as Rasa emits it.
+    
+    Uses the REST channel's ``stream=true`` mode, which writes one JSON
+    object per line while the turn (and its custom actions) is still running.
+    A Rasa that ignores the flag still works; its messages arrive together.
+    """
+    payload = {
+        "sender": sender_id,
+        "message": message
+    }
+    
+    if metadata:
+        payload["metadata"] = metadata
+    
+    logger.info(f"Streaming to Rasa: sender={sender_id}")
+    
+    async for line in rasa_client.stream_lines(
+        "POST",
+        f"{RASA_SERVER_URL}/webhooks/rest/webhook",
+        params={"stream": "true"},
+        json=payload
+    ):
+        try:
+            parsed = json.loads(line)
+        except ValueError:
+            logger.warning(f"Ignoring malformed line from Rasa stream: {line[:200]}")
+            continue
+        
+        # Channels without stream support answer with the usual JSON list
+        for bot_message in parsed if isinstance(parsed, list) else [parsed]:
+            yield bot_message
+
+def combine_rasa_responses(rasa_responses: List[Dict[str, Any]]) -> Tuple[str, List[Any], Dict[str, Any]]:
+    """Join Rasa bot messages into (response text, buttons, custom data)"""
+    response_texts = []
+    buttons = []
+    custom_data = {}
+    
+    for rasa_response in rasa_responses:
+        if "text" in rasa_response:
+            response_texts.append(rasa_response["text"])
+        if "buttons" in rasa_response:
+            buttons.extend(rasa_response["buttons"])
+        if "custom" in rasa_response:
+            custom_data.update(rasa_response["custom"])
+    
+    formatted_response = "\n\n".join(response_texts) if response_texts else "I received your message."
+    return formatted_response, buttons, custom_data
+
+async def get_user_conversation(
+    db: AsyncSession,
+    conversation_id: str,
+    user,
+    school_id: str
+) -> ChatConversation:
+    """The user's conversation in this school; 400 for a malformed id, 404 if not found"""
+    try:
+        conv_uuid = UUID(conversation_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid conversation ID format"
+        )
+    
+    conversation = (await db.execute(
+        select(ChatConversation).where(
+            ChatConversation.id == conv_uuid,
+            ChatConversation.user_id == user.id,
+            ChatConversation.school_id == UUID(school_id)
+        )
+    )).scalar_one_or_none()
+    
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    return conversation
+
+async def build_rasa_metadata(
+    db: AsyncSession,
+    user,
+    school_id: str,
+    auth_token: str,
+    conversation_id: str,
+    context: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Context metadata sent to Rasa with every message"""
+    # Cached per user (invalidated on membership/school changes); require_school_async
+    # already proved the membership, so the current school is in the list
+    current = next(
+        (m for m in await get_user_schools(db, user.id) if m.school_id == str(school_id)),
+        None
+    )
+    
+    # Build context metadata for Rasa
+    # CRITICAL: Include JWT token and API URL so Rasa can make authenticated calls
+    rasa_metadata = {
+        # Authentication - use consistent key names
+        "auth_token": auth_token,  # Changed from jwt_token
+        "authorization": f"Bearer {auth_token}",
+        "api_base_url": API_BASE_URL,
+        
+        # User context
+        "user_id": str(user.id),
+        "user_email": user.email,
+        "user_full_name": user.full_name,
+        "user_roles": getattr(user, 'roles', []),
+        
+        # School context: only the active school, not every membership
+        "school_id": school_id,
+        "school_name": current.name if current else None,
+        "school_role": current.role if current else None,
+        
+        # Conversation context
+        "conversation_id": conversation_id,
+        "context": context or {}
+    }
+    
+    logger.info(f"Metadata prepared for Rasa: user={user.email}, school={school_id}")
+    return rasa_metadata
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 async def check_rasa_health() -> Dict[str, Any]:
     """Check if Rasa server is healthy"""
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{RASA_SERVER_URL}/")
-            return {
-                "healthy": response.status_code == 200,
-                "status_code": response.status_code
-            }
+        response = await rasa_client.get(f"{RASA_SERVER_URL}/", timeout=5.0, retries=0)
+        return {
+            "healthy": response.status_code == 200,
+            "status_code": response.status_code
+        }
     except Exception as e:
         logger.error(f"Rasa health check failed: {e}")
         return {
@@ -122,8 +303,8 @@ async def check_rasa_health() -> Dict[str, Any]:
 @router.post("/conversations", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
 async def create_conversation(
     conversation_data: ConversationCreate,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new chat conversation"""
     user = ctx["user"]
@@ -144,11 +325,11 @@ async def create_conversation(
     db.add(new_conversation)
     
     try:
-        db.commit()
-        db.refresh(new_conversation)
+        await db.commit()
+        await db.refresh(new_conversation)
         logger.info(f"New conversation created: {new_conversation.id} by {user.email}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating conversation: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -159,13 +340,15 @@ async def create_conversation(
 
 @router.get("/conversations", response_model=ConversationList)
 async def get_conversations(
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db),
-    page: int = Query(1, ge=1),
+    response: Response,
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db),
+    page: int = Query(1, ge=1, description="Offset page; ignored when cursor is given"),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
     archived: Optional[bool] = Query(None)
 ):
-    """Get user's chat conversations"""
+    """Get user's chat conversations, most recently active first"""
     user = ctx["user"]
     school_id = ctx["school_id"]
     
@@ -180,26 +363,27 @@ async def get_conversations(
     if archived is not None:
         query = query.where(ChatConversation.is_archived == archived)
     
-    query = query.order_by(desc(ChatConversation.last_activity))
+    total = await count_rows(db, query)
     
-    # Get total count
-    total_query = query.with_only_columns(ChatConversation.id)
-    total = len(db.execute(total_query).scalars().all())
-    
-    # Apply pagination
-    offset = (page - 1) * limit
-    conversations = db.execute(
-        query.offset(offset).limit(limit)
-    ).scalars().all()
+    if cursor:
+        query = query.where(
+            tuple_(ChatConversation.last_activity, ChatConversation.id) < tuple_(*decode_keyset_cursor(cursor))
+        )
+    elif page > 1:
+        query = query.offset((page - 1) * limit)
     
-    conversation_list = [
-        ConversationResponse.from_attributes(conv) for conv in conversations
-    ]
+    conversations = (await db.execute(
+        query.order_by(ChatConversation.last_activity.desc(), ChatConversation.id.desc()).limit(limit + 1)
+    )).scalars().all()
     
-    has_next = total > page * limit
+    has_next = len(conversations) > limit
+    if has_next:
+        conversations = conversations[:limit]
+        last = conversations[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor((last.last_activity, last.id))
     
     return ConversationList(
-        conversations=conversation_list,
+        conversations=[ConversationResponse.from_attributes(conv) for conv in conversations],
         total=total,
         page=page,
         limit=limit,
@@ -209,11 +393,17 @@ async def get_conversations(
 @router.get("/conversations/{conversation_id}", response_model=ConversationDetail)
 async def get_conversation(
     conversation_id: str,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db),
-    include_messages: bool = Query(True)
+    response: Response,
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db),
+    include_messages: bool = Query(True),
+    message_limit: int = Query(100, ge=1, le=500, description="Newest messages to include")
 ):
-    """Get conversation details with messages"""
+    """
+    Get conversation details with its newest messages (chronological).
+    Older messages are loaded from /conversations/{id}/messages with the
+    X-Next-Cursor header of this response.
+    """
     user = ctx["user"]
     school_id = ctx["school_id"]
     
@@ -225,40 +415,48 @@ async def get_conversation(
             detail="Invalid conversation ID format"
         )
     
-    conversation = db.execute(
-        select(ChatConversation).where(
-            ChatConversation.id == conv_uuid,
-            ChatConversation.user_id == user.id,
-            ChatConversation.school_id == UUID(school_id)
-        )
-    ).scalar_one_or_none()
-    
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
-        )
+    # Turns this process has not written yet must show up in the history
+    await chat_writer.sync_conversation(conv_uuid)
     
+    conversation = await get_user_conversation(db, conversation_id, user, school_id)
     result = ConversationDetail.from_attributes(conversation)
     
     if include_messages:
-        messages = db.execute(
-            select(ChatMessage)
-            .where(ChatMessage.conversation_id == conv_uuid)
-            .order_by(ChatMessage.created_at)
-        ).scalars().all()
-        
-        result.messages = [MessageResponse.from_attributes(msg) for msg in messages]
+        messages = (await db.execute(
+            paginate_messages(conv_uuid, None, message_limit)
+        )).scalars().all()
+        result.messages, result.has_older_messages = message_page(response, messages, message_limit)
     
     return result
 
+@router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
+async def get_conversation_messages(
+    conversation_id: str,
+    response: Response,
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page")
+):
+    """Load a conversation's messages page by page, newest page first (each page chronological)"""
+    conversation = await get_user_conversation(db, conversation_id, ctx["user"], ctx["school_id"])
+    
+    if not cursor:
+        await chat_writer.sync_conversation(conversation.id)
+    
+    messages = (await db.execute(
+        paginate_messages(conversation.id, cursor, limit)
+    )).scalars().all()
+    page, _ = message_page(response, messages, limit)
+    return page
+
 @router.post("/conversations/{conversation_id}/messages", response_model=ChatResponse)
 async def send_message(
     conversation_id: str,
     message_data: ChatMessageSchema,
     request: Request,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a message and get response via Rasa
@@ -280,28 +478,9 @@ async def send_message(
     
     logger.info(f"Processing message from user {user.email} (school: {school_id})")
     
-    try:
-        conv_uuid = UUID(conversation_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid conversation ID format"
-        )
-    
     # Verify conversation exists and belongs to user
-    conversation = db.execute(
-        select(ChatConversation).where(
-            ChatConversation.id == conv_uuid,
-            ChatConversation.user_id == user.id,
-            ChatConversation.school_id == UUID(school_id)
-        )
-    ).scalar_one_or_none()
-    
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
-        )
+    conversation = await get_user_conversation(db, conversation_id, user, school_id)
+    conv_uuid = conversation.id
     
     start_time = time.time()
     
@@ -325,54 +504,13 @@ async def send_message(
             "attachments": [attachment.dict() for attachment in message_data.attachments]
         })
     
-    db.add(user_message)
-    
+    context = None
     try:
-        # Fetch user's schools from database
-        from app.models.school import SchoolMember, School
-        
-        schools_query = (
-            select(School, SchoolMember.role)
-            .join(SchoolMember, School.id == SchoolMember.school_id)
-            .where(SchoolMember.user_id == user.id)
-            .order_by(School.name)
+        rasa_metadata = await build_rasa_metadata(
+            db, user, school_id, auth_token, conversation_id, message_data.context
         )
-        user_schools = db.execute(schools_query).all()
-        
-        schools_list = [
-            {"id": str(school.id), "name": school.name, "role": role}
-            for school, role in user_schools
-        ]
-        
-        # Get current school name
-        current_school = db.get(School, UUID(school_id))
-        school_name = current_school.name if current_school else None
-        
-        # Build context metadata for Rasa
-        # CRITICAL: Include JWT token and API URL so Rasa can make authenticated calls
-        rasa_metadata = {
-            # Authentication - use consistent key names
-            "auth_token": auth_token,  # Changed from jwt_token
-            "authorization": f"Bearer {auth_token}",
-            "api_base_url": API_BASE_URL,
-            
-            # User context
-            "user_id": str(user.id),
-            "user_email": user.email,
-            "user_full_name": user.full_name,
-            "user_roles": getattr(user, 'roles', []),
-            
-            # School context
-            "school_id": school_id,
-            "school_name": school_name,
-            "schools": schools_list,
-            
-            # Conversation context
-            "conversation_id": conversation_id,
-            "context": message_data.context or {}
-        }
-        
-        logger.info(f"Metadata prepared for Rasa: user={user.email}, school={school_name}")
+        # Stored once per distinct user/school context, without the JWT
+        context = context_snapshot(rasa_metadata)
         
         # Send message to Rasa
         sender_id = f"{user.id}_{conversation_id}"
@@ -389,24 +527,12 @@ async def send_message(
             rasa_responses = rasa_result.get("responses", [])
             
             # Combine all text responses from Rasa
-            response_texts = []
-            buttons = []
-            custom_data = {}
-            
-            for rasa_response in rasa_responses:
-                if "text" in rasa_response:
-                    response_texts.append(rasa_response["text"])
-                if "buttons" in rasa_response:
-                    buttons.extend(rasa_response["buttons"])
-                if "custom" in rasa_response:
-                    custom_data.update(rasa_response["custom"])
-            
-            formatted_response = "\n\n".join(response_texts) if response_texts else "I received your message."
+            formatted_response, buttons, custom_data = combine_rasa_responses(rasa_responses)
             
             # Extract intent if available in custom data
             intent = custom_data.get("intent", "unknown")
             
-            logger.info(f"Rasa response: {len(response_texts)} texts, {len(buttons)} buttons, intent={intent}")
+            logger.info(f"Rasa response: {len(rasa_responses)} messages, {len(buttons)} buttons, intent={intent}")
             
             # Store assistant response
             assistant_message = ChatMessage(
@@ -416,23 +542,18 @@ async def send_message(
                 message_type=MessageType.ASSISTANT,
                 content=formatted_response,
                 intent=intent,
-                context_data=prepare_for_json_storage(rasa_metadata),
+                context_id=context["id"],
                 response_data=prepare_for_json_storage({
                     "rasa_responses": rasa_responses,
                     "buttons": buttons,
                     "custom_data": custom_data
                 }),
                 processing_time_ms=processing_time,
-                created_at=message_timestamp
+                created_at=reply_timestamp(message_timestamp)
             )
             
-            db.add(assistant_message)
-            
-            # Update conversation metadata
-            conversation.last_activity = message_timestamp
-            conversation.message_count += 2  # User + Assistant messages
-            
-            db.commit()
+            # Both messages plus the conversation's counters, written behind the response
+            await chat_writer.record_turn([user_message, assistant_message], context)
             
             logger.info(f"Message processed successfully: conversation={conversation_id}, processing_time={processing_time}ms")
             
@@ -459,29 +580,25 @@ async def send_message(
                 user_id=user.id,
                 school_id=UUID(school_id),
                 message_type=MessageType.ASSISTANT,
-                content="I'm sorry, I'm having trouble processing your message right now. Please try again.",
-                context_data=prepare_for_json_storage(rasa_metadata),
+                content=FALLBACK_REPLY,
+                context_id=context["id"],
                 response_data=prepare_for_json_storage({
                     "error": error_msg,
                     "rasa_result": rasa_result
                 }),
                 processing_time_ms=processing_time,
-                created_at=message_timestamp
+                created_at=reply_timestamp(message_timestamp)
             )
             
-            db.add(assistant_message)
-            conversation.last_activity = message_timestamp
-            conversation.message_count += 2
-            db.commit()
+            await chat_writer.record_turn([user_message, assistant_message], context)
             
             return ChatResponse(
-                response="I'm sorry, I'm having trouble processing your message right now. Please try again.",
+                response=FALLBACK_REPLY,
                 conversation_id=conversation_id,
                 message_id=str(assistant_message.id)
             )
         
     except Exception as e:
-        db.rollback()
         logger.error(f"Error processing message: {e}", exc_info=True)
         
         # Store error message for debugging
@@ -490,39 +607,197 @@ async def send_message(
             user_id=user.id,
             school_id=UUID(school_id),
             message_type=MessageType.ASSISTANT,
-            content="I'm sorry, I'm having trouble processing your message right now. Please try again.",
-            context_data=prepare_for_json_storage(rasa_metadata if 'rasa_metadata' in locals() else {}),
+            content=FALLBACK_REPLY,
+            context_id=context["id"] if context else None,
             response_data=prepare_for_json_storage({
                 "error": str(e),
                 "error_type": type(e).__name__
             }),
             processing_time_ms=int((time.time() - start_time) * 1000),
-            created_at=message_timestamp
+            created_at=reply_timestamp(message_timestamp)
         )
         
-        db.add(error_message)
-        conversation.last_activity = message_timestamp
-        conversation.message_count += 2
-        
         try:
-            db.commit()
+            await chat_writer.record_turn([user_message, error_message], context)
         except Exception as commit_error:
             logger.error(f"Failed to save error message: {commit_error}")
-            db.rollback()
         
         return ChatResponse(
-            response="I'm sorry, I'm having trouble processing your message right now. Please try again.",
+            response=FALLBACK_REPLY,
             conversation_id=conversation_id,
             message_id=str(error_message.id) if 'error_message' in locals() else None
         )
 
+@router.post("/conversations/{conversation_id}/messages/stream")
+async def stream_message(
+    conversation_id: str,
+    message_data: ChatMessageSchema,
+    request: Request,
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Send a message and stream Rasa's replies as Server-Sent Events
+    
+    Events: ``start`` as soon as the request is accepted, one ``message``
+    per Rasa bot message (text, buttons, custom) as Rasa produces it, then
+    ``done`` (the same fields as the non-streaming endpoint) or ``error``.
+    Both messages are recorded once, after Rasa finishes the turn.
+    """
+    user = ctx["user"]
+    school_id = ctx["school_id"]
+    
+    auth_token = extract_auth_token(request)
+    if not auth_token:
+        logger.error("No JWT token found in request")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing authentication token"
+        )
+    
+    # Everything that can fail with an HTTP error happens before streaming starts
+    conversation = await get_user_conversation(db, conversation_id, user, school_id)
+    conv_uuid = conversation.id
+    rasa_metadata = await build_rasa_metadata(
+        db, user, school_id, auth_token, conversation_id, message_data.context
+    )
+    context = context_snapshot(rasa_metadata)
+    
+    start_time = time.time()
+    message_timestamp = datetime.now(timezone.utc)
+    sender_id = f"{user.id}_{conversation_id}"
+    
+    user_message = ChatMessage(
+        conversation_id=conv_uuid,
+        user_id=user.id,
+        school_id=UUID(school_id),
+        message_type=MessageType.USER,
+        content=message_data.message,
+        context_data=prepare_for_json_storage(message_data.context or {}),
+        created_at=message_timestamp
+    )
+    if message_data.attachments:
+        user_message.response_data = prepare_for_json_storage({
+            "attachments": [attachment.dict() for attachment in message_data.attachments]
+        })
+    
+    def assistant_reply(content: str, intent: Optional[str], response_data: Dict[str, Any]) -> ChatMessage:
+        return ChatMessage(
+            conversation_id=conv_uuid,
+            user_id=user.id,
+            school_id=UUID(school_id),
+            message_type=MessageType.ASSISTANT,
+            content=content,
+            intent=intent,
+            context_id=context["id"],
+            response_data=prepare_for_json_storage(response_data),
+            processing_time_ms=int((time.time() - start_time) * 1000),
+            created_at=reply_timestamp(message_timestamp)
+        )
+    
+    async def events():
+        rasa_responses = []
+        first_message_ms = None
+        error = None
+        
+        yield sse_event("start", {"conversation_id": conversation_id})
+        
+        try:
+            async for rasa_response in stream_messages_from_rasa(message_data.message, sender_id, rasa_metadata):
+                if first_message_ms is None:
+                    first_message_ms = int((time.time() - start_time) * 1000)
+                rasa_responses.append(rasa_response)
+                yield sse_event("message", rasa_response)
+        except asyncio.CancelledError:
+            # Client went away: keep what Rasa said so far, without holding up the cancellation
+            assistant_message = assistant_reply(
+                combine_rasa_responses(rasa_responses)[0] if rasa_responses else FALLBACK_REPLY,
+                None,
+                {"rasa_responses": rasa_responses, "streamed": True, "client_disconnected": True}
+            )
+            task = asyncio.create_task(chat_writer.record_turn([user_message, assistant_message], context))
+            _pending_stream_saves.add(task)
+            task.add_done_callback(_pending_stream_saves.discard)
+            raise
+        except httpx.TimeoutException:
+            logger.error("Rasa stream timed out")
+            error = "Request to Rasa timed out"
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Rasa returned status code {e.response.status_code}")
+            error = f"Rasa server error: {e.response.status_code}"
+        except Exception as e:
+            logger.error(f"Error streaming from Rasa: {e}", exc_info=True)
+            error = str(e)
+        
+        if error:
+            assistant_message = assistant_reply(
+                FALLBACK_REPLY, None,
+                {"error": error, "rasa_responses": rasa_responses, "streamed": True}
+            )
+        else:
+            formatted_response, buttons, custom_data = combine_rasa_responses(rasa_responses)
+            assistant_message = assistant_reply(
+                formatted_response,
+                custom_data.get("intent", "unknown"),
+                {
+                    "rasa_responses": rasa_responses,
+                    "buttons": buttons,
+                    "custom_data": custom_data,
+                    "streamed": True,
+                    "first_message_ms": first_message_ms
+                }
+            )
+        
+        try:
+            await chat_writer.record_turn([user_message, assistant_message], context)
+        except Exception as e:
+            logger.error(f"Failed to save streamed turn: {e}", exc_info=True)
+            yield sse_event("error", {"detail": "Failed to save the conversation"})
+            return
+        
+        logger.info(
+            f"Streamed message processed: conversation={conversation_id}, "
+            f"first_message={first_message_ms}ms, total={assistant_message.processing_time_ms}ms"
+        )
+        
+        if error:
+            yield sse_event("error", {
+                "detail": FALLBACK_REPLY,
+                "conversation_id": conversation_id,
+                "message_id": str(assistant_message.id)
+            })
+            return
+        
+        # Same fields as ChatResponse; suggestions may be Rasa button objects
+        yield sse_event("done", {
+            "response": assistant_message.content,
+            "intent": assistant_message.intent,
+            "data": custom_data.get("data"),
+            "action_taken": custom_data.get("action_taken"),
+            "suggestions": buttons if buttons else custom_data.get("suggestions", []),
+            "conversation_id": conversation_id,
+            "attachment_processed": bool(message_data.attachments),
+            "message_id": str(assistant_message.id),
+            "first_message_ms": first_message_ms,
+            "processing_time_ms": assistant_message.processing_time_ms
+        })
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Stop nginx from buffering the stream
+        }
+    )
+
 @router.post("/conversations/{conversation_id}/messages/{message_id}/rate")
 async def rate_message(
     conversation_id: str,
     message_id: str,
     rating: dict,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Rate an assistant message (thumbs up/down feedback)"""
     user = ctx["user"]
@@ -538,13 +813,13 @@ async def rate_message(
         )
     
     # Verify conversation belongs to user
-    conversation = db.execute(
+    conversation = (await db.execute(
         select(ChatConversation).where(
             ChatConversation.id == conv_uuid,
             ChatConversation.user_id == user.id,
             ChatConversation.school_id == UUID(school_id)
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not conversation:
         raise HTTPException(
@@ -552,14 +827,17 @@ async def rate_message(
             detail="Conversation not found"
         )
     
+    # The message may still be in the write-behind buffer
+    await chat_writer.sync_conversation(conv_uuid)
+    
     # Get the message
-    message = db.execute(
+    message = (await db.execute(
         select(ChatMessage).where(
             ChatMessage.id == msg_uuid,
             ChatMessage.conversation_id == conv_uuid,
             ChatMessage.message_type == MessageType.ASSISTANT
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not message:
         raise HTTPException(
@@ -580,10 +858,10 @@ async def rate_message(
     message.rated_at = datetime.now(timezone.utc) if rating_value is not None else None
     
     try:
-        db.commit()
+        await db.commit()
         logger.info(f"Message rated: {message_id} with {rating_value} by {user.email}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error rating message: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -596,8 +874,8 @@ async def rate_message(
 async def update_conversation(
     conversation_id: str,
     update_data: UpdateConversation,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update conversation (title, archive status)"""
     user = ctx["user"]
@@ -611,13 +889,13 @@ async def update_conversation(
             detail="Invalid conversation ID format"
         )
     
-    conversation = db.execute(
+    conversation = (await db.execute(
         select(ChatConversation).where(
             ChatConversation.id == conv_uuid,
             ChatConversation.user_id == user.id,
             ChatConversation.school_id == UUID(school_id)
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not conversation:
         raise HTTPException(
@@ -633,10 +911,10 @@ async def update_conversation(
         conversation.is_archived = update_data.is_archived
     
     try:
-        db.commit()
+        await db.commit()
         logger.info(f"Conversation updated: {conversation_id} by {user.email}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating conversation: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -648,8 +926,8 @@ async def update_conversation(
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(
     conversation_id: str,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a conversation and all its messages"""
     user = ctx["user"]
@@ -663,13 +941,13 @@ async def delete_conversation(
             detail="Invalid conversation ID format"
         )
     
-    conversation = db.execute(
+    conversation = (await db.execute(
         select(ChatConversation).where(
             ChatConversation.id == conv_uuid,
             ChatConversation.user_id == user.id,
             ChatConversation.school_id == UUID(school_id)
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not conversation:
         raise HTTPException(
@@ -678,11 +956,12 @@ async def delete_conversation(
         )
     
     try:
-        db.delete(conversation)
-        db.commit()
+        chat_writer.discard_conversation(conv_uuid)
+        await db.delete(conversation)
+        await db.commit()
         logger.info(f"Conversation deleted: {conversation_id} by {user.email}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting conversation: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -694,7 +973,7 @@ async def delete_conversation(
 @router.post("/upload")
 async def upload_file(
     file: UploadFile = File(...),
-    ctx: Dict[str, Any] = Depends(require_school)
+    ctx: Dict[str, Any] = Depends(require_school_async)
 ):
     """Upload a file for chat (placeholder for file upload service)"""
     user = ctx["user"]
@@ -728,5 +1007,6 @@ async def chat_health():
         "rasa_url": RASA_SERVER_URL,
         "api_base_url": API_BASE_URL,
         "rasa_status": rasa_status,
+        "rasa_pool": rasa_client.stats(),
         "timestamp": time.time()
     }
\ No newline at end of file
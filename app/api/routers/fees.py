@@ -8,6 +8,7 @@ from uuid import UUID
 from decimal import Decimal
 
 from app.core.db import get_db
+from app.core.pagination import escape_like
 from app.api.deps.tenancy import require_school
 from app.models.fee import FeeStructure, FeeItem
 from app.schemas.fee_schema import (
@@ -17,6 +18,46 @@ from app.schemas.fee_schema import (
 
 router = APIRouter()
 
+# Listing order for fee structures
+STRUCTURE_ORDER = (FeeStructure.year.desc(), FeeStructure.term.desc())
+
+
+def structures_with_totals(school_id: UUID, conditions, hide_empty: bool = False):
+    """
+    Fee structures matching ``conditions`` with their item count and total,
+    aggregated over fee_items in the same statement (no per-structure query).
+    With ``hide_empty`` the inner join drops structures without items.
+    """
+    totals = (
+        select(
+            FeeItem.fee_structure_id,
+            func.count().label("item_count"),
+            func.sum(FeeItem.amount).label("total_amount")
+        )
+        .where(FeeItem.school_id == school_id)
+        .group_by(FeeItem.fee_structure_id)
+        .subquery()
+    )
+    query = select(
+        FeeStructure,
+        func.coalesce(totals.c.item_count, 0),
+        func.coalesce(totals.c.total_amount, Decimal('0.00'))
+    )
+    join = query.join if hide_empty else query.outerjoin
+    return (
+        join(totals, totals.c.fee_structure_id == FeeStructure.id)
+        .where(FeeStructure.school_id == school_id, *conditions)
+        .order_by(*STRUCTURE_ORDER)
+    )
+
+
+def structure_out(structure: FeeStructure, item_count: int, total: Decimal) -> FeeStructureOut:
+    return FeeStructureOut(
+        **structure.__dict__,
+        total_amount=total,
+        item_count=item_count
+    )
+
 @router.post("/structures/", response_model=FeeStructureOut, status_code=status.HTTP_201_CREATED)
 async def create_fee_structure(
     data: FeeStructureCreate,
@@ -75,36 +116,16 @@ async def list_fee_structures(
     """List all fee structures with optional filters"""
     school_id = UUID(ctx["school_id"])
     
-    query = select(FeeStructure).where(FeeStructure.school_id == school_id)
-    
+    conditions = []
     if year:
-        query = query.where(FeeStructure.year == year)
+        conditions.append(FeeStructure.year == year)
     if term:
-        query = query.where(FeeStructure.term == term)
+        conditions.append(FeeStructure.term == term)
     if level:
-        query = query.where(FeeStructure.level == level)
-    
-    structures = db.execute(query.order_by(FeeStructure.year.desc(), FeeStructure.term.desc())).scalars().all()
+        conditions.append(FeeStructure.level == level)
     
-    result = []
-    for s in structures:
-        items = db.execute(
-            select(FeeItem).where(FeeItem.fee_structure_id == s.id)
-        ).scalars().all()
-        
-        total = sum(item.amount for item in items)
-        item_count = len(items)
-        
-        if hide_empty and item_count == 0:
-            continue
-        
-        result.append(FeeStructureOut(
-            **s.__dict__, 
-            total_amount=total,
-            item_count=item_count
-        ))
-    
-    return result
+    rows = db.execute(structures_with_totals(school_id, conditions, hide_empty)).all()
+    return [structure_out(*row) for row in rows]
 
 @router.get("/structures/search", response_model=List[FeeStructureOut])
 async def search_fee_structures(
@@ -114,39 +135,17 @@ async def search_fee_structures(
     year: Optional[int] = None,
     term: Optional[int] = None
 ):
-    """Search fee structures by name with fuzzy matching"""
+    """Search fee structures by name (case-insensitive substring, served by the trigram index)"""
     school_id = UUID(ctx["school_id"])
     
-    search_query = select(FeeStructure).where(
-        FeeStructure.school_id == school_id,
-        func.lower(FeeStructure.name).like(f"%{query_text.lower()}%")
-    )
-    
+    conditions = [FeeStructure.name.ilike(f"%{escape_like(query_text)}%", escape="\\")]
     if year:
-        search_query = search_query.where(FeeStructure.year == year)
+        conditions.append(FeeStructure.year == year)
     if term:
-        search_query = search_query.where(FeeStructure.term == term)
-    
-    structures = db.execute(
-        search_query.order_by(FeeStructure.year.desc(), FeeStructure.term.desc())
-    ).scalars().all()
-    
-    result = []
-    for s in structures:
-        items = db.execute(
-            select(FeeItem).where(FeeItem.fee_structure_id == s.id)
-        ).scalars().all()
-        
-        total = sum(item.amount for item in items)
-        item_count = len(items)
-        
-        result.append(FeeStructureOut(
-            **s.__dict__, 
-            total_amount=total,
-            item_count=item_count
-        ))
+        conditions.append(FeeStructure.term == term)
     
-    return result
+    rows = db.execute(structures_with_totals(school_id, conditions)).all()
+    return [structure_out(*row) for row in rows]
 
 @router.get("/structures/{structure_id}", response_model=FeeStructureDetail)
 async def get_fee_structure(
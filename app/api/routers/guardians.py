@@ -1,13 +1,15 @@
 #app/api/routers/guardians.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, tuple_
 from typing import List, Optional
 from uuid import UUID
+from collections import defaultdict
 import logging
 
 from app.core.db import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, escape_like
 from app.api.deps.tenancy import require_school
 from app.models.guardian import Guardian, StudentGuardian
 from app.models.student import Student
@@ -17,6 +19,39 @@ from app.schemas.guardian import GuardianUpdate
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Directory order; matches ix_guardians_school_name
+GUARDIAN_ORDER = (Guardian.last_name, Guardian.first_name, Guardian.id)
+
+
+def guardian_search_conditions(search: Optional[str]) -> list:
+    """One condition per search word: it must appear in the name, email or phone"""
+    conditions = []
+    for word in (search or "").split():
+        pattern = f"%{escape_like(word)}%"
+        conditions.append(or_(
+            Guardian.first_name.ilike(pattern, escape="\\"),
+            Guardian.last_name.ilike(pattern, escape="\\"),
+            Guardian.email.ilike(pattern, escape="\\"),
+            Guardian.phone.ilike(pattern, escape="\\")
+        ))
+    return conditions
+
+
+def paginate_guardians(query, cursor: Optional[str], limit: Optional[int]):
+    """Apply directory order plus keyset pagination (fetches one extra row to detect a next page)"""
+    if cursor:
+        last_name, first_name, last_id = decode_cursor(cursor, 3)
+        try:
+            key = (last_name, first_name, UUID(last_id))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(*GUARDIAN_ORDER) > tuple_(*key))
+    
+    query = query.order_by(*GUARDIAN_ORDER)
+    if limit:
+        query = query.limit(limit + 1)
+    return query
+
 @router.post("/", response_model=GuardianOut, status_code=status.HTTP_201_CREATED)
 async def create_guardian(
     data: GuardianCreate,
@@ -85,44 +120,60 @@ async def create_guardian(
 
 @router.get("/", response_model=List[GuardianDetail])
 async def list_all_guardians(
+    response: Response,
+    search: Optional[str] = Query(None, description="Match guardian name, email or phone (every word must match)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit for all guardians"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
     ctx: dict = Depends(require_school),
     db: Session = Depends(get_db)
 ):
-    """Get all guardians in the school with their linked students"""
-    school_id = UUID(ctx["school_id"])
+    """
+    Get all guardians in the school with their linked students.
     
-    # Get all guardians for this school
-    guardians = db.execute(
-        select(Guardian).where(
-            Guardian.school_id == school_id
-        ).order_by(Guardian.last_name, Guardian.first_name)
-    ).scalars().all()
+    The guardian page and its linked students are two queries whatever
+    the page size; ordering and search are served by the guardian indexes.
+    """
+    school_id = UUID(ctx["school_id"])
     
-    result = []
-    for guardian in guardians:
-        # Get all students linked to this guardian
-        student_links = db.execute(
-            select(Student, StudentGuardian)
-            .join(StudentGuardian, Student.id == StudentGuardian.student_id)
+    query = select(Guardian).where(
+        Guardian.school_id == school_id,
+        *guardian_search_conditions(search)
+    )
+    guardians = db.execute(paginate_guardians(query, cursor, limit)).scalars().all()
+    if limit and len(guardians) > limit:
+        guardians = guardians[:limit]
+        last = guardians[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor((last.last_name, last.first_name, last.id))
+    
+    # All linked students of the page, grouped per guardian
+    students_by_guardian = defaultdict(list)
+    if guardians:
+        links = db.execute(
+            select(
+                StudentGuardian.guardian_id,
+                Student.id,
+                Student.first_name,
+                Student.last_name,
+                Student.admission_no,
+                Student.primary_guardian_id
+            )
+            .join(Student, Student.id == StudentGuardian.student_id)
             .where(
-                StudentGuardian.guardian_id == guardian.id,
+                StudentGuardian.guardian_id.in_([g.id for g in guardians]),
                 Student.school_id == school_id
             )
         ).all()
-        
-        # Build list of students with primary status
-        students_info = []
-        for student, link in student_links:
-            students_info.append({
-                "id": str(student.id),
-                "full_name": f"{student.first_name} {student.last_name}",
-                "admission_no": student.admission_no,
-                "is_primary": (student.primary_guardian_id == guardian.id)
+        for guardian_id, student_id, first_name, last_name, admission_no, primary_guardian_id in links:
+            students_by_guardian[guardian_id].append({
+                "id": str(student_id),
+                "full_name": f"{first_name} {last_name}",
+                "admission_no": admission_no,
+                "is_primary": (primary_guardian_id == guardian_id)
             })
-        
-        # Check if this guardian is primary for any student
-        is_primary = any(s["is_primary"] for s in students_info)
-        
+    
+    result = []
+    for guardian in guardians:
+        students_info = students_by_guardian.get(guardian.id, [])
         result.append(GuardianDetail(
             id=guardian.id,
             first_name=guardian.first_name,
@@ -131,9 +182,10 @@ async def list_all_guardians(
             email=guardian.email,
             phone=guardian.phone,
             relationship=guardian.relationship,
-            is_primary=is_primary,
+            # Primary guardian of any linked student
+            is_primary=any(s["is_primary"] for s in students_info),
             created_at=guardian.created_at,
-            students=students_info  # Add this field
+            students=students_info
         ))
     
     return result
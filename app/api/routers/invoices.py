@@ -1,35 +1,100 @@
 # app/api/routers/invoices.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query  # ADD Query here
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response  # ADD Query here
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, tuple_
 from typing import List, Optional  # ADD Optional here
 from uuid import UUID
 from decimal import Decimal
 from datetime import datetime, timedelta
 
-from app.core.db import get_db
-from app.api.deps.tenancy import require_school
+from app.core.db import get_async_db
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from app.api.deps.tenancy import require_school_async
 from app.models.payment import Invoice, InvoiceLine, Payment
 from app.models.student import Student
 from app.models.fee import FeeStructure, FeeItem
+from app.services.invoice_generator import generate_term_invoices
+from app.services.school_overview import invalidate_school_overview
 from app.schemas.fee_schema import (
     GenerateInvoicesRequest, InvoiceOut, InvoiceDetail,
-    InvoiceLineOut, PaymentOut
+    InvoiceLineOut, InvoiceStudentOut, PaymentOut
 )
 
 router = APIRouter()
 
+# Related objects list_all_invoices can embed via ?include=
+INVOICE_EXPANSIONS = {"student"}
+
+# Listing order; Invoice.id breaks ties so the keyset cursor is unique
+INVOICE_ORDER = (Invoice.year.desc(), Invoice.term.desc(), Invoice.id.desc())
+
+
+def invoice_listing_query(conditions):
+    """
+    Invoices matching ``conditions``.
+
+    amount_paid and balance are stored on the invoice (maintained by
+    record_payment and cancel_invoice), so listings never touch payments.
+    """
+    return select(Invoice).where(*conditions)
+
+
+def paginate_invoices(query, cursor: Optional[str], limit: Optional[int]):
+    """Apply listing order plus keyset pagination (fetches one extra row to detect a next page)"""
+    if cursor:
+        year, term, last_id = decode_cursor(cursor, 3)
+        try:
+            key = (int(year), int(term), UUID(last_id))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(Invoice.year, Invoice.term, Invoice.id) < tuple_(*key))
+    
+    query = query.order_by(*INVOICE_ORDER)
+    if limit:
+        query = query.limit(limit + 1)
+    return query
+
+
+def set_next_cursor(response: Response, rows, limit: Optional[int]):
+    """Trim the look-ahead row and expose the next-page cursor as a header"""
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor((last.year, last.term, last.id))
+    return rows
+
+
+def invoice_out(inv: Invoice, student: Optional[InvoiceStudentOut] = None, **extra) -> InvoiceOut:
+    """Serialize an invoice; CANCELLED invoices report zero paid and zero balance"""
+    cancelled = inv.status == "CANCELLED"
+    return InvoiceOut(
+        id=inv.id,
+        student_id=inv.student_id,
+        term=inv.term,
+        year=inv.year,
+        total=inv.total,
+        status=inv.status,
+        due_date=inv.due_date,
+        created_at=inv.created_at,
+        updated_at=inv.updated_at,
+        amount_paid=Decimal('0.00') if cancelled else inv.amount_paid,
+        balance=inv.balance,
+        overpayment=inv.overpayment,
+        student=student,
+        **extra
+    )
+
 @router.post("/generate/", response_model=List[InvoiceOut])
 async def generate_invoices(
     data: GenerateInvoicesRequest,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Auto-generate invoices for students from default fee structure"""
     school_id = UUID(ctx["school_id"])
     
     # Find default fee structure for term/year
-    structure = db.execute(
+    structure = (await db.execute(
         select(FeeStructure).where(
             FeeStructure.school_id == school_id,
             FeeStructure.term == data.term,
@@ -37,7 +102,7 @@ async def generate_invoices(
             FeeStructure.is_default == True,
             FeeStructure.is_published == True
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not structure:
         raise HTTPException(
@@ -45,8 +110,8 @@ async def generate_invoices(
             detail=f"No published default fee structure found for Term {data.term} {data.year}"
         )
     
-    # Get students to invoice
-    query = select(Student).where(
+    # Get students to invoice (only what generation needs)
+    query = select(Student.id, Student.class_id).where(
         Student.school_id == school_id,
         Student.status == "ACTIVE"
     )
@@ -54,135 +119,59 @@ async def generate_invoices(
     if data.class_id:
         query = query.where(Student.class_id == data.class_id)
     
-    students = db.execute(query).scalars().all()
+    students = (await db.execute(query)).all()
     
     if not students:
         raise HTTPException(status_code=404, detail="No students found")
     
     # Get fee items
-    items = db.execute(
+    items = (await db.execute(
         select(FeeItem).where(FeeItem.fee_structure_id == structure.id)
-    ).scalars().all()
+    )).scalars().all()
     
     if not items:
         raise HTTPException(status_code=400, detail="Fee structure has no items")
     
-    generated_invoices = []
     due_date = datetime.now().date() + timedelta(days=30)
+    result = await generate_term_invoices(
+        db, school_id, data.term, data.year, students, items, due_date
+    )
+    await db.commit()
+    # Bulk inserts bypass the ORM flush hooks
+    invalidate_school_overview(school_id)
     
-    for student in students:
-        # Check if invoice already exists
-        existing = db.execute(
-            select(Invoice).where(
-                Invoice.school_id == school_id,
-                Invoice.student_id == student.id,
-                Invoice.term == data.term,
-                Invoice.year == data.year
-            )
-        ).scalar_one_or_none()
-        
-        if existing:
-            continue  # Skip if already invoiced
-        
-        # Filter items: class-specific overrides or general items
-        applicable_items = [
-            item for item in items
-            if item.class_id is None or item.class_id == student.class_id
-        ]
-        
-        total = sum(item.amount for item in applicable_items)
-        
-        # Create invoice
-        invoice = Invoice(
-            school_id=school_id,
-            student_id=student.id,
-            term=data.term,
-            year=data.year,
-            total=total,
-            status="DRAFT",
-            due_date=due_date
-        )
-        db.add(invoice)
-        db.flush()
-        
-        # Create invoice lines
-        for item in applicable_items:
-            line = InvoiceLine(
-                school_id=school_id,
-                invoice_id=invoice.id,
-                item_name=item.item_name,
-                amount=item.amount
-            )
-            db.add(line)
-        
-        generated_invoices.append(invoice)
-    
-    db.commit()
-    
-    # FIX: Refresh all invoices to get updated timestamps
-    for inv in generated_invoices:
-        db.refresh(inv)
-    
-    # FIX: Properly serialize the response
-    return [
-        InvoiceOut(
-            id=inv.id,
-            student_id=inv.student_id,
-            term=inv.term,
-            year=inv.year,
-            total=inv.total,
-            status=inv.status,
-            due_date=inv.due_date,
-            created_at=inv.created_at,
-            updated_at=inv.updated_at,
-            amount_paid=Decimal('0.00'),
-            balance=inv.total
-        )
-        for inv in generated_invoices
-    ]
+    return [invoice_out(inv) for inv in result.invoices]
 
 @router.get("/{invoice_id}", response_model=InvoiceDetail)
 async def get_invoice(
     invoice_id: UUID,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed invoice with lines and payments"""
     school_id = UUID(ctx["school_id"])
     
-    invoice = db.execute(
+    invoice = (await db.execute(
         select(Invoice).where(
             Invoice.id == invoice_id,
             Invoice.school_id == school_id
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
-    lines = db.execute(
+    lines = (await db.execute(
         select(InvoiceLine).where(InvoiceLine.invoice_id == invoice_id)
-    ).scalars().all()
+    )).scalars().all()
     
-    payments = db.execute(
+    payments = (await db.execute(
         select(Payment).where(Payment.invoice_id == invoice_id).order_by(Payment.posted_at)
-    ).scalars().all()
-    
-    # CANCELLED invoices have zero balance
-    if invoice.status == "CANCELLED":
-        amount_paid = Decimal('0.00')
-        balance = Decimal('0.00')
-        overpayment = Decimal('0.00')
-    else:
-        amount_paid = sum(p.amount for p in payments)
-        balance = max(Decimal('0.00'), invoice.total - amount_paid)  # Don't show negative balance
-        overpayment = max(Decimal('0.00'), amount_paid - invoice.total)  # Calculate overpayment
+    )).scalars().all()
     
+    detail = invoice_out(invoice)
     return InvoiceDetail(
-        **invoice.__dict__,
-        amount_paid=amount_paid,
-        balance=balance,
-        overpayment=overpayment,
+        **detail.model_dump(exclude={"student"}),
         lines=[InvoiceLineOut.model_validate(l) for l in lines],
         payments=[PaymentOut.model_validate(p) for p in payments]
     )
@@ -190,59 +179,39 @@ async def get_invoice(
 @router.get("/student/{student_id}", response_model=List[InvoiceOut])
 async def get_student_invoices(
     student_id: UUID,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit for all invoices"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all invoices for a student"""
     school_id = UUID(ctx["school_id"])
     
-    invoices = db.execute(
-        select(Invoice).where(
-            Invoice.school_id == school_id,
-            Invoice.student_id == student_id
-        ).order_by(Invoice.year.desc(), Invoice.term.desc())
-    ).scalars().all()
-    
-    result = []
-    for inv in invoices:
-        # CANCELLED invoices have zero balance
-        if inv.status == "CANCELLED":
-            amount_paid = Decimal('0.00')
-            balance = Decimal('0.00')
-            overpayment = Decimal('0.00')
-        else:
-            payments = db.execute(
-                select(Payment).where(Payment.invoice_id == inv.id)
-            ).scalars().all()
-            
-            amount_paid = sum(p.amount for p in payments)
-            balance = max(Decimal('0.00'), inv.total - amount_paid)
-            overpayment = max(Decimal('0.00'), amount_paid - inv.total)
-        
-        result.append(InvoiceOut(
-            **inv.__dict__,
-            amount_paid=amount_paid,
-            balance=balance,
-            overpayment=overpayment
-        ))
+    query = invoice_listing_query([
+        Invoice.school_id == school_id,
+        Invoice.student_id == student_id
+    ])
+    rows = (await db.execute(paginate_invoices(query, cursor, limit))).all()
+    rows = set_next_cursor(response, rows, limit)
     
-    return result
+    return [invoice_out(row[0]) for row in rows]
 
 @router.put("/{invoice_id}/issue", response_model=InvoiceOut)
 async def issue_invoice(
     invoice_id: UUID,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Issue invoice (DRAFT → ISSUED)"""
     school_id = UUID(ctx["school_id"])
     
-    invoice = db.execute(
+    invoice = (await db.execute(
         select(Invoice).where(
             Invoice.id == invoice_id,
             Invoice.school_id == school_id
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
@@ -251,16 +220,12 @@ async def issue_invoice(
         raise HTTPException(status_code=400, detail=f"Cannot issue invoice with status {invoice.status}")
     
     invoice.status = "ISSUED"
-    db.commit()
-    db.refresh(invoice)
+    await db.commit()
+    await db.refresh(invoice)
     
     # TODO: Queue notification to guardians
     
-    return InvoiceOut(
-        **invoice.__dict__,
-        amount_paid=Decimal('0.00'),
-        balance=invoice.total
-    )
+    return invoice_out(invoice)
 
 
 @router.put("/bulk-issue/", response_model=dict)
@@ -268,8 +233,8 @@ async def bulk_issue_invoices(
     year: int = Query(...),
     term: int = Query(...),
     class_id: Optional[UUID] = None,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Issue all DRAFT invoices for a term (DRAFT → ISSUED)"""
     school_id = UUID(ctx["school_id"])
@@ -284,7 +249,7 @@ async def bulk_issue_invoices(
     if class_id:
         query = query.join(Student).where(Student.class_id == class_id)
     
-    invoices = db.execute(query).scalars().all()
+    invoices = (await db.execute(query)).scalars().all()
     
     if not invoices:
         raise HTTPException(
@@ -297,7 +262,7 @@ async def bulk_issue_invoices(
         invoice.status = "ISSUED"
         issued_count += 1
     
-    db.commit()
+    await db.commit()
     
     return {
         "issued_count": issued_count,
@@ -308,71 +273,84 @@ async def bulk_issue_invoices(
 
 @router.get("/", response_model=List[InvoiceOut])
 async def list_all_invoices(
+    response: Response,
     year: Optional[int] = None,
     term: Optional[int] = None,
     class_id: Optional[UUID] = None,
     status: Optional[str] = None,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    outstanding: bool = Query(False, description="Only invoices with a balance still owing"),
+    include: Optional[str] = Query(None, description="Comma-separated expansions: 'student' embeds name and admission number"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit for all matching invoices"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all invoices with optional filters"""
     school_id = UUID(ctx["school_id"])
     
-    query = select(Invoice).where(Invoice.school_id == school_id)
+    expand = {part.strip() for part in (include or "").split(",") if part.strip()}
+    unknown = expand - INVOICE_EXPANSIONS
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported include: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(INVOICE_EXPANSIONS))}"
+        )
+    include_student = "student" in expand
     
+    conditions = [Invoice.school_id == school_id]
     if year:
-        query = query.where(Invoice.year == year)
+        conditions.append(Invoice.year == year)
     if term:
-        query = query.where(Invoice.term == term)
+        conditions.append(Invoice.term == term)
     if status:
-        query = query.where(Invoice.status == status)
+        conditions.append(Invoice.status == status)
+    if outstanding:
+        conditions.append(Invoice.balance > 0)
+    
+    query = invoice_listing_query(conditions)
+    
+    if class_id or include_student:
+        query = query.join(Student, Student.id == Invoice.student_id)
     if class_id:
-        query = query.join(Student).where(Student.class_id == class_id)
+        query = query.where(Student.class_id == class_id)
+    if include_student:
+        # Resolve names in the same query instead of one lookup per invoice
+        query = query.add_columns(Student.admission_no, Student.first_name, Student.last_name)
     
-    invoices = db.execute(
-        query.order_by(Invoice.year.desc(), Invoice.term.desc())
-    ).scalars().all()
+    rows = (await db.execute(paginate_invoices(query, cursor, limit))).all()
+    rows = set_next_cursor(response, rows, limit)
     
     result = []
-    for inv in invoices:
-        payments = db.execute(
-            select(Payment).where(Payment.invoice_id == inv.id)
-        ).scalars().all()
-        
-        amount_paid = sum(p.amount for p in payments)
-        balance = inv.total - amount_paid
-        
-        result.append(InvoiceOut(
-            id=inv.id,
-            student_id=inv.student_id,
-            term=inv.term,
-            year=inv.year,
-            total=inv.total,
-            status=inv.status,
-            due_date=inv.due_date,
-            created_at=inv.created_at,
-            updated_at=inv.updated_at,
-            amount_paid=amount_paid,
-            balance=balance
-        ))
+    for row in rows:
+        student = None
+        if include_student:
+            student = InvoiceStudentOut(
+                id=row[0].student_id,
+                admission_no=row.admission_no,
+                first_name=row.first_name,
+                last_name=row.last_name,
+                full_name=f"{row.first_name} {row.last_name}".strip()
+            )
+        result.append(invoice_out(row[0], student))
     
     return result
 
 @router.put("/{invoice_id}/cancel", response_model=InvoiceOut)
 async def cancel_invoice(
     invoice_id: UUID,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cancel an invoice (any status → CANCELLED)"""
     school_id = UUID(ctx["school_id"])
     
-    invoice = db.execute(
+    # Lock the row so a concurrent payment can't land between check and update
+    invoice = (await db.execute(
         select(Invoice).where(
             Invoice.id == invoice_id,
             Invoice.school_id == school_id
-        )
-    ).scalar_one_or_none()
+        ).with_for_update()
+    )).scalar_one_or_none()
     
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
@@ -384,20 +362,8 @@ async def cancel_invoice(
         )
     
     invoice.status = "CANCELLED"
-    db.commit()
-    db.refresh(invoice)
+    invoice.balance = Decimal('0.00')  # CANCELLED = no balance (they're voided)
+    await db.commit()
+    await db.refresh(invoice)
     
-    # CANCELLED invoices have zero balance (they're voided)
-    return InvoiceOut(
-        id=invoice.id,
-        student_id=invoice.student_id,
-        term=invoice.term,
-        year=invoice.year,
-        total=invoice.total,
-        status=invoice.status,
-        due_date=invoice.due_date,
-        created_at=invoice.created_at,
-        updated_at=invoice.updated_at,
-        amount_paid=Decimal('0.00'),
-        balance=Decimal('0.00')  # CANCELLED = no balance
-    )
\ No newline at end of file
+    return invoice_out(invoice)
@@ -1,156 +1,290 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import List
-from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, insert, tuple_, update
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.core.db import get_db
-from app.api.deps.tenancy import require_school
-from app.models.notification import Notification
-from app.models.guardian import Guardian, StudentGuardian
+from app.core.db import db_manager, get_async_db, set_rls_context_async
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from app.api.deps.tenancy import require_school_async
+from app.models.notification import Notification, NotificationCampaign
 from app.models.student import Student
-from app.models.payment import Invoice
 from app.services.email_service import email_service, EmailTemplates
-from app.schemas.notification import NotificationCreate, NotificationOut
+from app.services.email_queue import email_queue, EmailJob, OutgoingEmail, INSTANCE_ID
+from app.services.notification_recipients import (
+    Recipient, stream_recipients, fetch_recipients,
+    invoice_reminder_recipients, student_contact_recipient,
+    student_guardian_recipients, school_guardian_recipients
+)
+from app.schemas.notification import NotificationCreate, NotificationOut, NotificationCampaignOut
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Skip reasons kept for a campaign's response
+MAX_SKIP_REASONS = 10
 
-@router.post("/notify-pending-invoices", status_code=status.HTTP_200_OK)
+
+def stage_email(
+    recipient: Recipient,
+    email_subject: str,
+    text_body: str,
+    html_body: Optional[str] = None
+) -> OutgoingEmail:
+    """Build one recipient's message; its delivery row is written by save_campaign"""
+    return OutgoingEmail(
+        str(uuid4()), recipient.email, email_subject, text_body, html_body,
+        guardian_id=str(recipient.guardian_id)
+    )
+
+
+async def save_campaign(
+    db: AsyncSession,
+    job: EmailJob,
+    subject: str,
+    body: str,
+    emails: List[OutgoingEmail]
+) -> None:
+    """
+    Write the campaign row, holding subject and body once, and a QUEUED
+    delivery row per message in one bulk insert. The caller commits.
+    """
+    db.add(NotificationCampaign(
+        id=job.id,
+        school_id=job.school_id,
+        type="EMAIL",
+        kind=job.kind,
+        subject=subject,
+        body=body,
+        created_by=job.created_by,
+        total=len(emails),
+        created_at=datetime.now(timezone.utc),
+        queued_by=INSTANCE_ID,
+        lease_expires_at=email_queue.lease_expires_at()
+    ))
+    await db.flush()
+    await save_deliveries(db, job, emails)
+
+
+async def extend_campaign(db: AsyncSession, job: EmailJob, emails: List[OutgoingEmail]) -> None:
+    """Add another chunk of delivery rows to an existing campaign. The caller commits."""
+    await db.execute(
+        update(NotificationCampaign)
+        .where(NotificationCampaign.id == job.id)
+        .values(total=NotificationCampaign.total + len(emails))
+    )
+    await save_deliveries(db, job, emails)
+
+
+async def save_deliveries(db: AsyncSession, job: EmailJob, emails: List[OutgoingEmail]) -> None:
+    """QUEUED delivery rows for a chunk of a campaign's messages, in one bulk insert"""
+    if not emails:
+        return
+    now = datetime.now(timezone.utc)
+    # RETURNING makes SQLAlchemy send the rows as multi-row INSERTs instead of one per row
+    await db.execute(
+        insert(Notification).returning(Notification.id),
+        [
+            {
+                "id": email.notification_id,
+                "school_id": job.school_id,
+                "type": "EMAIL",
+                "to_guardian_id": email.guardian_id,
+                "status": "QUEUED",
+                "campaign_id": job.id,
+                "created_at": now
+            }
+            for email in emails
+        ]
+    )
+
+
+async def queue_campaign(
+    job: EmailJob,
+    subject: str,
+    body: str,
+    chunks: AsyncIterator[List[OutgoingEmail]]
+) -> None:
+    """
+    Write and queue a campaign one chunk of messages at a time.
+    
+    Each chunk's delivery rows are committed on a short-lived session and
+    handed to the queue before the next chunk is rendered, so the request
+    holds one chunk of messages at a time whatever the recipient count. The
+    recipient stream keeps the request's own session and transaction. The
+    campaign row is written with the first chunk, so nothing is written when
+    no message is staged. If staging fails after a chunk was queued, the job
+    keeps what was queued and records the error as ``staging_error``.
+    """
+    try:
+        async for emails in chunks:
+            if not emails:
+                continue
+            async for writer in db_manager.get_async_session():
+                await set_rls_context_async(writer, school_id=job.school_id)
+                if job.total:
+                    await extend_campaign(writer, job, emails)
+                else:
+                    await save_campaign(writer, job, subject, body, emails)
+                await writer.commit()
+            await email_queue.add(job, emails)
+    except Exception as e:
+        if not job.total:
+            raise
+        # Earlier chunks are committed and will be sent: answer with the job,
+        # marked partial, so a retry is not blind to who was already queued
+        logger.error(f"Email job {job.id} stopped after {job.total} messages: {e}", exc_info=True)
+        job.staging_error = str(e)[:255]
+    finally:
+        # Whatever was committed and queued still completes
+        await email_queue.seal(job)
+
+
+def paginate_newest_first(query, model, cursor: Optional[str], limit: int):
+    """Order by (created_at, id) descending, seek past ``cursor`` and fetch one look-ahead row"""
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            key = (datetime.fromisoformat(created_at), last_id)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(*key))
+    
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def set_next_cursor(response: Response, rows, limit: int):
+    """Trim the look-ahead row and expose the next-page cursor as a header"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor((last.created_at, last.id))
+    return rows
+
+
+def job_accepted(job: EmailJob, message: str, **extra) -> dict:
+    """202 body for a queued email job; ``partial`` when staging stopped early"""
+    if job.staging_error:
+        message = f"{message} (partially: only {job.total} messages were queued)"
+    return {
+        "message": message,
+        "job_id": job.id,
+        "status": job.status,
+        "queued": job.total,
+        "partial": job.staging_error is not None,
+        "status_url": f"/api/notifications/jobs/{job.id}",
+        **extra
+    }
+
+
+async def queue_invoice_reminders(
+    db: AsyncSession,
+    job: EmailJob,
+    year: int,
+    term: int,
+    record_subject: str,
+    email_subject: str
+) -> Tuple[int, int, List[str]]:
+    """
+    Stage a reminder to each outstanding invoice's contact guardian and queue
+    them chunk by chunk.
+    
+    Returns (invoices found, skipped without a guardian email, skip reasons).
+    """
+    found = 0
+    skipped = 0
+    errors = []
+    
+    async def reminder_chunks():
+        nonlocal found, skipped
+        query = invoice_reminder_recipients(UUID(job.school_id), year, term)
+        async for chunk in stream_recipients(db, query):
+            emails = []
+            for recipient in chunk:
+                found += 1
+                if not recipient.email:
+                    logger.warning(f"No guardian email for student {recipient.admission_no}")
+                    skipped += 1
+                    if len(errors) < MAX_SKIP_REASONS:
+                        errors.append(f"No email for {recipient.student_name}")
+                    continue
+                
+                due_date = recipient.due_date.strftime("%B %d, %Y") if recipient.due_date else "Not specified"
+                
+                text_body, html_body = EmailTemplates.pending_invoice_notification(
+                    guardian_name=recipient.guardian_name,
+                    student_name=recipient.student_name,
+                    invoice_total=float(recipient.invoice_total),
+                    invoice_balance=float(recipient.invoice_balance),
+                    due_date=due_date,
+                    term=term,
+                    year=year
+                )
+                
+                emails.append(stage_email(
+                    recipient,
+                    email_subject=f"{email_subject} - {recipient.student_name} (Term {term} {year})",
+                    text_body=text_body,
+                    html_body=html_body
+                ))
+            yield emails
+    
+    record_body = f"{email_subject} for outstanding Term {term} {year} invoices"
+    await queue_campaign(job, record_subject, record_body, reminder_chunks())
+    if found and not job.total:
+        # Every guardian was skipped: keep the (empty) campaign on record
+        await save_campaign(db, job, record_subject, record_body, [])
+        await db.commit()
+    return found, skipped, errors
+
+
+@router.post("/notify-pending-invoices", status_code=status.HTTP_202_ACCEPTED)
 async def notify_pending_invoices(
     term: int,
     year: int,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Notify all guardians about pending invoice payments for a specific term
+    Queue reminders to guardians about pending invoice payments for a specific term
     """
     school_id = UUID(ctx["school_id"])
     user = ctx["user"]
     
     try:
-        # Get all unpaid/partial invoices for the term
-        invoices = db.execute(
-            select(Invoice).where(
-                Invoice.school_id == school_id,
-                Invoice.year == year,
-                Invoice.term == term,
-                Invoice.status.in_(["ISSUED", "PARTIAL"])
-            )
-        ).scalars().all()
+        job = EmailJob(school_id=str(school_id), kind="pending_invoices", created_by=user.email)
+        found, skipped, errors = await queue_invoice_reminders(
+            db, job, year, term,
+            record_subject=f"Pending Invoice - Term {term} {year}",
+            email_subject="School Fees Payment Reminder"
+        )
         
-        if not invoices:
+        if not found:
             return {
                 "message": f"No pending invoices found for Term {term} {year}",
-                "sent": 0,
-                "failed": 0
+                "job_id": None,
+                "queued": 0,
+                "skipped": 0
             }
         
-        notifications_sent = 0
-        notifications_failed = 0
-        errors = []
-        
-        for invoice in invoices:
-            # Get student
-            student = db.get(Student, invoice.student_id)
-            if not student:
-                continue
-            
-            # Get primary guardian
-            if student.primary_guardian_id:
-                guardian = db.get(Guardian, student.primary_guardian_id)
-            else:
-                # Get any guardian
-                guardian_link = db.execute(
-                    select(StudentGuardian).where(
-                        StudentGuardian.student_id == student.id
-                    )
-                ).scalars().first()
-                
-                guardian = db.get(Guardian, guardian_link.guardian_id) if guardian_link else None
-            
-            if not guardian or not guardian.email:
-                logger.warning(f"No guardian email for student {student.admission_no}")
-                notifications_failed += 1
-                errors.append(f"No email for {student.first_name} {student.last_name}")
-                continue
-            
-            # Calculate balance
-            from app.models.payment import Payment
-            payments = db.execute(
-                select(Payment).where(Payment.invoice_id == invoice.id)
-            ).scalars().all()
-            
-            total_paid = sum(float(p.amount) for p in payments)
-            balance = float(invoice.total) - total_paid
-            
-            if balance <= 0:
-                continue  # Skip if fully paid
-            
-            # Generate email content
-            guardian_name = f"{guardian.first_name} {guardian.last_name}"
-            student_name = f"{student.first_name} {student.last_name}"
-            
-            due_date = invoice.due_date.strftime("%B %d, %Y") if invoice.due_date else "Not specified"
-            
-            text_body, html_body = EmailTemplates.pending_invoice_notification(
-                guardian_name=guardian_name,
-                student_name=student_name,
-                invoice_total=float(invoice.total),
-                invoice_balance=balance,
-                due_date=due_date,
-                term=term,
-                year=year
-            )
-            
-            # Send email
-            success = email_service.send_email(
-                to_email=guardian.email,
-                subject=f"School Fees Payment Reminder - {student_name} (Term {term} {year})",
-                body_text=text_body,
-                body_html=html_body
-            )
-            
-            # Create notification record
-            notification = Notification(
-                school_id=str(school_id),
-                type="EMAIL",
-                subject=f"Pending Invoice - Term {term} {year}",
-                body=text_body[:500],  # Store truncated version
-                to_guardian_id=str(guardian.id),
-                status="SENT" if success else "FAILED"
-            )
-            db.add(notification)
-            
-            if success:
-                notifications_sent += 1
-            else:
-                notifications_failed += 1
-                errors.append(f"Failed to send to {guardian.email}")
+        logger.info(f"Pending invoice reminders queued by {user.email}: {job.total} queued, {skipped} skipped")
         
-        db.commit()
-        
-        logger.info(
-            f"Notification batch completed by {user.email}: "
-            f"{notifications_sent} sent, {notifications_failed} failed"
+        return job_accepted(
+            job,
+            f"Reminders queued for Term {term} {year}",
+            skipped=skipped,
+            errors=errors
         )
-        
-        return {
-            "message": f"Notification process completed for Term {term} {year}",
-            "sent": notifications_sent,
-            "failed": notifications_failed,
-            "errors": errors[:10]  # Limit error list
-        }
     
     except Exception as e:
-        logger.error(f"Error sending notifications: {e}", exc_info=True)
+        logger.error(f"Error queueing notifications: {e}", exc_info=True)
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to send notifications"
+            detail="Failed to queue notifications"
         )
 
 
@@ -159,52 +293,36 @@ async def notify_specific_guardian(
     student_id: UUID,
     subject: str,
     message: str,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a custom notification to a specific student's guardian"""
     school_id = UUID(ctx["school_id"])
     user = ctx["user"]
     
-    # Get student
-    student = db.execute(
-        select(Student).where(
-            Student.id == student_id,
-            Student.school_id == school_id
-        )
-    ).scalar_one_or_none()
+    # Student and its contact guardian (primary, else first linked) in one query
+    recipients = await fetch_recipients(db, student_contact_recipient(school_id, student_id))
     
-    if not student:
+    if not recipients:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Get primary guardian
-    if student.primary_guardian_id:
-        guardian = db.get(Guardian, student.primary_guardian_id)
-    else:
-        # Get any guardian
-        guardian_link = db.execute(
-            select(StudentGuardian).where(StudentGuardian.student_id == student.id)
-        ).scalars().first()
-        guardian = db.get(Guardian, guardian_link.guardian_id) if guardian_link else None
-    
-    if not guardian:
+    recipient = recipients[0]
+    
+    if not recipient.guardian_id:
         raise HTTPException(
-            status_code=404, 
-            detail=f"No guardian found for {student.first_name} {student.last_name}"
+            status_code=404,
+            detail=f"No guardian found for {recipient.student_name}"
         )
     
-    if not guardian.email:
+    if not recipient.email:
         raise HTTPException(
-            status_code=404, 
-            detail=f"Guardian {guardian.first_name} {guardian.last_name} has no email address"
+            status_code=404,
+            detail=f"Guardian {recipient.guardian_name} has no email address"
         )
     
-    # Send email
-    success = email_service.send_email(
-        to_email=guardian.email,
-        subject=subject,
-        body_text=message
-    )
+    # Single message: send inline over a pooled connection, off the event loop
+    error = await asyncio.to_thread(email_service.deliver, recipient.email, subject, message)
+    success = error is None
     
     # Create notification record
     notification = Notification(
@@ -212,60 +330,118 @@ async def notify_specific_guardian(
         type="EMAIL",
         subject=subject,
         body=message[:500],
-        to_guardian_id=str(guardian.id),
-        status="SENT" if success else "FAILED"
+        to_guardian_id=str(recipient.guardian_id),
+        status="SENT" if success else "FAILED",
+        error=error[:255] if error else None,
+        sent_at=datetime.utcnow() if success else None
     )
     db.add(notification)
-    db.commit()
+    await db.commit()
     
     if not success:
+        logger.error(f"Failed to send email to {recipient.email}: {error}")
         raise HTTPException(status_code=500, detail="Failed to send email")
     
     logger.info(
-        f"Custom message sent to {guardian.email} regarding {student.first_name} {student.last_name} by {user.email}"
+        f"Custom message sent to {recipient.email} regarding {recipient.student_name} by {user.email}"
     )
     
     return {
         "message": "Notification sent successfully",
-        "recipient": f"{guardian.first_name} {guardian.last_name}",
-        "email": guardian.email,
-        "student": f"{student.first_name} {student.last_name}"
+        "recipient": recipient.guardian_name,
+        "email": recipient.email,
+        "student": recipient.student_name
     }
 
 @router.get("/history", response_model=List[NotificationOut])
 async def get_notification_history(
-    limit: int = 50,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get notification history for the school"""
+    """Get notification history for the school, newest first"""
     school_id = UUID(ctx["school_id"])
     
-    notifications = db.execute(
-        select(Notification)
+    # Campaign deliveries take subject and body from their campaign
+    query = (
+        select(Notification, NotificationCampaign.subject, NotificationCampaign.body)
+        .outerjoin(NotificationCampaign, NotificationCampaign.id == Notification.campaign_id)
         .where(Notification.school_id == str(school_id))
-        .order_by(Notification.created_at.desc())
-        .limit(limit)
-    ).scalars().all()
+    )
+    rows = (await db.execute(paginate_newest_first(query, Notification, cursor, limit))).all()
+    rows = set_next_cursor(response, rows, limit)
     
     return [
         NotificationOut(
             id=n.id,
             type=n.type,
-            subject=n.subject,
-            body=n.body,
+            subject=n.subject or campaign_subject,
+            body=n.body if n.body is not None else campaign_body,
             to_guardian_id=n.to_guardian_id,
             to_user_id=n.to_user_id,
-            status=n.status
+            status=n.status,
+            campaign_id=n.campaign_id,
+            created_at=n.created_at
         )
-        for n in notifications
+        for n, campaign_subject, campaign_body in rows
     ]
 
-@router.post("/guardian-message", status_code=status.HTTP_200_OK)
+@router.get("/campaigns", response_model=List[NotificationCampaignOut])
+async def get_campaigns(
+    response: Response,
+    limit: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the school's email campaigns, newest first"""
+    query = select(NotificationCampaign).where(NotificationCampaign.school_id == ctx["school_id"])
+    rows = (await db.execute(paginate_newest_first(query, NotificationCampaign, cursor, limit))).all()
+    rows = set_next_cursor(response, rows, limit)
+    
+    return [NotificationCampaignOut.model_validate(row[0]) for row in rows]
+
+@router.get("/jobs/{job_id}")
+async def get_email_job(
+    job_id: UUID,
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Progress of a queued email job"""
+    school_id = ctx["school_id"]
+    
+    job = email_queue.get_job(str(job_id))
+    if job and job.school_id == school_id:
+        return job.to_dict()
+    
+    # Not tracked by this process (older job, restart, other worker): count the rows
+    counts = dict((await db.execute(
+        select(Notification.status, func.count())
+        .where(Notification.campaign_id == str(job_id), Notification.school_id == school_id)
+        .group_by(Notification.status)
+    )).all())
+    
+    if not counts:
+        raise HTTPException(status_code=404, detail="Email job not found")
+    
+    total = sum(counts.values())
+    pending = counts.get("QUEUED", 0)
+    return {
+        "job_id": str(job_id),
+        "status": "COMPLETED" if not pending else "QUEUED",
+        "total": total,
+        "sent": counts.get("SENT", 0),
+        "failed": counts.get("FAILED", 0),
+        "pending": pending
+    }
+
+@router.post("/guardian-message", status_code=status.HTTP_202_ACCEPTED)
 async def send_guardian_message(
     notification_data: dict,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a custom message to all guardians of a specific student"""
     school_id = UUID(ctx["school_id"])
@@ -288,38 +464,29 @@ async def send_guardian_message(
             detail="Invalid student_id format"
         )
     
-    # Get student
-    student = db.execute(
-        select(Student).where(
-            Student.id == student_uuid,
-            Student.school_id == school_id
-        )
-    ).scalar_one_or_none()
-    
-    if not student:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Student not found"
-        )
-    
-    # Get all guardians for this student
-    guardian_links = db.execute(
-        select(StudentGuardian).where(
-            StudentGuardian.student_id == student_uuid
-        )
-    ).scalars().all()
+    # All of the student's guardians in one query
+    linked = await fetch_recipients(db, student_guardian_recipients(school_id, student_uuid))
     
-    if not guardian_links:
+    if not linked:
+        # Only the error path needs to tell a missing student from one without guardians
+        student = (await db.execute(
+            select(Student.first_name, Student.last_name).where(
+                Student.id == student_uuid,
+                Student.school_id == school_id
+            )
+        )).first()
+        
+        if not student:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Student not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No guardians found for {student.first_name} {student.last_name}"
         )
     
-    guardians = []
-    for link in guardian_links:
-        guardian = db.get(Guardian, link.guardian_id)
-        if guardian and guardian.email:
-            guardians.append(guardian)
+    guardians = [recipient for recipient in linked if recipient.email]
     
     if not guardians:
         raise HTTPException(
@@ -327,62 +494,44 @@ async def send_guardian_message(
             detail="No guardians with email addresses found"
         )
     
-    # Send message to all guardians
-    sent_count = 0
-    failed_count = 0
-    student_name = f"{student.first_name} {student.last_name}"
+    # Queue the message for every guardian
+    job = EmailJob(school_id=str(school_id), kind="guardian_message", created_by=user.email)
+    emails = []
+    student_name = guardians[0].student_name
     
     for guardian in guardians:
-        guardian_name = f"{guardian.first_name} {guardian.last_name}"
-        
         # Create email body
-        text_body = f"Dear {guardian_name},\n\n"
+        text_body = f"Dear {guardian.guardian_name},\n\n"
         text_body += f"This is a message regarding your child {student_name}:\n\n"
         text_body += f"{message}\n\n"
         text_body += f"Best regards,\n{user.email}"
         
-        # Send email
-        success = email_service.send_email(
-            to_email=guardian.email,
-            subject=f"Message regarding {student_name}",
-            body_text=text_body
-        )
-        
-        # Create notification record
-        notification = Notification(
-            school_id=str(school_id),
-            type="EMAIL",
-            subject=f"Message regarding {student_name}",
-            body=text_body[:500],
-            to_guardian_id=str(guardian.id),
-            status="SENT" if success else "FAILED"
-        )
-        db.add(notification)
-        
-        if success:
-            sent_count += 1
-        else:
-            failed_count += 1
+        emails.append(stage_email(
+            guardian,
+            email_subject=f"Message regarding {student_name}",
+            text_body=text_body
+        ))
     
-    db.commit()
+    await save_campaign(db, job, f"Message regarding {student_name}", message, emails)
+    await db.commit()
+    await email_queue.submit(job, emails)
     
     logger.info(
-        f"Message sent to {sent_count} guardian(s) for {student_name} by {user.email}"
+        f"Message queued for {job.total} guardian(s) of {student_name} by {user.email}"
     )
     
-    return {
-        "message": "Notification sent successfully",
-        "sent_count": sent_count,
-        "failed_count": failed_count,
-        "student": student_name,
-        "recipients": [f"{g.first_name} {g.last_name}" for g in guardians]
-    }
+    return job_accepted(
+        job,
+        "Message queued for delivery",
+        student=student_name,
+        recipients=[g.guardian_name for g in guardians]
+    )
 
-@router.post("/broadcast", status_code=status.HTTP_200_OK)
+@router.post("/broadcast", status_code=status.HTTP_202_ACCEPTED)
 async def broadcast_to_all_guardians(
     notification_data: dict,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a broadcast message to all guardians in the school"""
     school_id = UUID(ctx["school_id"])
@@ -398,117 +547,71 @@ async def broadcast_to_all_guardians(
         )
     
     try:
-        # Get all students in the school
-        students = db.execute(
-            select(Student).where(Student.school_id == school_id)
-        ).scalars().all()
-        
-        if not students:
-            return {
-                "message": "No students found in the school",
-                "sent_count": 0,
-                "failed_count": 0,
-                "total_guardians": 0
-            }
+        # Every guardian linked to a student of the school, once, streamed in chunks
+        job = EmailJob(school_id=str(school_id), kind="broadcast", created_by=user.email)
+        linked_guardians = 0
         
-        # Get all guardian IDs from student-guardian relationships
-        student_ids = [student.id for student in students]
+        async def broadcast_chunks():
+            nonlocal linked_guardians
+            async for chunk in stream_recipients(db, school_guardian_recipients(school_id)):
+                linked_guardians += len(chunk)
+                emails = []
+                
+                for guardian in chunk:
+                    if not guardian.email:
+                        continue
+                    
+                    # Create email body
+                    text_body = f"Dear {guardian.guardian_name},\n\n"
+                    text_body += f"{message}\n\n"
+                    text_body += f"Best regards,\nSchool Administration"
+                    
+                    emails.append(stage_email(
+                        guardian,
+                        email_subject=subject,
+                        text_body=text_body
+                    ))
+                yield emails
         
-        guardian_links = db.execute(
-            select(StudentGuardian).where(
-                StudentGuardian.student_id.in_(student_ids)
-            )
-        ).scalars().all()
+        await queue_campaign(job, subject, message, broadcast_chunks())
         
-        if not guardian_links:
+        if not linked_guardians:
             return {
                 "message": "No guardians found in the school",
-                "sent_count": 0,
-                "failed_count": 0,
+                "job_id": None,
+                "queued": 0,
                 "total_guardians": 0
             }
         
-        # Get unique guardian IDs
-        guardian_ids = list(set(link.guardian_id for link in guardian_links))
-        
-        # Fetch all guardians with emails
-        guardians = []
-        for guardian_id in guardian_ids:
-            guardian = db.get(Guardian, guardian_id)
-            if guardian and guardian.email:
-                guardians.append(guardian)
-        
-        if not guardians:
+        if not job.total:
             return {
                 "message": "No guardians with email addresses found",
-                "sent_count": 0,
-                "failed_count": 0,
+                "job_id": None,
+                "queued": 0,
                 "total_guardians": 0
             }
         
-        # Send message to all guardians
-        sent_count = 0
-        failed_count = 0
-        
-        for guardian in guardians:
-            guardian_name = f"{guardian.first_name} {guardian.last_name}"
-            
-            # Create email body
-            text_body = f"Dear {guardian_name},\n\n"
-            text_body += f"{message}\n\n"
-            text_body += f"Best regards,\nSchool Administration"
-            
-            # Send email
-            success = email_service.send_email(
-                to_email=guardian.email,
-                subject=subject,
-                body_text=text_body
-            )
-            
-            # Create notification record
-            notification = Notification(
-                school_id=str(school_id),
-                type="EMAIL",
-                subject=subject,
-                body=text_body[:500],
-                to_guardian_id=str(guardian.id),
-                status="SENT" if success else "FAILED"
-            )
-            db.add(notification)
-            
-            if success:
-                sent_count += 1
-            else:
-                failed_count += 1
-        
-        db.commit()
-        
         logger.info(
-            f"Broadcast message sent to {sent_count}/{len(guardians)} guardians by {user.email}"
+            f"Broadcast queued for {job.total} guardians by {user.email}"
         )
         
-        return {
-            "message": "Broadcast completed",
-            "sent_count": sent_count,
-            "failed_count": failed_count,
-            "total_guardians": len(guardians)
-        }
+        return job_accepted(job, "Broadcast queued for delivery", total_guardians=job.total)
     
     except Exception as e:
         logger.error(f"Error broadcasting message: {e}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send broadcast message: {str(e)}"
+            detail=f"Failed to queue broadcast message: {str(e)}"
         )
-    
-@router.post("/unpaid-balances", status_code=status.HTTP_200_OK)
+
+@router.post("/unpaid-balances", status_code=status.HTTP_202_ACCEPTED)
 async def notify_guardians_with_balances(
     notification_data: dict,
-    ctx: dict = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: dict = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Send fee reminders to guardians whose students have outstanding balances"""
+    """Queue fee reminders to guardians whose students have outstanding balances"""
     school_id = UUID(ctx["school_id"])
     user = ctx["user"]
     
@@ -522,123 +625,36 @@ async def notify_guardians_with_balances(
         )
     
     try:
-        # Get all unpaid/partial invoices for the term
-        invoices = db.execute(
-            select(Invoice).where(
-                Invoice.school_id == school_id,
-                Invoice.year == year,
-                Invoice.term == term,
-                Invoice.status.in_(["ISSUED", "PARTIAL"])
-            )
-        ).scalars().all()
+        job = EmailJob(school_id=str(school_id), kind="unpaid_balances", created_by=user.email)
+        found, skipped, errors = await queue_invoice_reminders(
+            db, job, year, term,
+            record_subject=f"Fee Balance - Term {term} {year}",
+            email_subject="Fee Balance Reminder"
+        )
         
-        if not invoices:
+        if not found:
             return {
                 "message": f"No outstanding balances found for Term {term} {year}",
-                "notifications_sent": 0,
-                "failed": 0
+                "job_id": None,
+                "queued": 0,
+                "skipped": 0
             }
         
-        notifications_sent = 0
-        notifications_failed = 0
-        errors = []
-        
-        for invoice in invoices:
-            # Calculate balance from payments
-            from app.models.payment import Payment
-            payments = db.execute(
-                select(Payment).where(Payment.invoice_id == invoice.id)
-            ).scalars().all()
-            
-            total_paid = sum(float(p.amount) for p in payments)
-            balance = float(invoice.total) - total_paid
-            
-            # Skip if no balance
-            if balance <= 0:
-                continue
-            
-            # Get student
-            student = db.get(Student, invoice.student_id)
-            if not student:
-                continue
-            
-            # Get primary guardian or any guardian
-            if student.primary_guardian_id:
-                guardian = db.get(Guardian, student.primary_guardian_id)
-            else:
-                guardian_link = db.execute(
-                    select(StudentGuardian).where(
-                        StudentGuardian.student_id == student.id
-                    )
-                ).scalars().first()
-                
-                guardian = db.get(Guardian, guardian_link.guardian_id) if guardian_link else None
-            
-            if not guardian or not guardian.email:
-                logger.warning(f"No guardian email for student {student.admission_no}")
-                notifications_failed += 1
-                errors.append(f"No email for {student.first_name} {student.last_name}")
-                continue
-            
-            # Generate email content
-            guardian_name = f"{guardian.first_name} {guardian.last_name}"
-            student_name = f"{student.first_name} {student.last_name}"
-            
-            due_date = invoice.due_date.strftime("%B %d, %Y") if invoice.due_date else "Not specified"
-            
-            text_body, html_body = EmailTemplates.pending_invoice_notification(
-                guardian_name=guardian_name,
-                student_name=student_name,
-                invoice_total=float(invoice.total),
-                invoice_balance=balance,
-                due_date=due_date,
-                term=term,
-                year=year
-            )
-            
-            # Send email
-            success = email_service.send_email(
-                to_email=guardian.email,
-                subject=f"Fee Balance Reminder - {student_name} (Term {term} {year})",
-                body_text=text_body,
-                body_html=html_body
-            )
-            
-            # Create notification record
-            notification = Notification(
-                school_id=str(school_id),
-                type="EMAIL",
-                subject=f"Fee Balance - Term {term} {year}",
-                body=text_body[:500],
-                to_guardian_id=str(guardian.id),
-                status="SENT" if success else "FAILED"
-            )
-            db.add(notification)
-            
-            if success:
-                notifications_sent += 1
-            else:
-                notifications_failed += 1
-                errors.append(f"Failed to send to {guardian.email}")
-        
-        db.commit()
-        
         logger.info(
-            f"Balance notifications sent by {user.email}: "
-            f"{notifications_sent} sent, {notifications_failed} failed"
+            f"Balance notifications queued by {user.email}: {job.total} queued, {skipped} skipped"
         )
         
-        return {
-            "message": f"Notification process completed for Term {term} {year}",
-            "notifications_sent": notifications_sent,
-            "failed": notifications_failed,
-            "errors": errors[:10]
-        }
+        return job_accepted(
+            job,
+            f"Reminders queued for Term {term} {year}",
+            skipped=skipped,
+            errors=errors
+        )
     
     except Exception as e:
-        logger.error(f"Error sending balance notifications: {e}", exc_info=True)
-        db.rollback()
+        logger.error(f"Error queueing balance notifications: {e}", exc_info=True)
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to send balance notifications"
-        )
\ No newline at end of file
+            detail="Failed to queue balance notifications"
+        )
@@ -1,7 +1,7 @@
 # app/api/routers/rasa_content.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, func, literal, union_all
 from typing import List, Dict, Any, Optional
 from uuid import UUID
 import logging
@@ -1498,6 +1498,9 @@ async def get_training_history(
     status_filter: Optional[str] = Query(None, description="Filter by status: completed, failed, running")
 ):
     """Get training history with statistics"""
+    from app.services.training_automation import TrainingAutomation
+    automation = TrainingAutomation(db)
+    
     query = select(TrainingJob).where(TrainingJob.school_id == None)
     
     if status_filter:
@@ -1507,39 +1510,24 @@ async def get_training_history(
         query.order_by(TrainingJob.created_at.desc()).limit(limit)
     ).scalars().all()
     
-    # Calculate statistics
-    total_jobs = db.execute(
-        select(TrainingJob).where(TrainingJob.school_id == None)
-    ).scalars().all().__len__()
-    
-    completed_jobs = db.execute(
-        select(TrainingJob).where(
-            TrainingJob.school_id == None,
-            TrainingJob.status == "completed"
-        )
-    ).scalars().all()
-    
-    failed_jobs = db.execute(
-        select(TrainingJob).where(
-            TrainingJob.school_id == None,
-            TrainingJob.status == "failed"
-        )
-    ).scalars().all()
-    
-    # Calculate average duration for completed jobs
-    avg_duration = None
-    if completed_jobs:
-        durations = [j.duration_seconds for j in completed_jobs if j.duration_seconds]
-        if durations:
-            avg_duration = sum(durations) / len(durations)
+    # Statistics in one aggregate query
+    is_completed = TrainingJob.status == "completed"
+    total_jobs, completed, failed, avg_duration = db.execute(
+        select(
+            func.count(),
+            func.count().filter(is_completed),
+            func.count().filter(TrainingJob.status == "failed"),
+            func.avg(TrainingJob.duration_seconds).filter(is_completed, TrainingJob.duration_seconds != 0)
+        ).where(TrainingJob.school_id == None)
+    ).one()
     
     return {
         "jobs": [TrainingJobOut.model_validate(job) for job in jobs],
         "statistics": {
             "total_jobs": total_jobs,
-            "completed": len(completed_jobs),
-            "failed": len(failed_jobs),
-            "success_rate": (len(completed_jobs) / total_jobs * 100) if total_jobs > 0 else 0,
+            "completed": completed,
+            "failed": failed,
+            "success_rate": (completed / total_jobs * 100) if total_jobs > 0 else 0,
             "average_duration_seconds": avg_duration,
             "average_duration_formatted": automation._format_duration(avg_duration) if avg_duration else None
         }
@@ -1629,34 +1617,35 @@ async def get_content_statistics(
     db: Session = Depends(get_db)
 ):
     """Get statistics about Rasa content"""
+    # One statement: a (total, global) row per content table plus training job counts
+    content_counts = [
+        select(
+            literal(name).label("kind"),
+            func.count().label("total"),
+            func.count().filter(model.school_id == None).label("global_count"),
+            literal(0).label("completed"),
+            literal(0).label("failed")
+        ).where(model.is_active == True)
+        for name, model in (
+            ("intents", NLUIntent),
+            ("entities", NLUEntity),
+            ("stories", RasaStory),
+            ("rules", RasaRule),
+            ("responses", RasaResponse),
+        )
+    ]
+    job_counts = select(
+        literal("training_jobs"),
+        func.count(),
+        literal(0),
+        func.count().filter(TrainingJob.status == "completed"),
+        func.count().filter(TrainingJob.status == "failed")
+    )
+    counts = {row.kind: row for row in db.execute(union_all(*content_counts, job_counts)).all()}
     
-    stats = {
-        "intents": {
-            "total": db.execute(select(NLUIntent).where(NLUIntent.is_active == True)).scalars().all().__len__(),
-            "global": db.execute(select(NLUIntent).where(NLUIntent.is_active == True, NLUIntent.school_id == None)).scalars().all().__len__(),
-        },
-        "entities": {
-            "total": db.execute(select(NLUEntity).where(NLUEntity.is_active == True)).scalars().all().__len__(),
-            "global": db.execute(select(NLUEntity).where(NLUEntity.is_active == True, NLUEntity.school_id == None)).scalars().all().__len__(),
-        },
-        "stories": {
-            "total": db.execute(select(RasaStory).where(RasaStory.is_active == True)).scalars().all().__len__(),
-            "global": db.execute(select(RasaStory).where(RasaStory.is_active == True, RasaStory.school_id == None)).scalars().all().__len__(),
-        },
-        "rules": {
-            "total": db.execute(select(RasaRule).where(RasaRule.is_active == True)).scalars().all().__len__(),
-            "global": db.execute(select(RasaRule).where(RasaRule.is_active == True, RasaRule.school_id == None)).scalars().all().__len__(),
-        },
-        "responses": {
-            "total": db.execute(select(RasaResponse).where(RasaResponse.is_active == True)).scalars().all().__len__(),
-            "global": db.execute(select(RasaResponse).where(RasaResponse.is_active == True, RasaResponse.school_id == None)).scalars().all().__len__(),
-        },
-        "training_jobs": {
-            "total": db.execute(select(TrainingJob)).scalars().all().__len__(),
-            "completed": db.execute(select(TrainingJob).where(TrainingJob.status == "completed")).scalars().all().__len__(),
-            "failed": db.execute(select(TrainingJob).where(TrainingJob.status == "failed")).scalars().all().__len__(),
-        }
-    }
+    jobs = counts.pop("training_jobs")
+    stats = {kind: {"total": row.total, "global": row.global_count} for kind, row in counts.items()}
+    stats["training_jobs"] = {"total": jobs.total, "completed": jobs.completed, "failed": jobs.failed}
     
     return stats
 
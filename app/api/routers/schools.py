@@ -1,7 +1,7 @@
 # app/api/routers/schools.py - School management routes
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, and_
 from typing import Dict, Any, List
 import logging
 from uuid import UUID
@@ -12,11 +12,12 @@ from app.api.deps.tenancy import require_school
 from app.models.school import School, SchoolMember
 from app.models.user import User
 from app.schemas.school import SchoolCreate, SchoolOut, SchoolLite, SchoolMineItem, SchoolOverview
+from app.services.school_overview import get_school_overview as load_school_overview
 
 # FIXED: Import all models at the top of the file to prevent SQLAlchemy table redefinition errors
 from app.models.student import Student
 from app.models.class_model import Class
-from app.models.payment import Invoice, Payment
+from app.models.payment import Invoice
 from app.models.enrollment import Enrollment
 from app.models.guardian import Guardian, StudentGuardian
 from app.models.academic import AcademicYear, AcademicTerm
@@ -171,119 +172,15 @@ async def get_school_overview(
             detail="Invalid school ID format"
         )
     
-    # Get school details
-    school = db.get(School, school_uuid)
-    if not school:
+    # One aggregate query, cached per school for SCHOOL_OVERVIEW_CACHE_TTL_SECONDS
+    overview = load_school_overview(db, school_uuid)
+    if overview is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="School not found"
         )
     
-    # FIXED: All imports are now at the top of the file
-    
-    # Get counts
-    students_count = db.execute(
-        select(func.count(Student.id)).where(Student.school_id == school_uuid)
-    ).scalar() or 0
-    
-    classes_count = db.execute(
-        select(func.count(Class.id)).where(Class.school_id == school_uuid)
-    ).scalar() or 0
-    
-    guardians_count = db.execute(
-        select(func.count(func.distinct(Guardian.id)))
-        .join(StudentGuardian, Guardian.id == StudentGuardian.guardian_id)
-        .join(Student, StudentGuardian.student_id == Student.id)
-        .where(Student.school_id == school_uuid)
-    ).scalar() or 0
-    
-    # Get current academic year and term
-    current_year = db.execute(
-        select(AcademicYear)
-        .where(
-            AcademicYear.school_id == school_uuid,
-            AcademicYear.is_active == True
-        )
-    ).scalar_one_or_none()
-    
-    current_term = None
-    current_term_id = None
-    if current_year:
-        current_term = db.execute(
-            select(AcademicTerm)
-            .where(
-                AcademicTerm.academic_year_id == current_year.id,
-                AcademicTerm.state == "ACTIVE"
-            )
-        ).scalar_one_or_none()
-        
-        if current_term:
-            current_term_id = current_term.id
-    
-    # Get enrollment stats for current term
-    enrolled_students = 0
-    unassigned_students = students_count
-    
-    if current_term_id:
-        enrolled_students = db.execute(
-            select(func.count(func.distinct(Enrollment.student_id)))
-            .where(Enrollment.term_id == current_term_id)
-        ).scalar() or 0
-        
-        unassigned_students = students_count - enrolled_students
-    
-    # Get invoice stats
-    total_invoices = db.execute(
-        select(func.count(Invoice.id))
-        .where(Invoice.school_id == school_uuid)
-    ).scalar() or 0
-    
-    issued_invoices = db.execute(
-        select(func.count(Invoice.id))
-        .where(
-            Invoice.school_id == school_uuid,
-            Invoice.status.in_(["ISSUED", "PARTIAL"])
-        )
-    ).scalar() or 0
-    
-    paid_invoices = db.execute(
-        select(func.count(Invoice.id))
-        .where(
-            Invoice.school_id == school_uuid,
-            Invoice.status == "PAID"
-        )
-    ).scalar() or 0
-    
-    pending_invoices = db.execute(
-        select(func.count(Invoice.id))
-        .where(
-            Invoice.school_id == school_uuid,
-            Invoice.status.in_(["ISSUED", "PARTIAL"])
-        )
-    ).scalar() or 0
-    
-    # Get fees collected (total payments)
-    fees_collected = db.execute(
-        select(func.sum(Payment.amount))
-        .join(Invoice, Payment.invoice_id == Invoice.id)
-        .where(Invoice.school_id == school_uuid)
-    ).scalar() or 0
-    
-    return {
-        "school_name": school.name,
-        "academic_year": current_year.year if current_year else None,
-        "current_term": current_term.title if current_term else None,
-        "students_total": students_count,
-        "students_enrolled": enrolled_students,
-        "students_unassigned": unassigned_students,
-        "classes": classes_count,
-        "guardians": guardians_count,
-        "invoices_total": total_invoices,
-        "invoices_issued": issued_invoices,
-        "invoices_paid": paid_invoices,
-        "invoices_pending": pending_invoices,
-        "fees_collected": float(fees_collected)
-    }
+    return overview
 
 @router.get("/{school_id}/members")
 async def get_school_members(
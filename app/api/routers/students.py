@@ -1,6 +1,7 @@
 # app/api/routers/students.py - Fixed imports
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, or_, and_
 from typing import Dict, Any, List, Optional
 from uuid import UUID
@@ -8,8 +9,9 @@ import logging
 import requests
 from datetime import date
 
-from app.core.db import get_db
-from app.api.deps.tenancy import require_school
+from app.core.db import get_async_db
+from app.core.pagination import count_rows, estimated_count
+from app.api.deps.tenancy import require_school_async
 from app.models.student import Student
 from app.models.class_model import Class
 from app.models.academic import AcademicYear, AcademicTerm
@@ -21,7 +23,9 @@ from app.schemas.student import (
     StudentList, 
     StudentDetail,
     StudentUpdate,
-    StudentSearch
+    StudentSearch,
+    StudentBatchLookup,
+    StudentBatchResult
 )
 
 logger = logging.getLogger(__name__)
@@ -29,25 +33,25 @@ router = APIRouter()
 
 
 # Helper function to get current academic setup
-async def get_current_academic_setup(db: Session, school_id: str) -> tuple:
+async def get_current_academic_setup(db: AsyncSession, school_id: str) -> tuple:
     """Get current academic year and term - handle PLANNED terms gracefully"""
     
     # Get ACTIVE academic year ONLY
-    current_year = db.execute(
+    current_year = (await db.execute(
         select(AcademicYear)
         .where(
             AcademicYear.school_id == UUID(school_id),
             AcademicYear.state == "ACTIVE"
         )
         .order_by(AcademicYear.year.desc())
-    ).scalars().first()
+    )).scalars().first()
     
     if not current_year:
         return None, None
     
     # First try to get ACTIVE term
     # FIXED: Changed year_id to academic_year_id
-    current_term = db.execute(
+    current_term = (await db.execute(
         select(AcademicTerm)
         .where(
             AcademicTerm.school_id == UUID(school_id),
@@ -55,11 +59,11 @@ async def get_current_academic_setup(db: Session, school_id: str) -> tuple:
             AcademicTerm.state == "ACTIVE"
         )
         .order_by(AcademicTerm.term.desc())
-    ).scalars().first()
+    )).scalars().first()
     
     # If no ACTIVE term, use the most recent PLANNED term
     if not current_term:
-        current_term = db.execute(
+        current_term = (await db.execute(
             select(AcademicTerm)
             .where(
                 AcademicTerm.school_id == UUID(school_id),
@@ -67,15 +71,15 @@ async def get_current_academic_setup(db: Session, school_id: str) -> tuple:
                 AcademicTerm.state == "PLANNED"
             )
             .order_by(AcademicTerm.term.desc())
-        ).scalars().first()
+        )).scalars().first()
     
     return current_year, current_term
 
 @router.post("/", response_model=StudentOut, status_code=status.HTTP_201_CREATED)
 async def create_student(
     student_data: StudentCreate,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new student and automatically enroll them in the specified class
@@ -88,12 +92,12 @@ async def create_student(
     clean_admission_no = str(student_data.admission_no).lstrip("#").strip()
     
     # Check if admission number is unique within the school
-    existing_student = db.execute(
+    existing_student = (await db.execute(
         select(Student).where(
             Student.school_id == UUID(school_id),
             Student.admission_no == clean_admission_no
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if existing_student:
         raise HTTPException(
@@ -119,12 +123,12 @@ async def create_student(
     # Verify class exists if provided
     class_obj = None
     if student_data.class_id:
-        class_obj = db.execute(
+        class_obj = (await db.execute(
             select(Class).where(
                 Class.id == student_data.class_id,
                 Class.school_id == UUID(school_id)
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
         
         if not class_obj:
             raise HTTPException(
@@ -154,7 +158,7 @@ async def create_student(
     db.add(new_student)
     
     try:
-        db.flush()  # Get the student ID without committing
+        await db.flush()  # Get the student ID without committing
         
         # If class is provided, create enrollment record
         enrollment = None
@@ -169,15 +173,15 @@ async def create_student(
             )
             db.add(enrollment)
         
-        db.commit()
-        db.refresh(new_student)
+        await db.commit()
+        await db.refresh(new_student)
         
         logger.info(f"Student created: {new_student.admission_no} by {user.email}")
         if enrollment:
             logger.info(f"Student enrolled in {class_obj.name} for {current_term.title}")
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating student: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -203,8 +207,8 @@ async def create_student(
 
 @router.get("/", response_model=StudentList)
 async def get_students(
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db),
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(None, description="Search by name (partial match)"),
@@ -212,7 +216,8 @@ async def get_students(
     class_id: Optional[str] = Query(None, description="Filter by class ID"),
     term_id: Optional[str] = Query(None, description="Filter by term (shows enrolled students)"),
     status: Optional[str] = Query(None),
-    unassigned: Optional[bool] = Query(False, description="Show students not enrolled in current term")
+    unassigned: Optional[bool] = Query(False, description="Show students not enrolled in current term"),
+    estimate_total: bool = Query(False, description="Return the planner's row estimate as total for large results")
 ):
     """Get students with filtering and pagination, including enrollment-aware filtering"""
     school_id = ctx["school_id"]
@@ -226,20 +231,19 @@ async def get_students(
     
     # Base query - different approach based on filters
     if unassigned and current_term:
-        enrolled_student_ids = db.execute(
-            select(Enrollment.student_id).where(
-                Enrollment.school_id == UUID(school_id),
-                Enrollment.term_id == current_term.id,
-                Enrollment.status == "ENROLLED"
-            )
-        ).scalars().all()
+        # Kept as a subquery so the enrolled ids never leave the database
+        enrolled_student_ids = select(Enrollment.student_id).where(
+            Enrollment.school_id == UUID(school_id),
+            Enrollment.term_id == current_term.id,
+            Enrollment.status == "ENROLLED"
+        )
         
         query = (
             select(Student, Class.name.label("class_name"))
             .outerjoin(Class, Student.class_id == Class.id)
             .where(
                 Student.school_id == UUID(school_id),
-                ~Student.id.in_(enrolled_student_ids) if enrolled_student_ids else True
+                ~Student.id.in_(enrolled_student_ids)
             )
         )
         
@@ -310,13 +314,16 @@ async def get_students(
     else:
         query = query.order_by(Student.first_name, Student.last_name)
     
-    # Get total count
-    total_query = query.with_only_columns(Student.id)
-    total = len(db.execute(total_query).scalars().all())
+    if estimate_total:
+        total, total_is_estimate = await estimated_count(db, query)
+    else:
+        total, total_is_estimate = await count_rows(db, query), False
     
-    # Apply pagination
+    # Apply pagination, with one look-ahead row for has_next
     offset = (page - 1) * limit
-    results = db.execute(query.offset(offset).limit(limit)).all()
+    results = (await db.execute(query.offset(offset).limit(limit + 1))).all()
+    has_next = len(results) > limit
+    results = results[:limit]
     
     # Format results
     students = []
@@ -335,21 +342,20 @@ async def get_students(
             created_at=student.created_at
         ))
     
-    has_next = total > page * limit
-    
     return StudentList(
         students=students,
         total=total,
         page=page,
         limit=limit,
-        has_next=has_next
+        has_next=has_next,
+        total_is_estimate=total_is_estimate
     )
 
 @router.get("/{student_id}", response_model=StudentDetail)
 async def get_student(
     student_id: str,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get student details including current enrollment - accepts UUID or admission number"""
     school_id = ctx["school_id"]
@@ -358,14 +364,14 @@ async def get_student(
     try:
         student_uuid = UUID(student_id)
         # Search by UUID
-        result = db.execute(
+        result = (await db.execute(
             select(Student, Class.name.label("class_name"))
             .outerjoin(Class, Student.class_id == Class.id)
             .where(
                 Student.id == student_uuid,
                 Student.school_id == UUID(school_id)
             )
-        ).first()
+        )).first()
     except ValueError:
         # Not a UUID, treat as admission number
         # NORMALIZE: Strip # prefix from admission number
@@ -373,14 +379,14 @@ async def get_student(
         
         logger.info(f"Looking up student by admission number: {clean_admission_no}")
         
-        result = db.execute(
+        result = (await db.execute(
             select(Student, Class.name.label("class_name"))
             .outerjoin(Class, Student.class_id == Class.id)
             .where(
                 Student.admission_no == clean_admission_no,
                 Student.school_id == UUID(school_id)
             )
-        ).first()
+        )).first()
     
     if not result:
         raise HTTPException(
@@ -395,7 +401,7 @@ async def get_student(
     current_enrollment = None
     
     if current_term:
-        current_enrollment = db.execute(
+        current_enrollment = (await db.execute(
             select(Enrollment, Class.name.label("enrolled_class_name"))
             .join(Class, Enrollment.class_id == Class.id)
             .where(
@@ -403,7 +409,7 @@ async def get_student(
                 Enrollment.term_id == current_term.id,
                 Enrollment.status == "ENROLLED"
             )
-        ).first()
+        )).first()
     
     return StudentDetail(
         id=student.id,
@@ -431,8 +437,8 @@ async def get_student(
 async def enroll_student(
     student_id: str,
     enrollment_data: dict,  # {class_id: str, term_id?: str}
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enroll an existing student in a class for a specific term"""
     user = ctx["user"]
@@ -447,12 +453,12 @@ async def enroll_student(
         )
     
     # Get student
-    student = db.execute(
+    student = (await db.execute(
         select(Student).where(
             Student.id == student_uuid,
             Student.school_id == UUID(school_id)
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not student:
         raise HTTPException(
@@ -469,12 +475,12 @@ async def enroll_student(
             detail="Invalid or missing class_id"
         )
     
-    class_obj = db.execute(
+    class_obj = (await db.execute(
         select(Class).where(
             Class.id == class_uuid,
             Class.school_id == UUID(school_id)
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not class_obj:
         raise HTTPException(
@@ -493,12 +499,12 @@ async def enroll_student(
                 detail="Invalid term ID format"
             )
         
-        term = db.execute(
+        term = (await db.execute(
             select(AcademicTerm).where(
                 AcademicTerm.id == term_uuid,
                 AcademicTerm.school_id == UUID(school_id)
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
     else:
         _, term = await get_current_academic_setup(db, school_id)
         term_uuid = term.id if term else None
@@ -510,13 +516,13 @@ async def enroll_student(
         )
     
     # Check if already enrolled for this term
-    existing_enrollment = db.execute(
+    existing_enrollment = (await db.execute(
         select(Enrollment).where(
             Enrollment.student_id == student_uuid,
             Enrollment.term_id == term_uuid,
             Enrollment.school_id == UUID(school_id)
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if existing_enrollment:
         if existing_enrollment.status == "ENROLLED":
@@ -545,10 +551,10 @@ async def enroll_student(
     student.class_id = class_uuid
     
     try:
-        db.commit()
+        await db.commit()
         logger.info(f"Student {student.admission_no} enrolled in {class_obj.name} for {term.title} by {user.email}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error enrolling student: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -562,8 +568,8 @@ async def enroll_student(
 # Add unassigned students endpoint
 @router.get("/unassigned/current-term", response_model=StudentList)
 async def get_unassigned_students(
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db),
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100)
 ):
@@ -579,14 +585,12 @@ async def get_unassigned_students(
             detail="No current academic term found. Please set up academic year and terms first."
         )
     
-    # Get enrolled student IDs for current term
-    enrolled_student_ids = db.execute(
-        select(Enrollment.student_id).where(
-            Enrollment.school_id == UUID(school_id),
-            Enrollment.term_id == current_term.id,
-            Enrollment.status == "ENROLLED"
-        )
-    ).scalars().all()
+    # Student IDs enrolled in the current term (a subquery, not loaded)
+    enrolled_student_ids = select(Enrollment.student_id).where(
+        Enrollment.school_id == UUID(school_id),
+        Enrollment.term_id == current_term.id,
+        Enrollment.status == "ENROLLED"
+    )
     
     # Query for students NOT in the enrolled list
     query = (
@@ -598,18 +602,17 @@ async def get_unassigned_students(
         )
     )
     
-    if enrolled_student_ids:
-        query = query.where(~Student.id.in_(enrolled_student_ids))
+    query = query.where(~Student.id.in_(enrolled_student_ids))
     
     query = query.order_by(Student.first_name, Student.last_name)
     
-    # Get total count
-    total_query = query.with_only_columns(Student.id)
-    total = len(db.execute(total_query).scalars().all())
+    total = await count_rows(db, query)
     
-    # Apply pagination
+    # Apply pagination, with one look-ahead row for has_next
     offset = (page - 1) * limit
-    results = db.execute(query.offset(offset).limit(limit)).all()
+    results = (await db.execute(query.offset(offset).limit(limit + 1))).all()
+    has_next = len(results) > limit
+    results = results[:limit]
     
     # Format results
     students = []
@@ -628,8 +631,6 @@ async def get_unassigned_students(
             created_at=student.created_at
         ))
     
-    has_next = total > page * limit
-    
     return StudentList(
         students=students,
         total=total,
@@ -643,8 +644,8 @@ async def get_unassigned_students(
 async def update_student(
     student_id: str,
     student_data: StudentUpdate,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update student information - accepts UUID or admission number"""
     user = ctx["user"]
@@ -653,21 +654,21 @@ async def update_student(
     # Try to parse as UUID first
     try:
         student_uuid = UUID(student_id)
-        student = db.execute(
+        student = (await db.execute(
             select(Student).where(
                 Student.id == student_uuid,
                 Student.school_id == UUID(school_id)
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
     except ValueError:
         # Not a UUID, treat as admission number
         clean_admission_no = str(student_id).lstrip("#").strip()
-        student = db.execute(
+        student = (await db.execute(
             select(Student).where(
                 Student.admission_no == clean_admission_no,
                 Student.school_id == UUID(school_id)
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
     
     if not student:
         raise HTTPException(
@@ -681,13 +682,13 @@ async def update_student(
     if (student_data.admission_no and 
         student_data.admission_no != student.admission_no):
         
-        existing_student = db.execute(
+        existing_student = (await db.execute(
             select(Student).where(
                 Student.school_id == UUID(school_id),
                 Student.admission_no == student_data.admission_no,
                 Student.id != student_uuid
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
         
         if existing_student:
             raise HTTPException(
@@ -698,12 +699,12 @@ async def update_student(
     # If class is being changed, update current enrollment
     if student_data.class_id and student_data.class_id != student.class_id:
         # Verify new class exists
-        new_class = db.execute(
+        new_class = (await db.execute(
             select(Class).where(
                 Class.id == student_data.class_id,
                 Class.school_id == UUID(school_id)
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
         
         if not new_class:
             raise HTTPException(
@@ -714,13 +715,13 @@ async def update_student(
         # Update current enrollment if exists
         _, current_term = await get_current_academic_setup(db, school_id)
         if current_term:
-            current_enrollment = db.execute(
+            current_enrollment = (await db.execute(
                 select(Enrollment).where(
                     Enrollment.student_id == student_uuid,
                     Enrollment.term_id == current_term.id,
                     Enrollment.status == "ENROLLED"
                 )
-            ).scalar_one_or_none()
+            )).scalar_one_or_none()
             
             if current_enrollment:
                 current_enrollment.class_id = student_data.class_id
@@ -731,11 +732,11 @@ async def update_student(
         setattr(student, field, value)
     
     try:
-        db.commit()
-        db.refresh(student)
+        await db.commit()
+        await db.refresh(student)
         logger.info(f"Student updated: {student.admission_no} by {user.email}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating student: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -744,7 +745,7 @@ async def update_student(
     
     # Load class information for response
     if student.class_id:
-        class_info = db.get(Class, student.class_id)
+        class_info = await db.get(Class, student.class_id)
         class_name = class_info.name if class_info else None
     else:
         class_name = None
@@ -766,8 +767,8 @@ async def update_student(
 @router.delete("/{student_id}")
 async def delete_student(
     student_id: str,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a student - accepts UUID or admission number"""
     user = ctx["user"]
@@ -776,21 +777,21 @@ async def delete_student(
     # Try to parse as UUID first
     try:
         student_uuid = UUID(student_id)
-        student = db.execute(
+        student = (await db.execute(
             select(Student).where(
                 Student.id == student_uuid,
                 Student.school_id == UUID(school_id)
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
     except ValueError:
         # Not a UUID, treat as admission number
         clean_admission_no = str(student_id).lstrip("#").strip()
-        student = db.execute(
+        student = (await db.execute(
             select(Student).where(
                 Student.admission_no == clean_admission_no,
                 Student.school_id == UUID(school_id)
             )
-        ).scalar_one_or_none()
+        )).scalar_one_or_none()
         student_uuid = student.id if student else None
     
     if not student:
@@ -803,22 +804,22 @@ async def delete_student(
     student.status = "DELETED"
     
     # Also update any current enrollments
-    current_enrollments = db.execute(
+    current_enrollments = (await db.execute(
         select(Enrollment).where(
             Enrollment.student_id == student_uuid,
             Enrollment.status == "ENROLLED"
         )
-    ).scalars().all()
+    )).scalars().all()
     
     for enrollment in current_enrollments:
         enrollment.status = "DROPPED"
         enrollment.left_on = date.today()
     
     try:
-        db.commit()
+        await db.commit()
         logger.info(f"Student deleted: {student.admission_no} by {user.email}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting student: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -827,11 +828,71 @@ async def delete_student(
     
     return {"message": "Student deleted successfully"}
 
+@router.post("/batch", response_model=StudentBatchResult)
+async def batch_lookup_students(
+    lookup: StudentBatchLookup,
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Resolve many students by id and/or admission number in one query"""
+    school_id = ctx["school_id"]
+    
+    ids = list(dict.fromkeys(lookup.ids))
+    admission_nos = list(dict.fromkeys(a.strip() for a in lookup.admission_nos if a and a.strip()))
+    
+    if not ids and not admission_nos:
+        return StudentBatchResult(students=[], not_found=[])
+    
+    conditions = []
+    if ids:
+        conditions.append(Student.id.in_(ids))
+    if admission_nos:
+        conditions.append(Student.admission_no.in_(admission_nos))
+    
+    results = (await db.execute(
+        select(Student, Class.name.label("class_name"))
+        .outerjoin(Class, Student.class_id == Class.id)
+        .where(Student.school_id == UUID(school_id), or_(*conditions))
+    )).all()
+    
+    by_id = {}
+    for student, class_name in results:
+        by_id[student.id] = StudentOut(
+            id=student.id,
+            admission_no=student.admission_no,
+            first_name=student.first_name,
+            last_name=student.last_name,
+            full_name=f"{student.first_name} {student.last_name}".strip(),
+            gender=student.gender,
+            dob=student.dob,
+            class_id=student.class_id,
+            class_name=class_name,
+            status=student.status,
+            created_at=student.created_at
+        )
+    by_admission = {s.admission_no: s for s in by_id.values()}
+    
+    # Keep request order: ids first, then admission numbers
+    ordered = {}
+    not_found = []
+    for student_id in ids:
+        if student_id in by_id:
+            ordered[student_id] = by_id[student_id]
+        else:
+            not_found.append(str(student_id))
+    for admission_no in admission_nos:
+        if admission_no in by_admission:
+            ordered.setdefault(by_admission[admission_no].id, by_admission[admission_no])
+        else:
+            not_found.append(admission_no)
+    
+    return StudentBatchResult(students=list(ordered.values()), not_found=not_found)
+
 @router.post("/search", response_model=List[StudentOut])
 async def search_students(
     search_data: StudentSearch,
-    ctx: Dict[str, Any] = Depends(require_school),
-    db: Session = Depends(get_db)
+    ctx: Dict[str, Any] = Depends(require_school_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Advanced student search"""
     school_id = ctx["school_id"]
@@ -859,7 +920,7 @@ async def search_students(
         query = query.where(Student.status == search_data.status)
     
     # Limit results to prevent overload
-    results = db.execute(query.limit(50)).all()
+    results = (await db.execute(query.limit(50))).all()
     
     students = []
     for student, class_name in results:
@@ -232,10 +232,10 @@ async def create_user(
         )
     
     # Import here to avoid circular imports
-    from app.core.security import password_manager
+    from app.core.security import password_hasher
     
     # Hash password
-    hashed_password = password_manager.hash_password(user_data.password)
+    hashed_password = await password_hasher.hash_password(user_data.password)
     
     # Create user
     new_user = User(
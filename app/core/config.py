@@ -53,6 +53,11 @@ class Settings(BaseSettings):
     RASA_TIMEOUT_SECONDS: int = Field(default=30, ge=1, le=300, description="Rasa request timeout")
     RASA_MAX_RETRIES: int = Field(default=3, ge=0, le=10, description="Max retry attempts for Rasa")
     RASA_RETRY_DELAY: float = Field(default=1.0, ge=0.1, le=10.0, description="Retry delay in seconds")
+    RASA_POOL_MAX_CONNECTIONS: int = Field(default=100, ge=1, le=1000, description="Max concurrent connections to Rasa")
+    RASA_POOL_MAX_KEEPALIVE: int = Field(default=20, ge=0, le=1000, description="Idle keep-alive connections kept to Rasa")
+    RASA_KEEPALIVE_EXPIRY: float = Field(default=30.0, ge=1.0, le=600.0, description="Seconds an idle Rasa connection is kept")
+    RASA_POOL_TIMEOUT: float = Field(default=5.0, ge=0.1, le=60.0, description="Seconds to wait for a free Rasa connection")
+    RASA_HTTP2: bool = Field(default=False, description="Use HTTP/2 to Rasa (requires the h2 package)")
     
     # WhatsApp Bridge Configuration
     WA_BRIDGE_URL: str = Field(default="http://localhost:3001", description="WhatsApp bridge URL")
@@ -85,7 +90,22 @@ class Settings(BaseSettings):
     SMTP_FROM_NAME: str = Field(default="School Assistant", description="From name")
     SMTP_USE_TLS: bool = Field(default=True, description="Use TLS for SMTP")
     SMTP_USE_SSL: bool = Field(default=False, description="Use SSL for SMTP")
-    
+    SMTP_TIMEOUT_SECONDS: float = Field(default=30.0, ge=1.0, le=300.0, description="SMTP socket timeout")
+    SMTP_POOL_SIZE: int = Field(default=4, ge=1, le=50, description="Max open (reused) SMTP connections")
+    SMTP_POOL_IDLE_SECONDS: float = Field(default=60.0, ge=1.0, le=3600.0, description="Idle seconds before a pooled SMTP connection is re-checked with NOOP")
+
+    # Email Job Queue
+    EMAIL_QUEUE_WORKERS: int = Field(default=4, ge=1, le=50, description="Concurrent email sender workers")
+    EMAIL_RATE_LIMIT_PER_SECOND: float = Field(default=10.0, ge=0.0, le=1000.0, description="Max emails sent per second across workers (0 disables)")
+    EMAIL_STATUS_BATCH_SIZE: int = Field(default=50, ge=1, le=1000, description="Delivery statuses written back to notifications per UPDATE")
+    EMAIL_JOB_LEASE_SECONDS: float = Field(default=120.0, ge=10.0, le=3600.0, description="Lease on a queued campaign; its QUEUED rows are failed if the owning process stops renewing it")
+
+    # Chat Message Persistence
+    CHAT_PERSISTENCE_MODE: str = Field(default="sync", description="sync (write in the request), write_behind (buffer in memory) or journaled (buffer + fsynced local journal); buffered modes are read-your-writes only within one worker")
+    CHAT_WRITE_BATCH_SIZE: int = Field(default=200, ge=1, le=10000, description="Buffered chat messages that trigger a flush")
+    CHAT_WRITE_FLUSH_SECONDS: float = Field(default=1.0, ge=0.05, le=60.0, description="Max seconds a chat message waits in the write buffer")
+    CHAT_WRITE_JOURNAL_DIR: str = Field(default="chat_journal", description="Directory for the journaled mode's write-ahead files")
+
     # Password Reset Configuration
     RESET_TOKEN_EXPIRE_HOURS: int = Field(default=24, ge=1, le=168, description="Reset token expiry hours")
     RESET_TOKEN_LENGTH: int = Field(default=32, ge=16, le=64, description="Reset token length")
@@ -98,6 +118,8 @@ class Settings(BaseSettings):
     
     # Security Configuration
     BCRYPT_ROUNDS: int = Field(default=12, ge=10, le=15, description="BCrypt rounds")
+    PASSWORD_HASH_WORKERS: int = Field(default=2, ge=1, le=32, description="Threads hashing/verifying passwords off the event loop")
+    PASSWORD_HASH_QUEUE_SIZE: int = Field(default=32, ge=0, le=1000, description="Password hash calls allowed to wait for a thread before 429")
     SESSION_COOKIE_SECURE: bool = Field(default=True, description="Secure session cookies")
     SESSION_COOKIE_HTTPONLY: bool = Field(default=True, description="HttpOnly session cookies")
     SESSION_COOKIE_SAMESITE: str = Field(default="lax", description="SameSite cookie attribute")
@@ -118,6 +140,12 @@ class Settings(BaseSettings):
     CACHE_TYPE: str = Field(default="memory", description="Cache type: memory, redis")
     REDIS_URL: Optional[str] = Field(default=None, description="Redis connection URL")
     CACHE_DEFAULT_TIMEOUT: int = Field(default=300, ge=1, description="Default cache timeout")
+    TENANCY_CACHE_TTL_SECONDS: int = Field(default=60, ge=0, le=3600, description="TTL for cached user/school membership resolution (0 disables)")
+    TENANCY_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=100, description="Max cached (user, school) tenancy entries per process")
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = Field(default=60, ge=0, le=3600, description="Max seconds a verified JWT and its user snapshot stay cached (never past exp; 0 disables)")
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=100, description="Max cached verified tokens per process")
+    SCHOOL_OVERVIEW_CACHE_TTL_SECONDS: int = Field(default=30, ge=0, le=3600, description="TTL for cached school dashboard overviews (0 disables)")
+    SCHOOL_OVERVIEW_CACHE_MAX_ENTRIES: int = Field(default=5000, ge=100, description="Max cached school overviews per process")
     
     # Feature Flags
     ENABLE_REGISTRATION: bool = Field(default=True, description="Allow new user registration")
@@ -165,6 +193,13 @@ class Settings(BaseSettings):
             raise ValueError("DATABASE_URL must be a valid database connection string (postgresql, postgresql+psycopg, postgresql+psycopg2, or sqlite)")
         return v
     
+    @validator("CHAT_PERSISTENCE_MODE")
+    def validate_chat_persistence_mode(cls, v):
+        allowed_modes = ["sync", "write_behind", "journaled"]
+        if v.lower() not in allowed_modes:
+            raise ValueError(f"CHAT_PERSISTENCE_MODE must be one of: {allowed_modes}")
+        return v.lower()
+    
     @validator("LOG_LEVEL")
     def validate_log_level(cls, v):
         allowed_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
@@ -202,7 +237,18 @@ class Settings(BaseSettings):
     def database_url_sync(self) -> str:
         """Get synchronous database URL"""
         return self.DATABASE_URL.replace("+asyncpg", "").replace("+psycopg2", "")
-    
+
+    @property
+    def database_url_async(self) -> str:
+        """Get asynchronous database URL (psycopg3 async driver for PostgreSQL)"""
+        url = self.DATABASE_URL
+        if url.startswith("sqlite:///"):
+            return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+        for prefix in ("postgresql+psycopg2://", "postgresql+asyncpg://", "postgresql://"):
+            if url.startswith(prefix):
+                return url.replace(prefix, "postgresql+psycopg://", 1)
+        return url
+
     @property
     def max_file_size_bytes(self) -> int:
         """Get max file size in bytes"""
@@ -4,7 +4,10 @@ from sqlalchemy import create_engine, text, event, pool
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from sqlalchemy.engine import Engine
 from sqlalchemy.pool import StaticPool, QueuePool
-from typing import Generator, Optional, Any
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+)
+from typing import AsyncGenerator, Generator, Optional, Any
 import logging
 import time
 import threading
@@ -21,7 +24,10 @@ class DatabaseManager:
     def __init__(self):
         self.engine: Optional[Engine] = None
         self.SessionLocal: Optional[sessionmaker] = None
+        self.async_engine: Optional[AsyncEngine] = None
+        self.AsyncSessionLocal: Optional[async_sessionmaker] = None
         self._initialized = False
+        self._async_initialized = False
         self._lock = threading.Lock()
         self._health_check_enabled = True
         
@@ -100,6 +106,67 @@ class DatabaseManager:
         
         return create_engine(**engine_args)
     
+    def initialize_async(self):
+        """Initialize async engine and session maker (connections are opened lazily)"""
+        if self._async_initialized:
+            return
+        
+        with self._lock:
+            if self._async_initialized:
+                return
+            
+            try:
+                self.async_engine = self._create_async_engine()
+                # expire_on_commit=False: attribute access after commit must not
+                # trigger implicit IO, which AsyncSession cannot do
+                self.AsyncSessionLocal = async_sessionmaker(
+                    bind=self.async_engine,
+                    class_=AsyncSession,
+                    autoflush=False,
+                    expire_on_commit=False
+                )
+                
+                self._async_initialized = True
+                logger.info("Async database engine initialized successfully")
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize async database engine: {e}")
+                raise
+    
+    def _create_async_engine(self) -> AsyncEngine:
+        """Create async SQLAlchemy engine (psycopg3 async driver for PostgreSQL)"""
+        
+        is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+        
+        engine_args = {
+            "url": settings.database_url_async,
+            "echo": settings.DATABASE_ECHO or settings.DEV_LOG_SQL,
+        }
+        
+        if is_sqlite:
+            engine_args.update({
+                "poolclass": StaticPool,
+                "connect_args": {"check_same_thread": False},
+            })
+        else:
+            # Same sizing as the sync pool; the async pool is used by the
+            # request handlers while the sync pool serves threadpool work
+            engine_args.update({
+                "pool_size": settings.DATABASE_POOL_SIZE,
+                "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+                "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+                "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+                "pool_pre_ping": True,
+                "connect_args": {
+                    "connect_timeout": 10,
+                    "application_name": f"school_assistant_async_{settings.ENV}",
+                    "prepare_threshold": 5,
+                    "options": "-c timezone=UTC"
+                }
+            })
+        
+        return create_async_engine(**engine_args)
+    
     def _setup_event_listeners(self):
         """Set up SQLAlchemy event listeners for monitoring and optimization"""
         
@@ -191,6 +258,24 @@ class DatabaseManager:
         finally:
             session.close()
     
+    async def get_async_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Get async database session with automatic cleanup and error handling.
+        
+        Yields:
+            AsyncSession: SQLAlchemy async database session
+        """
+        if not self._async_initialized:
+            self.initialize_async()
+        
+        async with self.AsyncSessionLocal() as session:
+            try:
+                yield session
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Async database session error: {e}")
+                raise
+    
     @contextmanager
     def transaction(self):
         """
@@ -259,10 +344,21 @@ class DatabaseManager:
                 
                 response_time = (time.time() - start_time) * 1000  # Convert to ms
                 
+                async_pool_status = None
+                if self._async_initialized and not settings.DATABASE_URL.startswith("sqlite"):
+                    async_pool = self.async_engine.pool
+                    async_pool_status = {
+                        "size": async_pool.size(),
+                        "checked_out": async_pool.checkedout(),
+                        "overflow": async_pool.overflow(),
+                        "checked_in": async_pool.checkedin(),
+                    }
+                
                 return {
                     "status": "healthy",
                     "response_time_ms": round(response_time, 2),
                     "pool": pool_status,
+                    "async_pool": async_pool_status,
                     "database_url": settings.DATABASE_URL.split("@")[-1] if "@" in settings.DATABASE_URL else "local"
                 }
                 
@@ -277,33 +373,64 @@ class DatabaseManager:
         """
         Set Row Level Security context for PostgreSQL.
         
+        Both settings go out in a single statement and are transaction-local
+        (is_local=true), so they apply to the request's open transaction and
+        cannot leak to the next user of a pooled connection. No commit here:
+        committing would end the transaction and drop the settings again.
+        
         Args:
             session: Database session
             user_id: Current user ID
             school_id: Current school ID
         """
+        if not (user_id or school_id) or session.get_bind().dialect.name != "postgresql":
+            return
         try:
-            if user_id:
-                session.execute(
-                    text("SELECT set_config('myapp.current_user_id', :user_id, true)"),
-                    {"user_id": str(user_id)}
-                )
-            if school_id:
-                session.execute(
-                    text("SELECT set_config('myapp.current_school_id', :school_id, true)"),
-                    {"school_id": str(school_id)}
-                )
-            session.commit()
+            session.execute(
+                text(
+                    "SELECT set_config('myapp.current_user_id', :user_id, true), "
+                    "set_config('myapp.current_school_id', :school_id, true)"
+                ),
+                {"user_id": str(user_id or ""), "school_id": str(school_id or "")}
+            )
         except Exception as e:
             logger.warning(f"Could not set RLS context: {e}")
             session.rollback()
     
+    async def set_rls_context_async(self, session: AsyncSession, user_id: str = None, school_id: str = None):
+        """
+        Set Row Level Security context on an AsyncSession's transaction.
+        
+        Same transaction-local settings as ``set_rls_context``; async handlers
+        must set them on their own session, since settings made on another
+        connection do not apply to its queries.
+        """
+        if not (user_id or school_id) or session.bind.dialect.name != "postgresql":
+            return
+        try:
+            await session.execute(
+                text(
+                    "SELECT set_config('myapp.current_user_id', :user_id, true), "
+                    "set_config('myapp.current_school_id', :school_id, true)"
+                ),
+                {"user_id": str(user_id or ""), "school_id": str(school_id or "")}
+            )
+        except Exception as e:
+            logger.warning(f"Could not set RLS context: {e}")
+            await session.rollback()
+    
     def close(self):
         """Close database connections and cleanup"""
         if self.engine:
             self.engine.dispose()
             logger.info("Database connections closed")
     
+    async def close_async(self):
+        """Close async database connections"""
+        if self.async_engine:
+            await self.async_engine.dispose()
+            logger.info("Async database connections closed")
+    
     def disable_health_checks(self):
         """Disable health checks (useful for testing)"""
         self._health_check_enabled = False
@@ -330,12 +457,35 @@ def get_db() -> Generator[Session, None, None]:
     """
     yield from db_manager.get_session()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency to get an async database session.
+    
+    Use this in ``async def`` handlers so queries do not block the event loop.
+    
+    Usage in FastAPI:
+        @app.get("/users")
+        async def get_users(db: AsyncSession = Depends(get_async_db)):
+            return (await db.execute(select(User))).scalars().all()
+    
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    async for session in db_manager.get_async_session():
+        yield session
+
 def get_engine() -> Engine:
     """Get SQLAlchemy engine instance"""
     if not db_manager._initialized:
         db_manager.initialize()
     return db_manager.engine
 
+def get_async_engine() -> AsyncEngine:
+    """Get SQLAlchemy async engine instance"""
+    if not db_manager._async_initialized:
+        db_manager.initialize_async()
+    return db_manager.async_engine
+
 def get_session_maker() -> sessionmaker:
     """Get session maker for manual session creation"""
     if not db_manager._initialized:
@@ -346,6 +496,10 @@ def set_rls_context(session: Session, user_id: str = None, school_id: str = None
     """Set Row Level Security context (convenience function)"""
     db_manager.set_rls_context(session, user_id, school_id)
 
+async def set_rls_context_async(session: AsyncSession, user_id: str = None, school_id: str = None):
+    """Set Row Level Security context on an AsyncSession (convenience function)"""
+    await db_manager.set_rls_context_async(session, user_id, school_id)
+
 def health_check() -> dict:
     """Get database health status (convenience function)"""
     return db_manager.health_check()
@@ -365,9 +519,12 @@ if not settings.is_development:
 # Export commonly used items
 __all__ = [
     "get_db",
+    "get_async_db",
     "get_engine", 
+    "get_async_engine",
     "get_session_maker",
     "set_rls_context",
+    "set_rls_context_async",
     "health_check",
     "execute_sql",
     "db_manager"
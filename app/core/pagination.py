@@ -0,0 +1,90 @@
+# app/core/pagination.py - Opaque cursors for keyset (seek) pagination, list totals and search terms
+import base64
+import json
+import logging
+from typing import Any, List, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# estimated_count() falls back to an exact count below this many estimated rows
+ESTIMATE_EXACT_BELOW = 10_000
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row on a page.
+
+    Values are stringified, so decode_cursor callers convert them back
+    (int(), UUID(), datetime.fromisoformat(), ...).
+    """
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """Decode a cursor produced by encode_cursor; 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def escape_like(text: str) -> str:
+    """Escape LIKE wildcards so user input matches literally; pair with ilike(..., escape="\\\\")"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def count_statement(query: Select) -> Select:
+    """SELECT count(*) over ``query`` (its ORDER BY dropped) as a subquery"""
+    return select(func.count()).select_from(query.order_by(None).subquery())
+
+
+async def count_rows(db: AsyncSession, query: Select) -> int:
+    """Exact number of rows ``query`` returns, counted in the database"""
+    return (await db.execute(count_statement(query))).scalar_one()
+
+
+async def estimated_count(
+    db: AsyncSession, query: Select, exact_below: int = ESTIMATE_EXACT_BELOW
+) -> Tuple[int, bool]:
+    """
+    (total, is_estimate) for ``query``: the planner's row estimate from
+    EXPLAIN, or an exact count when the estimate is under ``exact_below``
+    (small results are cheap to count and estimates are least accurate
+    there) or the query cannot be explained.
+    """
+    conn = await db.connection()
+    try:
+        sql = str(query.order_by(None).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+        # Savepoint: a failed EXPLAIN must not abort the request's transaction
+        async with conn.begin_nested():
+            plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+    except (SQLAlchemyError, NotImplementedError, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.debug(f"Row estimate unavailable, counting exactly: {e}")
+        estimate = None
+
+    if estimate is None or estimate < exact_below:
+        return await count_rows(db, query), False
+    return estimate, True
+
+
+__all__ = [
+    "NEXT_CURSOR_HEADER", "encode_cursor", "decode_cursor",
+    "escape_like", "count_statement", "count_rows", "estimated_count",
+]
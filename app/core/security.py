@@ -1,6 +1,9 @@
 # app/core/security.py - Authentication utilities (JWT, password hashing, reset tokens)
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, Tuple
+import asyncio
+import logging
 import secrets
 import hashlib
 import hmac
@@ -15,6 +18,8 @@ from email.utils import parseaddr
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Password hashing context with multiple schemes and security settings
 pwd_context = CryptContext(
     schemes=["bcrypt"],
@@ -270,6 +275,27 @@ class PasswordManager:
         except Exception:
             return False
     
+    @staticmethod
+    def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and rehash it if the stored hash is outdated.
+        
+        Args:
+            plain_password: Plain text password
+            hashed_password: Previously hashed password
+            
+        Returns:
+            (matches, new hash or None); a new hash is only returned for a
+            match whose hash needs_update (e.g. BCRYPT_ROUNDS changed)
+        """
+        if not plain_password or not hashed_password:
+            return False, None
+        
+        try:
+            return pwd_context.verify_and_update(plain_password, hashed_password)
+        except Exception:
+            return False, None
+    
     @staticmethod
     def needs_update(hashed_password: str) -> bool:
         """
@@ -376,6 +402,78 @@ class PasswordManager:
             "and one special character. Avoid common patterns and sequences."
         )
 
+class PasswordHashPool:
+    """
+    Runs bcrypt hashing and verification on a bounded thread pool.
+    
+    Each call costs ~250 ms of CPU at BCRYPT_ROUNDS=12; on the event loop
+    that stalls every other request of the worker. bcrypt releases the GIL,
+    so PASSWORD_HASH_WORKERS threads hash in parallel. At most
+    PASSWORD_HASH_QUEUE_SIZE further calls wait for a thread; beyond that
+    callers get 429 with Retry-After instead of an ever-growing backlog.
+    """
+    
+    def __init__(self):
+        self.workers = settings.PASSWORD_HASH_WORKERS
+        self.max_pending = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Only touched on the event loop thread
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+    
+    async def _run(self, func, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning(f"Password hashing saturated ({self._pending} pending), rejecting request")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many sign-in requests in progress, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+    
+    async def hash_password(self, password: str) -> str:
+        """PasswordManager.hash_password off the event loop"""
+        return await self._run(PasswordManager.hash_password, password)
+    
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """PasswordManager.verify_password off the event loop"""
+        return await self._run(PasswordManager.verify_password, plain_password, hashed_password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """PasswordManager.verify_and_update off the event loop (rehashes in the same worker call)"""
+        valid, new_hash = await self._run(PasswordManager.verify_and_update, plain_password, hashed_password)
+        if new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+    
+    def close(self) -> None:
+        """Stop the worker threads (in-flight calls finish)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+        }
+
 class ResetTokenManager:
     """Manages password reset tokens with security features"""
     
@@ -550,6 +648,7 @@ class SecurityUtils:
 # Create global instances
 token_manager = TokenManager()
 password_manager = PasswordManager()
+password_hasher = PasswordHashPool()
 reset_token_manager = ResetTokenManager()
 security_utils = SecurityUtils()
 
@@ -597,8 +696,8 @@ def verify_reset_token(plain_token: str, hashed_token: str) -> bool:
 
 # Export all public functions and classes
 __all__ = [
-    "TokenManager", "PasswordManager", "ResetTokenManager", "SecurityUtils",
-    "token_manager", "password_manager", "reset_token_manager", "security_utils",
+    "TokenManager", "PasswordManager", "PasswordHashPool", "ResetTokenManager", "SecurityUtils",
+    "token_manager", "password_manager", "password_hasher", "reset_token_manager", "security_utils",
     "create_access_token", "decode_token", "hash_password", "verify_password",
     "validate_password_strength", "get_password_strength_message",
     "generate_reset_token", "hash_reset_token", "verify_reset_token",
@@ -7,8 +7,15 @@ import logging
 import traceback
 
 from app.core.config import settings
-from app.core.db import get_engine
+from app.core.db import get_engine, db_manager
+from app.core.security import password_hasher
 from app.models.base import Base
+from app.api.deps.auth import token_cache_stats
+from app.api.deps.tenancy import membership_cache_stats, tenancy_cache_stats
+from app.services.school_overview import school_overview_cache_stats
+from app.services.rasa_client import rasa_client
+from app.services.email_queue import email_queue
+from app.services.chat_writer import chat_writer
 from app.api.routers import (
     auth, schools, chat, students, classes, academic,
     fees, invoices, payments, guardians, notifications,
@@ -39,9 +46,24 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Error creating tables: {e}")
     
+    # Shared, pooled Rasa client (reused across chat turns)
+    await rasa_client.start()
+    
+    # Background email sender workers (notification campaigns); deliveries
+    # of campaigns whose owning process died are failed once their lease expires
+    await email_queue.start()
+    
+    # Write-behind chat message persistence (replays a crashed process's journal)
+    await chat_writer.start()
+    
     yield
     
     logger.info("Shutting down School Assistant API...")
+    await chat_writer.close()
+    await email_queue.close()
+    await rasa_client.close()
+    password_hasher.close()
+    await db_manager.close_async()
 
 # Create FastAPI app
 app = FastAPI(
@@ -90,7 +112,16 @@ async def health_check():
     return {
         "status": "healthy",
         "environment": settings.ENV,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "caches": {
+            "verified_tokens": token_cache_stats(),
+            "tenancy": tenancy_cache_stats(),
+            "memberships": membership_cache_stats(),
+            "school_overview": school_overview_cache_stats()
+        },
+        "password_hasher": password_hasher.stats(),
+        "email_queue": email_queue.stats(),
+        "chat_writer": chat_writer.stats()
     }
 
 # Include routers
@@ -13,10 +13,10 @@ from app.models.academic import AcademicYear, AcademicTerm, EnrollmentStatusEven
 from app.models.enrollment import Enrollment
 from app.models.fee import FeeStructure, FeeItem
 from app.models.payment import Invoice, InvoiceLine, Payment
-from app.models.chat import ChatConversation, ChatMessage
+from app.models.chat import ChatConversation, ChatMessage, ChatContextSnapshot
 from app.models.accounting import GLAccount, JournalEntry, JournalLine
 from app.models.cbc_level import CbcLevel
-from app.models.notification import Notification
+from app.models.notification import Notification, NotificationCampaign
 
 # Import forward references for proper relationship configuration
 from typing import TYPE_CHECKING
@@ -44,9 +44,11 @@ __all__ = [
     "Payment",
     "ChatConversation",
     "ChatMessage",
+    "ChatContextSnapshot",
     "GLAccount",
     "JournalEntry", 
     "JournalLine",
     "CbcLevel",
     "Notification",
+    "NotificationCampaign",
 ]
\ No newline at end of file
@@ -1,6 +1,6 @@
 # app/models/base.py - Independent base model without circular imports
 from sqlalchemy.orm import DeclarativeBase, declared_attr
-from sqlalchemy import MetaData
+from sqlalchemy import DDL, MetaData, event
 
 metadata_obj = MetaData(
     naming_convention={
@@ -12,6 +12,14 @@ metadata_obj = MetaData(
     }
 )
 
+# Trigram (gin_trgm_ops) search indexes need pg_trgm (create_all in dev;
+# migrations create it themselves)
+event.listen(
+    metadata_obj,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 class Base(DeclarativeBase):
     metadata = metadata_obj
 
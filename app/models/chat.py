@@ -1,6 +1,6 @@
 # app/models/chat.py - Updated ChatMessage model with rating support
 import uuid
-from sqlalchemy import Column, String, DateTime, Text, Integer, Boolean, UUID, Enum, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, Integer, Boolean, UUID, Enum, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
@@ -34,6 +34,11 @@ class ChatConversation(Base):
     # Relationships
     messages = relationship("ChatMessage", back_populates="conversation", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Keyset pagination order for a user's conversation list (last_activity, id descending)
+        Index("ix_chat_conversations_user_school_activity", "user_id", "school_id", "last_activity", "id"),
+    )
+    
     def __repr__(self):
         return f"<ChatConversation(id='{self.id}', title='{self.title}', user_id='{self.user_id}')>"
 
@@ -54,6 +59,9 @@ class ChatMessage(Base):
     context_data = Column(JSON, nullable=True)
     response_data = Column(JSON, nullable=True)
     
+    # Rasa metadata the assistant answered with (shared, deduplicated snapshot)
+    context_id = Column(UUID(as_uuid=True), ForeignKey('chat_context_snapshots.id'), nullable=True)
+    
     # Performance metrics
     processing_time_ms = Column(Integer, nullable=True)
     
@@ -66,5 +74,22 @@ class ChatMessage(Base):
     # Relationships
     conversation = relationship("ChatConversation", back_populates="messages")
     
+    __table_args__ = (
+        # Message history pages by (created_at, id) within a conversation
+        Index("ix_chat_messages_conversation_created", "conversation_id", "created_at", "id"),
+    )
+    
+    def __repr__(self):
+        return f"<ChatMessage(id='{self.id}', type='{self.message_type}', rating='{self.rating}')>"
+
+class ChatContextSnapshot(Base):
+    """Rasa metadata (user and active school) shared by the messages answered with it"""
+    __tablename__ = "chat_context_snapshots"
+    
+    # Derived from the content, so identical contexts are stored once
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    data = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    
     def __repr__(self):
-        return f"<ChatMessage(id='{self.id}', type='{self.message_type}', rating='{self.rating}')>"
\ No newline at end of file
+        return f"<ChatContextSnapshot(id='{self.id}')>"
@@ -42,6 +42,11 @@ class FeeStructure(Base):
 
     __table_args__ = (
         Index("ix_fee_structures_school_term_year", "school_id", "term", "year"),
+        # Trigram index so name searches (ILIKE '%x%') do not scan every structure
+        Index(
+            "ix_fee_structures_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
         UniqueConstraint(
             "school_id", "year", "term", "level", "name",
             name="uix_fee_structure_unique"
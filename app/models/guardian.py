@@ -2,7 +2,7 @@
 from __future__ import annotations
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy import String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
@@ -23,6 +23,21 @@ class Guardian(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Directory listing order; pages seek on (last_name, first_name, id)
+        Index("ix_guardians_school_name", "school_id", "last_name", "first_name", "id"),
+        # Trigram index so name/email/phone searches (ILIKE '%x%') do not scan every guardian
+        Index(
+            "ix_guardians_search_trgm", "first_name", "last_name", "email", "phone",
+            postgresql_using="gin",
+            postgresql_ops={
+                "first_name": "gin_trgm_ops", "last_name": "gin_trgm_ops",
+                "email": "gin_trgm_ops", "phone": "gin_trgm_ops",
+            },
+        ),
+    )
+
+
 # Separate model for the many-to-many relationship
 class StudentGuardian(Base):
     __tablename__ = "student_guardians"
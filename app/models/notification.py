@@ -1,18 +1,54 @@
 # app/models/notification.py - Fixed to use correct Base import
-from sqlalchemy import String, Boolean, DateTime
+from sqlalchemy import String, Boolean, DateTime, Integer, Text, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime, timezone
 from app.models.base import Base  # 🔧 FIXED: Import from models.base
 import uuid
 
+class NotificationCampaign(Base):
+    """One email campaign (broadcast, reminders, ...): subject and body stored once for all its deliveries"""
+    __tablename__ = "notification_campaign"
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))  # Same as the email job id
+    school_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    type: Mapped[str] = mapped_column(String(16), nullable=False)  # IN_APP / EMAIL
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)  # broadcast / guardian_message / pending_invoices / ...
+    subject: Mapped[str | None] = mapped_column(String(255))
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    created_by: Mapped[str | None] = mapped_column(String(255))
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    queued_by: Mapped[str | None] = mapped_column(String(128))  # Process holding the email job in memory
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime)  # Renewed by that process; NULL once swept
+
+    __table_args__ = (
+        Index("ix_notification_campaign_school_created", "school_id", "created_at"),
+        # Lease sweeps only look at campaigns that still hold a lease
+        Index(
+            "ix_notification_campaign_lease", "lease_expires_at",
+            postgresql_where=text("lease_expires_at IS NOT NULL")
+        ),
+    )
+
+
 class Notification(Base):
+    """A single message, or one recipient's delivery row of a campaign (subject/body then live on the campaign)"""
     __tablename__ = "notification"  # Keep existing table name if it exists
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    school_id: Mapped[str] = mapped_column(String(36), index=True, nullable=False)
+    school_id: Mapped[str] = mapped_column(String(36), nullable=False)
     type: Mapped[str] = mapped_column(String(16), nullable=False)  # IN_APP / EMAIL
     subject: Mapped[str] = mapped_column(String(255), nullable=True)
-    body: Mapped[str] = mapped_column(String(2000), nullable=False)
+    body: Mapped[str | None] = mapped_column(String(2000))  # NULL on campaign deliveries
     to_guardian_id: Mapped[str | None] = mapped_column(String(36), index=True)
     to_user_id: Mapped[str | None] = mapped_column(String(36), index=True)
     status: Mapped[str] = mapped_column(String(16), default="QUEUED")  # QUEUED/SENT/FAILED
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    campaign_id: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("notification_campaign.id", ondelete="CASCADE"), index=True
+    )  # Also the id of the email job that delivers it
+    error: Mapped[str | None] = mapped_column(String(255))
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # History pages by (created_at, id) descending within a school
+        Index("ix_notification_school_created_id", "school_id", "created_at", "id"),
+    )
@@ -3,11 +3,16 @@ from __future__ import annotations
 import uuid
 from datetime import date, datetime
 from decimal import Decimal
-from sqlalchemy import String, Integer, Numeric, Date, DateTime, ForeignKey, CheckConstraint, Index
+from sqlalchemy import String, Integer, Numeric, Date, DateTime, ForeignKey, CheckConstraint, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
 
+def _initial_balance(context):
+    """New invoices start with nothing paid, so balance defaults to the total"""
+    return context.get_current_parameters().get("total") or Decimal('0.00')
+
+
 class Invoice(Base):
     __tablename__ = "invoices"
 
@@ -20,6 +25,11 @@ class Invoice(Base):
     status: Mapped[str] = mapped_column(String(16), nullable=False, default="DRAFT")  # DRAFT|ISSUED|PAID|PARTIAL|CANCELLED
     due_date: Mapped[date | None] = mapped_column(Date)
     
+    # Denormalized from payments; kept in step by record_payment / cancel_invoice.
+    # balance = max(total - amount_paid, 0), and 0 once CANCELLED.
+    amount_paid: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=Decimal('0.00'), server_default="0")
+    balance: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=_initial_balance, server_default="0")
+    
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -29,9 +39,32 @@ class Invoice(Base):
     __table_args__ = (
         CheckConstraint("status IN ('DRAFT','ISSUED','PAID','PARTIAL','CANCELLED')", name="ck_invoice_status"),
         CheckConstraint("total >= 0", name="ck_invoice_total_positive"),
-        Index("ix_invoices_school_student_term", "school_id", "student_id", "term", "year"),
+        CheckConstraint("amount_paid >= 0", name="ck_invoice_amount_paid_positive"),
+        CheckConstraint("balance >= 0", name="ck_invoice_balance_positive"),
+        # One invoice per student per term; bulk generation relies on it (ON CONFLICT DO NOTHING)
+        UniqueConstraint("school_id", "student_id", "term", "year", name="uix_invoice_student_term"),
+        # Keyset pagination order for invoice listings (year, term, id descending)
+        Index("ix_invoices_school_year_term_id", "school_id", "year", "term", "id"),
+        # "Who still owes" lookups only touch invoices with something outstanding
+        Index("ix_invoices_school_term_unpaid", "school_id", "year", "term", postgresql_where=text("balance > 0")),
     )
 
+    def apply_payment(self, amount: Decimal) -> None:
+        """
+        Add a payment to the running totals and move ISSUED/PARTIAL/PAID along.
+        Callers must hold a row lock on the invoice (SELECT ... FOR UPDATE).
+        """
+        self.amount_paid = (self.amount_paid or Decimal('0.00')) + amount
+        self.balance = max(Decimal('0.00'), self.total - self.amount_paid)
+        # Stays PAID even with overpayment
+        self.status = "PAID" if self.amount_paid >= self.total else "PARTIAL"
+
+    @property
+    def overpayment(self) -> Decimal:
+        if self.status == "CANCELLED":
+            return Decimal('0.00')
+        return max(Decimal('0.00'), (self.amount_paid or Decimal('0.00')) - self.total)
+
 
 class Payment(Base):
     __tablename__ = "payments"
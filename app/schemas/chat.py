@@ -105,6 +105,7 @@ class MessageResponse(BaseModel):
     content: str
     intent: Optional[str] = None
     context_data: Optional[Dict[str, Any]] = None
+    context_id: Optional[str] = None
     response_data: Optional[Dict[str, Any]] = None
     processing_time_ms: Optional[int] = None
     created_at: datetime
@@ -181,6 +182,7 @@ class MessageResponse(BaseModel):
             content=obj.content,
             intent=obj.intent,
             context_data=obj.context_data,
+            context_id=str(obj.context_id) if obj.context_id else None,
             response_data=obj.response_data,
             processing_time_ms=obj.processing_time_ms,
             created_at=obj.created_at,
@@ -198,6 +200,8 @@ class ConversationDetail(BaseModel):
     is_archived: bool
     created_at: datetime
     messages: List[MessageResponse] = []
+    # Older messages exist beyond this page (fetch them with the X-Next-Cursor header)
+    has_older_messages: bool = False
     
     @classmethod
     def from_attributes(cls, obj):
@@ -99,6 +99,14 @@ class InvoiceCreate(BaseModel):
     year: int = Field(..., ge=2020, le=2030)
     due_date: Optional[date] = None
 
+class InvoiceStudentOut(BaseModel):
+    """Student summary embedded in invoice listings with include=student"""
+    id: UUID
+    admission_no: str
+    first_name: str
+    last_name: str
+    full_name: str
+
 class InvoiceOut(BaseModel):
     id: UUID
     student_id: UUID
@@ -112,6 +120,7 @@ class InvoiceOut(BaseModel):
     overpayment: Decimal = Field(default=Decimal('0.00'))  # ADD THIS
     created_at: datetime
     updated_at: datetime
+    student: Optional[InvoiceStudentOut] = None  # Only with include=student
     
     class Config:
         from_attributes = True
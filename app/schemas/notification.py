@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+from datetime import datetime
 
 class NotificationCreate(BaseModel):
     type: str  # EMAIL or IN_APP
@@ -16,6 +17,21 @@ class NotificationOut(BaseModel):
     to_guardian_id: Optional[str]
     to_user_id: Optional[str]
     status: str
+    campaign_id: Optional[str] = None
+    created_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class NotificationCampaignOut(BaseModel):
+    id: str
+    type: str
+    kind: str
+    subject: Optional[str]
+    body: str
+    created_by: Optional[str]
+    total: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 # app/schemas/student.py
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from datetime import date, datetime
 from uuid import UUID
@@ -59,6 +59,8 @@ class StudentList(BaseModel):
     page: int
     limit: int
     has_next: bool
+    # True when total is the planner's estimate (estimate_total=true on a large result)
+    total_is_estimate: bool = False
 
 class StudentSearch(BaseModel):
     admission_no: Optional[str] = None
@@ -66,3 +68,12 @@ class StudentSearch(BaseModel):
     last_name: Optional[str] = None
     class_id: Optional[UUID] = None
     status: Optional[str] = None
+
+class StudentBatchLookup(BaseModel):
+    """Resolve many students at once by id and/or admission number"""
+    ids: List[UUID] = Field(default_factory=list, max_length=500)
+    admission_nos: List[str] = Field(default_factory=list, max_length=500)
+
+class StudentBatchResult(BaseModel):
+    students: List[StudentOut]
+    not_found: List[str] = []
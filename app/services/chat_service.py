@@ -1,12 +1,12 @@
 # app/services/chat_service.py - Enhanced error logging
-import aiohttp
-import asyncio
+import httpx
 import logging
 from typing import Dict, Any, List, Optional
 import json
 
 from app.core.config import settings
 from app.schemas.chat import FileAttachment
+from app.services.rasa_client import rasa_client
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,7 @@ class ChatService:
     def __init__(self):
         self.rasa_url = settings.RASA_URL
         self.rasa_token = settings.RASA_TOKEN
-        self.timeout = aiohttp.ClientTimeout(total=30)
+        self.timeout = settings.RASA_TIMEOUT_SECONDS
         logger.info(f"ChatService initialized with Rasa URL: {self.rasa_url}")
     
     async def send_to_rasa(
@@ -57,46 +57,36 @@ class ChatService:
                 }
             }
             
-            # Add authorization header if token is configured
-            headers = {"Content-Type": "application/json"}
-            if self.rasa_token:
-                headers["Authorization"] = f"Bearer {self.rasa_token}"
-            
+            # Authorization (RASA_TOKEN) is set once on the shared client
             webhook_url = f"{self.rasa_url}/webhooks/rest/webhook"
             logger.info(f"Posting to Rasa webhook: {webhook_url}")
             
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(
-                    webhook_url,
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    
-                    logger.info(f"Rasa response status: {response.status}")
-                    
-                    if response.status == 200:
-                        rasa_responses = await response.json()
-                        logger.info(f"Rasa returned {len(rasa_responses)} response(s)")
-                        logger.debug(f"Rasa responses: {rasa_responses}")
-                        return self._process_rasa_response(rasa_responses, context)
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Rasa error {response.status}: {error_text}")
-                        return self._create_error_response("Rasa service unavailable")
+            response = await rasa_client.post(webhook_url, json=payload)
+            
+            logger.info(f"Rasa response status: {response.status_code}")
+            
+            if response.status_code == 200:
+                rasa_responses = response.json()
+                logger.info(f"Rasa returned {len(rasa_responses)} response(s)")
+                logger.debug(f"Rasa responses: {rasa_responses}")
+                return self._process_rasa_response(rasa_responses, context)
+            else:
+                logger.error(f"Rasa error {response.status_code}: {response.text}")
+                return self._create_error_response("Rasa service unavailable")
         
-        except asyncio.TimeoutError:
-            logger.error(f"Rasa request timeout after {self.timeout.total}s")
+        except httpx.TimeoutException:
+            logger.error(f"Rasa request timeout after {self.timeout}s")
             return self._create_error_response("Request timeout")
         
-        except aiohttp.ClientConnectorError as e:
+        except httpx.ConnectError as e:
             logger.error(f"Cannot connect to Rasa service at {self.rasa_url}")
             logger.error(f"Connection error type: {type(e).__name__}")
             logger.error(f"Connection error details: {str(e)}")
             logger.error(f"Ensure Rasa is running at {self.rasa_url}")
             return self._create_error_response("Chat service unavailable")
         
-        except aiohttp.ClientError as e:
-            logger.error(f"Aiohttp client error: {type(e).__name__}: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP client error: {type(e).__name__}: {str(e)}")
             return self._create_error_response("Chat service error")
         
         except Exception as e:
@@ -267,26 +257,21 @@ class ChatService:
             Health status dictionary
         """
         try:
-            headers = {}
-            if self.rasa_token:
-                headers["Authorization"] = f"Bearer {self.rasa_token}"
-            
             status_url = f"{self.rasa_url}/status"
             logger.info(f"Checking Rasa health at: {status_url}")
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-                async with session.get(status_url, headers=headers) as response:
-                    if response.status == 200:
-                        status_data = await response.json()
-                        logger.info(f"Rasa health check successful: {status_data}")
-                        return {
-                            "healthy": True,
-                            "rasa_version": status_data.get("version", "unknown"),
-                            "model_loaded": status_data.get("model_file") is not None
-                        }
-                    else:
-                        logger.error(f"Rasa health check failed with status {response.status}")
-                        return {"healthy": False, "error": f"HTTP {response.status}"}
+            response = await rasa_client.get(status_url, timeout=10.0, retries=0)
+            if response.status_code == 200:
+                status_data = response.json()
+                logger.info(f"Rasa health check successful: {status_data}")
+                return {
+                    "healthy": True,
+                    "rasa_version": status_data.get("version", "unknown"),
+                    "model_loaded": status_data.get("model_file") is not None
+                }
+            else:
+                logger.error(f"Rasa health check failed with status {response.status_code}")
+                return {"healthy": False, "error": f"HTTP {response.status_code}"}
         
         except Exception as e:
             logger.error(f"Rasa health check failed: {type(e).__name__}: {str(e)}", exc_info=True)
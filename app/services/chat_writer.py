@@ -0,0 +1,384 @@
+# app/services/chat_writer.py - Write-behind persistence for chat messages
+import asyncio
+import fcntl
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, TextIO
+
+from sqlalchemy import DateTime, Integer, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.db import db_manager
+from app.models.chat import ChatContextSnapshot, ChatConversation, ChatMessage, MessageType
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_COLUMNS = [column.key for column in ChatMessage.__table__.columns]
+_UUID_COLUMNS = ("id", "conversation_id", "user_id", "school_id", "context_id")
+_DATETIME_COLUMNS = ("created_at", "rated_at")
+
+# Rasa metadata keys never stored in a context snapshot: credentials, and
+# per-message values (the user's own context is kept on the user message)
+UNSTORED_CONTEXT_KEYS = frozenset({
+    "auth_token", "authorization", "jwt_token", "access_token", "refresh_token", "password",
+    "conversation_id", "context",
+})
+
+# Bumps a conversation by the messages actually inserted for it (one executemany per flush)
+_conversations = ChatConversation.__table__
+_BUMP_CONVERSATION = (
+    update(_conversations)
+    .where(_conversations.c.id == bindparam("conversation"))
+    .values(
+        message_count=_conversations.c.message_count + bindparam("added", type_=Integer),
+        last_activity=func.greatest(_conversations.c.last_activity, bindparam("activity", type_=DateTime)),
+    )
+)
+
+# An open, exclusively locked journal segment
+Segment = Tuple[TextIO, str]
+
+
+def _message_row(message: ChatMessage) -> Dict[str, Any]:
+    """Column values of a (transient) ChatMessage; assigns its id so callers can return it"""
+    if message.id is None:
+        message.id = uuid.uuid4()
+    return {key: getattr(message, key) for key in MESSAGE_COLUMNS}
+
+
+def context_snapshot(metadata: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    ChatContextSnapshot row for the Rasa metadata of a turn, without
+    secrets and per-message keys; its id is a hash of the content, so every
+    turn answered with the same user/school context shares one row
+    """
+    data = {key: value for key, value in (metadata or {}).items() if key not in UNSTORED_CONTEXT_KEYS}
+    if not data:
+        return None
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return {
+        "id": uuid.UUID(bytes=hashlib.sha256(canonical.encode()).digest()[:16]),
+        "data": json.loads(canonical),
+    }
+
+
+def _json_default(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.name
+    raise TypeError(f"Cannot journal {type(value).__name__}")
+
+
+def _decode_turn(line: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """(message rows, context snapshot rows) of one journal line"""
+    turn = json.loads(line)
+    if isinstance(turn, list):
+        turn = {"messages": turn}  # Segment written before context snapshots
+    rows, contexts = turn["messages"], turn.get("contexts", [])
+    for context in contexts:
+        context["id"] = uuid.UUID(context["id"])
+    for row in rows:
+        for key in _UUID_COLUMNS:
+            if row.get(key):
+                row[key] = uuid.UUID(row[key])
+        for key in _DATETIME_COLUMNS:
+            if row.get(key):
+                row[key] = datetime.fromisoformat(row[key])
+        row["message_type"] = MessageType[row["message_type"]]
+    return rows, contexts
+
+
+class ChatWriteBuffer:
+    """
+    Persists chat turns (user + assistant ChatMessage rows, the assistant's
+    context snapshot and the conversation's message_count/last_activity)
+    according to
+    CHAT_PERSISTENCE_MODE:
+
+    - ``sync`` (default): written before record_turn returns.
+    - ``write_behind``: buffered in memory and flushed every
+      CHAT_WRITE_FLUSH_SECONDS or CHAT_WRITE_BATCH_SIZE messages, in one
+      INSERT and one conversation UPDATE per flush. A crash loses the
+      unflushed turns.
+    - ``journaled``: as write_behind, but each turn is first appended and
+      fsynced to a local journal segment in CHAT_WRITE_JOURNAL_DIR. A
+      segment is deleted once its batch is committed; segments left by a
+      crashed process are replayed on startup.
+
+    Writes are idempotent: message ids are assigned up front, inserts skip
+    ids that already exist and conversation counters only count rows that
+    were inserted, so replaying a journal that was partly flushed is safe.
+    Context snapshots are content-addressed and inserted before the messages
+    that reference them; once one is committed, later turns carry only its id.
+
+    Started and stopped by ``app.main.lifespan``; close() flushes. Each
+    process (uvicorn worker) has its own buffer and journal segments, and
+    sync_conversation only flushes its own, so the buffered modes are opt-in:
+    with several workers a history read can miss a turn another worker has
+    not flushed yet.
+    """
+
+    def __init__(self):
+        self.mode = settings.CHAT_PERSISTENCE_MODE
+        self.batch_size = settings.CHAT_WRITE_BATCH_SIZE
+        self.flush_seconds = settings.CHAT_WRITE_FLUSH_SECONDS
+        self.journal_dir = settings.CHAT_WRITE_JOURNAL_DIR
+
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_contexts: Dict[uuid.UUID, Dict[str, Any]] = {}
+        # Snapshot ids known to be in the database (bounded; forgetting one only re-inserts it)
+        self._stored_contexts: set = set()
+        self._journal: Optional[Segment] = None
+        # Segments whose rows went back to _pending after a failed flush
+        self._retained: List[Segment] = []
+        # Held while appending a turn or swapping the buffer, so a turn's journal
+        # line and its buffered rows always belong to the same flush
+        self._append_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Writer metrics
+        self.turns_total = 0
+        self.messages_written = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.last_flush_ms = 0.0
+        self.replayed_messages = 0
+
+    @property
+    def buffered(self) -> bool:
+        return self.mode != "sync"
+
+    async def start(self):
+        """Replay orphaned journal segments and start the flusher (idempotent)"""
+        if not self.buffered or self._task is not None:
+            return
+        if self.mode == "journaled":
+            os.makedirs(self.journal_dir, exist_ok=True)
+            await self.replay_journal()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flusher(), name="chat-writer")
+        logger.info(
+            f"Chat writer started: mode={self.mode}, batch={self.batch_size}, "
+            f"interval={self.flush_seconds}s"
+        )
+
+    async def close(self):
+        """Stop the flusher and write everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._pending:
+            logger.error(f"Chat writer stopped with {len(self._pending)} messages unwritten")
+        elif self._journal is not None:
+            self._discard(self._journal)
+            self._journal = None
+
+    async def record_turn(self, messages: List[ChatMessage], context: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Persist one turn's messages (ids are assigned here if missing) and the
+        context snapshot (from context_snapshot()) they reference, if any
+        """
+        rows = [_message_row(message) for message in messages]
+        contexts = [context] if context and context["id"] not in self._stored_contexts else []
+        self.turns_total += 1
+
+        if not self.buffered:
+            await self._write(rows, contexts)
+            return
+
+        await self.start()
+        async with self._append_lock:
+            if self.mode == "journaled":
+                turn = {"messages": rows, "contexts": contexts}
+                line = json.dumps(turn, default=_json_default, separators=(",", ":")) + "\n"
+                await asyncio.to_thread(self._append, line)
+            self._pending.extend(rows)
+            self._pending_contexts.update((context["id"], context) for context in contexts)
+
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def has_pending(self, conversation_id: uuid.UUID) -> bool:
+        return any(row["conversation_id"] == conversation_id for row in self._pending)
+
+    async def sync_conversation(self, conversation_id: uuid.UUID):
+        """Flush first if the conversation has buffered messages (read-your-writes for this process)"""
+        if self.has_pending(conversation_id):
+            await self.flush()
+
+    def discard_conversation(self, conversation_id: uuid.UUID):
+        """Drop buffered messages of a deleted conversation (a journal replay skips them too)"""
+        self._pending = [row for row in self._pending if row["conversation_id"] != conversation_id]
+
+    async def flush(self):
+        """Write all buffered messages; on failure they stay buffered for the next flush"""
+        async with self._flush_lock:
+            async with self._append_lock:
+                rows, self._pending = self._pending, []
+                contexts, self._pending_contexts = self._pending_contexts, {}
+                segment, self._journal = self._journal, None
+
+            if not rows:
+                if segment is not None:
+                    self._discard(segment)
+                return
+
+            start = time.perf_counter()
+            try:
+                await self._write(rows, list(contexts.values()))
+            except Exception as e:
+                self.flush_failures += 1
+                logger.error(f"Chat writer flush of {len(rows)} messages failed, will retry: {e}")
+                async with self._append_lock:
+                    self._pending[:0] = rows
+                    self._pending_contexts.update(contexts)
+                    if segment is not None:
+                        self._retained.append(segment)
+                return
+
+            self.flushes += 1
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+            for done in self._retained + ([segment] if segment is not None else []):
+                self._discard(done)
+            self._retained = []
+
+    async def replay_journal(self):
+        """Write the turns of journal segments no live process holds (left by a crash)"""
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, "*.jsonl"))):
+            handle = open(path, "a+")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()  # Another worker's live segment
+                continue
+
+            handle.seek(0)
+            rows, contexts = [], []
+            for line in handle:
+                try:
+                    turn_rows, turn_contexts = _decode_turn(line)
+                    rows.extend(turn_rows)
+                    contexts.extend(turn_contexts)
+                except (ValueError, KeyError, TypeError):
+                    # Torn last line: that turn's fsync never completed, so it was never acknowledged
+                    logger.warning(f"Skipping unreadable line in chat journal {path}")
+
+            try:
+                if rows:
+                    await self._write(rows, contexts)
+            except Exception as e:
+                logger.error(f"Replaying chat journal {path} failed, keeping it: {e}")
+                handle.close()
+                continue
+
+            self.replayed_messages += len(rows)
+            logger.info(f"Replayed {len(rows)} chat messages from {path}")
+            self._discard((handle, path))
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Chat writer error: {e}", exc_info=True)
+
+    def _append(self, line: str):
+        """Append one turn to the current journal segment and fsync it (runs in a thread)"""
+        if self._journal is None:
+            path = os.path.join(self.journal_dir, f"{uuid.uuid4().hex}.jsonl")
+            handle = open(path, "a")
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._journal = (handle, path)
+        handle = self._journal[0]
+        handle.write(line)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    @staticmethod
+    def _discard(segment: Segment):
+        # Unlink before closing: closing drops the lock, and a starting worker could replay it
+        handle, path = segment
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        handle.close()
+
+    async def _write(self, rows: List[Dict[str, Any]], contexts: Optional[List[Dict[str, Any]]] = None):
+        """Insert snapshots and messages (skipping known ids) and bump their conversations, in one transaction"""
+        async for session in db_manager.get_async_session():
+            if contexts:
+                await session.execute(
+                    pg_insert(ChatContextSnapshot).on_conflict_do_nothing(index_elements=["id"]),
+                    [{"id": context["id"], "data": context["data"]} for context in contexts],
+                )
+
+            conversation_ids = {row["conversation_id"] for row in rows}
+            existing = set((await session.execute(
+                select(ChatConversation.id).where(ChatConversation.id.in_(conversation_ids))
+            )).scalars())
+            if len(existing) < len(conversation_ids):
+                logger.warning(f"Dropping chat messages of {len(conversation_ids - existing)} deleted conversation(s)")
+                rows = [row for row in rows if row["conversation_id"] in existing]
+
+            if rows:
+                inserted = (await session.execute(
+                    pg_insert(ChatMessage)
+                    .on_conflict_do_nothing(index_elements=["id"])
+                    .returning(ChatMessage.conversation_id, ChatMessage.created_at),
+                    rows,
+                )).all()
+
+                activity: Dict[uuid.UUID, List[Any]] = {}
+                for conversation_id, created_at in inserted:
+                    added, latest = activity.get(conversation_id, (0, created_at))
+                    activity[conversation_id] = [added + 1, max(latest, created_at)]
+
+                if activity:
+                    await session.execute(_BUMP_CONVERSATION, [
+                        {"conversation": conversation_id, "added": added, "activity": latest}
+                        for conversation_id, (added, latest) in activity.items()
+                    ])
+                self.messages_written += len(inserted)
+
+            await session.commit()
+
+        if len(self._stored_contexts) > 10_000:
+            self._stored_contexts.clear()
+        self._stored_contexts.update(context["id"] for context in contexts or [])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "pending": len(self._pending),
+            "turns_total": self.turns_total,
+            "messages_written": self.messages_written,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "last_flush_ms": self.last_flush_ms,
+            "replayed_messages": self.replayed_messages,
+        }
+
+
+# Singleton instance
+chat_writer = ChatWriteBuffer()
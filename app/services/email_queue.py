@@ -0,0 +1,369 @@
+# app/services/email_queue.py - Background email jobs: worker pool, rate limiting, status write-back
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.db import db_manager
+from app.models.notification import Notification, NotificationCampaign
+from app.services.email_service import email_service
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept in memory for status polling (older ones are answered from the DB)
+MAX_TRACKED_JOBS = 500
+# Per-recipient errors kept on the job for the status endpoint
+MAX_JOB_ERRORS = 20
+# Error recorded on delivery rows whose job was lost with the process holding it
+LOST_JOB_ERROR = "Not sent: the server holding the job stopped before delivery"
+
+# Recorded on each campaign as the process that holds its job in memory
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class OutgoingEmail:
+    """One recipient's message; notification_id is the row its status is written to"""
+    notification_id: str
+    to_email: str
+    subject: str
+    body_text: str
+    body_html: Optional[str] = None
+    guardian_id: Optional[str] = None
+
+
+@dataclass
+class EmailJob:
+    """A campaign queued by one request"""
+    school_id: str
+    kind: str
+    created_by: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    status: str = "QUEUED"  # QUEUED/RUNNING/COMPLETED
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    errors: List[str] = field(default_factory=list)
+    # True while the request is still adding chunks of messages
+    staging: bool = False
+    # Why the request stopped adding chunks early; only what was queued is sent
+    staging_error: Optional[str] = None
+
+    # Statuses not yet written back to the notification table
+    _sent_ids: List[str] = field(default_factory=list, repr=False)
+    _failed: List[Tuple[str, str]] = field(default_factory=list, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return not self.staging and self.sent + self.failed >= self.total
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "sent": self.sent,
+            "failed": self.failed,
+            "pending": self.total - self.sent - self.failed,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "errors": self.errors,
+            "partial": self.staging_error is not None,
+            "staging_error": self.staging_error,
+        }
+
+
+class RateLimiter:
+    """Token bucket shared by every sender worker (rate <= 0 disables it)"""
+
+    def __init__(self, per_second: float):
+        self.rate = per_second
+        self.capacity = max(1.0, per_second)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class EmailJobQueue:
+    """
+    In-process email job queue.
+
+    Endpoints write the job's NotificationCampaign row and one QUEUED
+    Notification delivery row per recipient, commit, and submit the job;
+    they return its id immediately. Large campaigns commit and ``add``
+    their messages a chunk at a time, then ``seal`` the job. EMAIL_QUEUE_WORKERS
+    workers send through the pooled SMTP connections of ``email_service``
+    (in threads, smtplib is blocking), throttled by a shared rate limit, and
+    write SENT/FAILED back to the notification rows in batches.
+
+    Workers are started and stopped by ``app.main.lifespan``. Delivery is
+    at most once: messages are held only in process memory, so those still
+    queued when the process stops are lost (bodies are not stored per row,
+    so they cannot be resent). Each campaign records the owning process and
+    a lease, which that process renews every EMAIL_JOB_LEASE_SECONDS / 3
+    while the job is unfinished. Every process also sweeps campaigns whose
+    lease has expired and marks their QUEUED rows FAILED, so a dead worker's
+    deliveries are failed without touching those of live workers.
+    """
+
+    def __init__(self):
+        self.worker_count = settings.EMAIL_QUEUE_WORKERS
+        self.status_batch_size = settings.EMAIL_STATUS_BATCH_SIZE
+        self._limiter = RateLimiter(settings.EMAIL_RATE_LIMIT_PER_SECOND)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._lease_task: Optional[asyncio.Task] = None
+        self.lease_seconds = settings.EMAIL_JOB_LEASE_SECONDS
+        self.jobs: "OrderedDict[str, EmailJob]" = OrderedDict()
+
+        # Queue metrics
+        self.jobs_total = 0
+        self.sent_total = 0
+        self.failed_total = 0
+
+    async def start(self):
+        """Start the sender workers and the lease keeper (idempotent)"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"email-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        self._lease_task = asyncio.create_task(self._keep_leases(), name="email-leases")
+        logger.info(f"Email queue {INSTANCE_ID} started with {self.worker_count} workers")
+
+    def lease_expires_at(self) -> datetime:
+        """Lease deadline for a campaign this process is (still) holding"""
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def _keep_leases(self):
+        while True:
+            try:
+                await self.renew_leases()
+                await self.fail_lost_deliveries()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email lease upkeep failed: {e}")
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    async def renew_leases(self) -> None:
+        """Extend the lease of every unfinished job held by this process"""
+        active = [job.id for job in self.jobs.values() if not job.done]
+        if not active:
+            return
+        async for session in db_manager.get_async_session():
+            await session.execute(
+                update(NotificationCampaign)
+                .where(NotificationCampaign.id.in_(active))
+                .values(queued_by=INSTANCE_ID, lease_expires_at=self.lease_expires_at())
+            )
+            await session.commit()
+
+    async def fail_lost_deliveries(self) -> int:
+        """
+        Mark FAILED the QUEUED rows of campaigns whose lease has expired.
+
+        The lease is cleared in the same UPDATE that claims the campaign, so
+        concurrent sweeps in other processes claim each campaign once.
+        """
+        async for session in db_manager.get_async_session():
+            expired = (await session.execute(
+                update(NotificationCampaign)
+                .where(NotificationCampaign.lease_expires_at < datetime.utcnow())
+                .values(lease_expires_at=None)
+                .returning(NotificationCampaign.id, NotificationCampaign.queued_by)
+            )).all()
+            lost = 0
+            if expired:
+                result = await session.execute(
+                    update(Notification)
+                    .where(
+                        Notification.campaign_id.in_([campaign_id for campaign_id, _ in expired]),
+                        Notification.status == "QUEUED",
+                    )
+                    .values(status="FAILED", error=LOST_JOB_ERROR)
+                )
+                lost = result.rowcount or 0
+            await session.commit()
+        if lost:
+            owners = sorted({owner or "unknown" for _, owner in expired})
+            logger.warning(f"Marked {lost} email deliveries FAILED (lease expired, owners: {', '.join(owners)})")
+        return lost
+
+    async def close(self):
+        """Stop the workers, write back finished statuses and log out of SMTP"""
+        tasks = self._workers + ([self._lease_task] if self._lease_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._lease_task = None
+
+        for job in self.jobs.values():
+            try:
+                await self._flush(job)
+            except Exception as e:
+                logger.error(f"Failed to write back statuses for email job {job.id}: {e}")
+
+        await asyncio.to_thread(email_service.pool.close)
+        if self._queue is not None and self._queue.qsize():
+            logger.warning(
+                f"Email queue stopped with {self._queue.qsize()} messages unsent "
+                f"(left QUEUED until their lease expires)"
+            )
+
+    async def submit(self, job: EmailJob, emails: List[OutgoingEmail]) -> EmailJob:
+        """Queue all of a job's messages; their notification rows must already be committed"""
+        await self.add(job, emails)
+        return await self.seal(job)
+
+    async def add(self, job: EmailJob, emails: List[OutgoingEmail]) -> EmailJob:
+        """
+        Queue one chunk of a job's messages (rows already committed). The job
+        cannot complete until ``seal`` is called, however fast workers drain it.
+        """
+        await self.start()
+
+        if job.id not in self.jobs:
+            job.staging = True
+            self.jobs[job.id] = job
+            self.jobs_total += 1
+            self._forget_old_jobs()
+
+        job.total += len(emails)
+        for email in emails:
+            self._queue.put_nowait((job, email))
+        return job
+
+    async def seal(self, job: EmailJob) -> EmailJob:
+        """Mark a job's messages as all queued"""
+        if job.id not in self.jobs:
+            await self.add(job, [])
+        job.staging = False
+        logger.info(f"Email job {job.id} ({job.kind}) queued {job.total} messages for school {job.school_id}")
+        await self._complete_if_done(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[EmailJob]:
+        return self.jobs.get(job_id)
+
+    def _forget_old_jobs(self):
+        while len(self.jobs) > MAX_TRACKED_JOBS:
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if not oldest.done:
+                break
+            del self.jobs[oldest_id]
+
+    async def _worker(self):
+        while True:
+            job, email = await self._queue.get()
+            try:
+                await self._limiter.acquire()
+                if job.started_at is None:
+                    job.started_at = datetime.utcnow()
+                    job.status = "RUNNING"
+
+                error = await asyncio.to_thread(
+                    email_service.deliver, email.to_email, email.subject, email.body_text, email.body_html
+                )
+                await self._record(job, email, error)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email worker error for job {job.id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _record(self, job: EmailJob, email: OutgoingEmail, error: Optional[str]):
+        if error:
+            job.failed += 1
+            self.failed_total += 1
+            job._failed.append((email.notification_id, error[:255]))
+            if len(job.errors) < MAX_JOB_ERRORS:
+                job.errors.append(f"{email.to_email}: {error}")
+            logger.warning(f"Email to {email.to_email} failed (job {job.id}): {error}")
+        else:
+            job.sent += 1
+            self.sent_total += 1
+            job._sent_ids.append(email.notification_id)
+
+        pending_writes = len(job._sent_ids) + len(job._failed)
+        if job.done or pending_writes >= self.status_batch_size:
+            await self._flush(job)
+
+        await self._complete_if_done(job)
+
+    async def _complete_if_done(self, job: EmailJob):
+        if job.done and job.status != "COMPLETED":
+            await self._flush(job)
+            job.status = "COMPLETED"
+            job.finished_at = datetime.utcnow()
+            logger.info(f"Email job {job.id} completed: {job.sent} sent, {job.failed} failed")
+
+    async def _flush(self, job: EmailJob):
+        """Write buffered per-recipient statuses to the notification rows"""
+        sent_ids, failed = job._sent_ids, job._failed
+        if not sent_ids and not failed:
+            return
+        job._sent_ids, job._failed = [], []
+
+        now = datetime.utcnow()
+        async for session in db_manager.get_async_session():
+            if sent_ids:
+                await session.execute(
+                    update(Notification)
+                    .where(Notification.id.in_(sent_ids))
+                    .values(status="SENT", sent_at=now, error=None)
+                )
+            if failed:
+                # ORM bulk UPDATE by primary key: one executemany for all failures
+                await session.execute(
+                    update(Notification),
+                    [{"id": nid, "status": "FAILED", "error": error} for nid, error in failed],
+                )
+            await session.commit()
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "rate_limit_per_second": self._limiter.rate,
+            "jobs_total": self.jobs_total,
+            "sent_total": self.sent_total,
+            "failed_total": self.failed_total,
+            "smtp_pool": email_service.pool.stats(),
+        }
+
+
+# Singleton instance
+email_queue = EmailJobQueue()
@@ -1,7 +1,11 @@
 import smtplib
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import logging
 from jinja2 import Template
 
@@ -10,6 +14,117 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 
+def _smtp_text(reply) -> str:
+    """SMTP server replies arrive as bytes"""
+    return reply.decode(errors="replace") if isinstance(reply, bytes) else str(reply)
+
+
+class SMTPConnectionPool:
+    """
+    Small pool of connected, authenticated SMTP sessions.
+
+    Opening a connection costs a TCP handshake, STARTTLS and LOGIN; a pooled
+    connection pays that once and then sends many messages. Connections are
+    checked out by one thread at a time; ones idle longer than
+    SMTP_POOL_IDLE_SECONDS are probed with NOOP before reuse.
+    """
+
+    def __init__(self, service: "EmailService"):
+        self.service = service
+        self.size = settings.SMTP_POOL_SIZE
+        self.idle_seconds = settings.SMTP_POOL_IDLE_SECONDS
+        self._idle: "queue.LifoQueue[Tuple[smtplib.SMTP, float]]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+        # Pool metrics
+        self.connections_opened = 0
+        self.reused = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        svc = self.service
+        if svc.use_ssl:
+            server = smtplib.SMTP_SSL(svc.smtp_host, svc.smtp_port, timeout=svc.timeout)
+        else:
+            server = smtplib.SMTP(svc.smtp_host, svc.smtp_port, timeout=svc.timeout)
+            if svc.use_tls:
+                server.starttls()
+        # Local debugging servers usually take mail without authentication
+        if svc.smtp_user and svc.smtp_password:
+            server.login(svc.smtp_user, svc.smtp_password)
+        self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _discard(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - last_used < self.idle_seconds:
+                self.reused += 1
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    self.reused += 1
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(server)
+
+    @staticmethod
+    def _drop(server: Optional[smtplib.SMTP]) -> None:
+        if server is not None:
+            server.close()
+        return None
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; broken connections are dropped instead of returned"""
+        self._slots.acquire()
+        server = None
+        try:
+            server = self._checkout()
+            yield server
+        except smtplib.SMTPServerDisconnected:
+            server = self._drop(server)
+            raise
+        except smtplib.SMTPException:
+            # Protocol-level refusal; the session itself is still usable
+            raise
+        except OSError:
+            server = self._drop(server)
+            raise
+        finally:
+            if server is not None:
+                self._idle.put((server, time.monotonic()))
+            self._slots.release()
+
+    def close(self):
+        """Log out of every idle connection"""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(server)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "connections_opened": self.connections_opened,
+            "reused": self.reused,
+        }
+
+
 class EmailService:
     """Email service using SMTP (Brevo)"""
     
@@ -21,6 +136,78 @@ class EmailService:
         self.from_email = settings.SMTP_FROM_EMAIL
         self.from_name = settings.SMTP_FROM_NAME
         self.use_tls = settings.SMTP_USE_TLS
+        self.use_ssl = settings.SMTP_USE_SSL
+        self.timeout = settings.SMTP_TIMEOUT_SECONDS
+        self.pool = SMTPConnectionPool(self)
+    
+    def build_message(
+        self,
+        to_email: str,
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None,
+        reply_to: Optional[str] = None
+    ) -> MIMEMultipart:
+        """Build the MIME message for one recipient"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = f"{self.from_name} <{self.from_email}>"
+        msg['To'] = to_email
+        
+        if reply_to:
+            msg['Reply-To'] = reply_to
+        
+        # Attach text version
+        text_part = MIMEText(body_text, 'plain', 'utf-8')
+        msg.attach(text_part)
+        
+        # Attach HTML version if provided
+        if body_html:
+            html_part = MIMEText(body_html, 'html', 'utf-8')
+            msg.attach(html_part)
+        
+        return msg
+    
+    def deliver(
+        self,
+        to_email: str,
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None,
+        reply_to: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Send one email over a pooled connection (blocking).
+        
+        Returns None on success or the error text. A pooled connection the
+        server has since closed is retried once on a fresh connection.
+        """
+        msg = self.build_message(to_email, subject, body_text, body_html, reply_to)
+        
+        for attempt in range(2):
+            try:
+                with self.pool.connection() as server:
+                    try:
+                        server.send_message(msg)
+                    except smtplib.SMTPServerDisconnected:
+                        raise
+                    except smtplib.SMTPException:
+                        # Rejected message: reset the transaction so the connection stays usable
+                        server.rset()
+                        raise
+                return None
+            except smtplib.SMTPServerDisconnected as e:
+                if attempt == 0:
+                    continue
+                return f"SMTP connection lost: {e}"
+            except smtplib.SMTPRecipientsRefused as e:
+                code, reply = next(iter(e.recipients.values()))
+                return f"{code} {_smtp_text(reply)}"
+            except smtplib.SMTPResponseException as e:
+                return f"{e.smtp_code} {_smtp_text(e.smtp_error)}"
+            except Exception as e:
+                return str(e) or e.__class__.__name__
+        return None
     
     def send_email(
         self,
@@ -31,38 +218,13 @@ class EmailService:
         reply_to: Optional[str] = None
     ) -> bool:
         """Send an email via SMTP"""
-        try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            
-            if reply_to:
-                msg['Reply-To'] = reply_to
-            
-            # Attach text version
-            text_part = MIMEText(body_text, 'plain', 'utf-8')
-            msg.attach(text_part)
-            
-            # Attach HTML version if provided
-            if body_html:
-                html_part = MIMEText(body_html, 'html', 'utf-8')
-                msg.attach(html_part)
-            
-            # Connect and send
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.use_tls:
-                    server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-            
-            logger.info(f"Email sent successfully to {to_email}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {e}", exc_info=True)
+        error = self.deliver(to_email, subject, body_text, body_html, reply_to)
+        if error:
+            logger.error(f"Failed to send email to {to_email}: {error}")
             return False
+        
+        logger.info(f"Email sent successfully to {to_email}")
+        return True
     
     def send_bulk_emails(
         self,
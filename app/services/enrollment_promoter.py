@@ -0,0 +1,188 @@
+# app/services/enrollment_promoter.py - Set-based promotion of a term's enrollments into the next term
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.class_model import Class
+from app.models.enrollment import Enrollment
+
+logger = logging.getLogger(__name__)
+
+# ON CONFLICT target: the uq_enrollment_student_term unique index
+ENROLLMENT_CONFLICT_COLUMNS = ["school_id", "student_id", "term_id"]
+
+
+class PromotionError(ValueError):
+    """The promotion request cannot be applied (e.g. it maps to a class of another school)"""
+
+
+@dataclass
+class PromotionChange:
+    """What promotion does to one student's enrollment in the target term"""
+    student_id: uuid.UUID
+    from_class_id: uuid.UUID
+    to_class_id: uuid.UUID
+    action: str  # create | update | unchanged
+
+    def as_dict(self) -> Dict[str, str]:
+        return {
+            "student_id": str(self.student_id),
+            "from_class_id": str(self.from_class_id),
+            "to_class_id": str(self.to_class_id),
+            "action": self.action,
+        }
+
+
+@dataclass
+class PromotionResult:
+    """Counts of one promotion run plus, for dry runs, the per-student diff"""
+    created: int
+    updated: int
+    unchanged: int
+    elapsed_ms: float
+    dry_run: bool
+    changes: List[PromotionChange] = field(default_factory=list)
+
+    @property
+    def promoted(self) -> int:
+        return self.created + self.updated
+
+
+def plan_promotion(
+    enrollments: Sequence[tuple],
+    existing: Dict[uuid.UUID, tuple],
+    class_mappings: Dict[uuid.UUID, uuid.UUID],
+) -> List[PromotionChange]:
+    """
+    Target enrollment for each (student_id, class_id) source enrollment.
+
+    ``existing`` maps student_id to the (class_id, status) already held in
+    the target term; a student already ENROLLED in the target class is
+    unchanged, any other existing row is updated.
+    """
+    changes = []
+    for student_id, class_id in enrollments:
+        target_class_id = class_mappings.get(class_id, class_id)
+        current = existing.get(student_id)
+        if current is None:
+            action = "create"
+        elif current == (target_class_id, "ENROLLED"):
+            action = "unchanged"
+        else:
+            action = "update"
+        changes.append(PromotionChange(student_id, class_id, target_class_id, action))
+    return changes
+
+
+def promote_enrollments(
+    db: Session,
+    school_id: uuid.UUID,
+    source_term_id: uuid.UUID,
+    target_term_id: uuid.UUID,
+    student_ids: Optional[Sequence[uuid.UUID]] = None,
+    class_mappings: Optional[Dict[uuid.UUID, uuid.UUID]] = None,
+    dry_run: bool = False,
+) -> PromotionResult:
+    """
+    Enroll the source term's ENROLLED students (or ``student_ids`` of them)
+    in the target term, moving them along ``class_mappings``.
+
+    The source enrollments and the target term's existing enrollments are
+    read with one query each and the plan is computed in memory. Rows that
+    change are written with one batched INSERT ... ON CONFLICT DO UPDATE on
+    (school_id, student_id, term_id); the update only fires when the class
+    or status actually differs, so re-running (or racing) is harmless.
+    With ``dry_run`` nothing is written and the per-student diff is returned.
+    The caller commits.
+    """
+    started = time.perf_counter()
+    class_mappings = class_mappings or {}
+
+    source = select(Enrollment.student_id, Enrollment.class_id).where(
+        Enrollment.school_id == school_id,
+        Enrollment.term_id == source_term_id,
+        Enrollment.status == "ENROLLED",
+    )
+    if student_ids is not None:
+        source = source.where(Enrollment.student_id.in_(student_ids))
+    enrollments = db.execute(source).all()
+
+    if class_mappings:
+        known = set(db.execute(
+            select(Class.id).where(Class.school_id == school_id, Class.id.in_(set(class_mappings.values())))
+        ).scalars())
+        unknown = set(class_mappings.values()) - known
+        if unknown:
+            raise PromotionError(f"Unknown target class: {', '.join(sorted(str(c) for c in unknown))}")
+
+    existing = {
+        student_id: (class_id, status)
+        for student_id, class_id, status in db.execute(
+            select(Enrollment.student_id, Enrollment.class_id, Enrollment.status).where(
+                Enrollment.school_id == school_id,
+                Enrollment.term_id == target_term_id,
+                Enrollment.student_id.in_(source.with_only_columns(Enrollment.student_id)),
+            )
+        ).all()
+    }
+
+    changes = plan_promotion(enrollments, existing, class_mappings)
+    pending = [change for change in changes if change.action != "unchanged"]
+
+    if pending and not dry_run:
+        now, today = datetime.utcnow(), date.today()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "school_id": school_id,
+                "student_id": change.student_id,
+                "class_id": change.to_class_id,
+                "term_id": target_term_id,
+                "status": "ENROLLED",
+                "enrolled_date": today,
+                "withdrawn_date": None,
+                "invoice_generated": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for change in pending
+        ]
+        stmt = pg_insert(Enrollment)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=ENROLLMENT_CONFLICT_COLUMNS,
+            set_={
+                "class_id": stmt.excluded.class_id,
+                "status": stmt.excluded.status,
+                "enrolled_date": stmt.excluded.enrolled_date,
+                "withdrawn_date": None,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=or_(
+                Enrollment.class_id != stmt.excluded.class_id,
+                Enrollment.status != stmt.excluded.status,
+            ),
+        )
+        # RETURNING makes the driver use SQLAlchemy's batched multi-row form
+        db.execute(stmt.returning(Enrollment.id), rows)
+
+    result = PromotionResult(
+        created=sum(change.action == "create" for change in changes),
+        updated=sum(change.action == "update" for change in changes),
+        unchanged=len(changes) - len(pending),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        dry_run=dry_run,
+        changes=changes if dry_run else [],
+    )
+    logger.info(
+        f"{'Planned' if dry_run else 'Applied'} promotion of {len(changes)} students for school {school_id} "
+        f"({source_term_id} -> {target_term_id}): {result.created} created, {result.updated} updated, "
+        f"{result.unchanged} unchanged in {result.elapsed_ms:.0f}ms"
+    )
+    return result
@@ -0,0 +1,142 @@
+# app/services/invoice_generator.py - Set-based invoice generation for a term
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.fee import FeeItem
+from app.models.payment import Invoice, InvoiceLine
+
+logger = logging.getLogger(__name__)
+
+# One invoice per student per term; concurrent runs skip rows the other run inserted
+INVOICE_UNIQUE_CONSTRAINT = "uix_invoice_student_term"
+
+
+@dataclass
+class GenerationResult:
+    """Invoices inserted by one run plus what was skipped and how long it took"""
+    invoices: List[Invoice]
+    lines_created: int
+    skipped_existing: int
+    skipped_conflict: int
+    elapsed_ms: float
+
+
+def items_by_class(
+    items: Sequence[FeeItem], class_ids: Sequence[Optional[uuid.UUID]]
+) -> Dict[Optional[uuid.UUID], Tuple[List[FeeItem], Decimal]]:
+    """
+    Applicable items and their total for each class.
+
+    General items (class_id NULL) apply to everyone; class-specific items
+    only to that class. Item order is kept so invoice lines read like the
+    fee structure.
+    """
+    plans = {}
+    for class_id in set(class_ids):
+        applicable = [item for item in items if item.class_id is None or item.class_id == class_id]
+        plans[class_id] = (applicable, sum((item.amount for item in applicable), Decimal('0.00')))
+    return plans
+
+
+async def generate_term_invoices(
+    db: AsyncSession,
+    school_id: uuid.UUID,
+    term: int,
+    year: int,
+    students: Sequence[Tuple[uuid.UUID, Optional[uuid.UUID]]],
+    items: Sequence[FeeItem],
+    due_date: date,
+) -> GenerationResult:
+    """
+    Create DRAFT invoices (and lines) for ``students`` given as (id, class_id).
+
+    Students already invoiced for the term are found with one query; the
+    rest are inserted with batched multi-row INSERTs. ON CONFLICT DO NOTHING
+    against the (school, student, term, year) constraint makes overlapping
+    runs safe: only invoices this run actually inserted get lines.
+    The caller commits.
+    """
+    started = time.perf_counter()
+
+    existing = set((await db.execute(
+        select(Invoice.student_id).where(
+            Invoice.school_id == school_id,
+            Invoice.term == term,
+            Invoice.year == year,
+        )
+    )).scalars())
+
+    pending = [(student_id, class_id) for student_id, class_id in students if student_id not in existing]
+    plans = items_by_class(items, [class_id for _, class_id in pending])
+
+    now = datetime.utcnow()
+    invoice_rows, lines_by_invoice = [], {}
+    for student_id, class_id in pending:
+        applicable, total = plans[class_id]
+        invoice_id = uuid.uuid4()
+        invoice_rows.append({
+            "id": invoice_id,
+            "school_id": school_id,
+            "student_id": student_id,
+            "term": term,
+            "year": year,
+            "total": total,
+            "amount_paid": Decimal('0.00'),
+            "balance": total,
+            "status": "DRAFT",
+            "due_date": due_date,
+            "created_at": now,
+            "updated_at": now,
+        })
+        lines_by_invoice[invoice_id] = applicable
+
+    invoices: List[Invoice] = []
+    if invoice_rows:
+        # executemany + RETURNING: SQLAlchemy batches this into multi-row INSERTs
+        stmt = (
+            pg_insert(Invoice)
+            .on_conflict_do_nothing(constraint=INVOICE_UNIQUE_CONSTRAINT)
+            .returning(Invoice)
+        )
+        invoices = list((await db.scalars(stmt, invoice_rows)).all())
+
+    line_rows = [
+        {
+            "id": uuid.uuid4(),
+            "school_id": school_id,
+            "invoice_id": invoice.id,
+            "item_name": item.item_name,
+            "amount": item.amount,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for invoice in invoices
+        for item in lines_by_invoice[invoice.id]
+    ]
+    if line_rows:
+        # RETURNING makes psycopg use SQLAlchemy's batched multi-row form; a plain
+        # executemany would send one INSERT per line
+        await db.execute(insert(InvoiceLine).returning(InvoiceLine.id), line_rows)
+
+    result = GenerationResult(
+        invoices=invoices,
+        lines_created=len(line_rows),
+        skipped_existing=len(students) - len(pending),
+        skipped_conflict=len(invoice_rows) - len(invoices),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+    logger.info(
+        f"Generated {len(invoices)} invoices / {result.lines_created} lines for school {school_id} "
+        f"T{term} {year} in {result.elapsed_ms:.0f}ms "
+        f"(skipped {result.skipped_existing} existing, {result.skipped_conflict} concurrent)"
+    )
+    return result
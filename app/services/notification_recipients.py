@@ -0,0 +1,165 @@
+# app/services/notification_recipients.py - Set-based recipient resolution for notification campaigns
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import Select, and_, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.guardian import Guardian, StudentGuardian
+from app.models.payment import Invoice
+from app.models.student import Student
+
+# Rows fetched per round trip from the server-side cursor
+RECIPIENT_CHUNK_SIZE = 500
+
+# Invoice statuses that get payment reminders
+REMINDER_INVOICE_STATUSES = ("ISSUED", "PARTIAL")
+
+
+@dataclass(frozen=True)
+class Recipient:
+    """
+    One campaign row: a guardian, plus the student (and invoice) it is about.
+
+    guardian_id/email are None when the student has no usable guardian;
+    campaigns report those rows as skipped.
+    """
+    guardian_id: Optional[uuid.UUID]
+    guardian_first_name: Optional[str]
+    guardian_last_name: Optional[str]
+    email: Optional[str]
+    student_id: Optional[uuid.UUID] = None
+    student_first_name: Optional[str] = None
+    student_last_name: Optional[str] = None
+    admission_no: Optional[str] = None
+    invoice_id: Optional[uuid.UUID] = None
+    invoice_total: Optional[Decimal] = None
+    invoice_balance: Optional[Decimal] = None
+    due_date: Optional[date] = None
+
+    @property
+    def guardian_name(self) -> str:
+        return f"{self.guardian_first_name} {self.guardian_last_name}"
+
+    @property
+    def student_name(self) -> str:
+        return f"{self.student_first_name} {self.student_last_name}"
+
+    @classmethod
+    def from_row(cls, row) -> "Recipient":
+        return cls(**row._mapping)
+
+
+GUARDIAN_COLUMNS = (
+    Guardian.id.label("guardian_id"),
+    Guardian.first_name.label("guardian_first_name"),
+    Guardian.last_name.label("guardian_last_name"),
+    Guardian.email.label("email"),
+)
+
+STUDENT_COLUMNS = (
+    Student.id.label("student_id"),
+    Student.first_name.label("student_first_name"),
+    Student.last_name.label("student_last_name"),
+    Student.admission_no.label("admission_no"),
+)
+
+
+def _contact_guardian_join(query: Select) -> Select:
+    """
+    Outer-join each student's contact guardian: the primary guardian, or
+    (when none is set) the earliest linked guardian.
+    """
+    fallback = (
+        select(StudentGuardian.guardian_id)
+        .where(StudentGuardian.student_id == Student.id)
+        .order_by(StudentGuardian.created_at, StudentGuardian.id)
+        .limit(1)
+        .lateral("fallback_guardian")
+    )
+    return (
+        query
+        .outerjoin(fallback, true())
+        .outerjoin(
+            Guardian,
+            Guardian.id == func.coalesce(Student.primary_guardian_id, fallback.c.guardian_id),
+        )
+    )
+
+
+def invoice_reminder_recipients(school_id: uuid.UUID, year: int, term: int) -> Select:
+    """One row per outstanding invoice of the term, with the student's contact guardian"""
+    query = (
+        select(
+            *GUARDIAN_COLUMNS,
+            *STUDENT_COLUMNS,
+            Invoice.id.label("invoice_id"),
+            Invoice.total.label("invoice_total"),
+            Invoice.balance.label("invoice_balance"),
+            Invoice.due_date.label("due_date"),
+        )
+        .select_from(Invoice)
+        .join(Student, and_(Student.id == Invoice.student_id, Student.school_id == Invoice.school_id))
+        .where(
+            Invoice.school_id == school_id,
+            Invoice.year == year,
+            Invoice.term == term,
+            Invoice.status.in_(REMINDER_INVOICE_STATUSES),
+            Invoice.balance > 0,
+        )
+        .order_by(Invoice.id)
+    )
+    return _contact_guardian_join(query)
+
+
+def student_contact_recipient(school_id: uuid.UUID, student_id: uuid.UUID) -> Select:
+    """The student's contact guardian (primary, else first linked)"""
+    query = (
+        select(*GUARDIAN_COLUMNS, *STUDENT_COLUMNS)
+        .select_from(Student)
+        .where(Student.id == student_id, Student.school_id == school_id)
+    )
+    return _contact_guardian_join(query)
+
+
+def student_guardian_recipients(school_id: uuid.UUID, student_id: uuid.UUID) -> Select:
+    """Every guardian linked to one student"""
+    return (
+        select(*GUARDIAN_COLUMNS, *STUDENT_COLUMNS)
+        .select_from(StudentGuardian)
+        .join(Student, Student.id == StudentGuardian.student_id)
+        .join(Guardian, Guardian.id == StudentGuardian.guardian_id)
+        .where(Student.id == student_id, Student.school_id == school_id)
+        .order_by(StudentGuardian.created_at, StudentGuardian.id)
+    )
+
+
+def school_guardian_recipients(school_id: uuid.UUID) -> Select:
+    """Each guardian linked to at least one student of the school, once"""
+    linked = (
+        select(StudentGuardian.guardian_id)
+        .join(Student, Student.id == StudentGuardian.student_id)
+        .where(Student.school_id == school_id)
+    )
+    return (
+        select(*GUARDIAN_COLUMNS)
+        .where(Guardian.id.in_(linked))
+        .order_by(Guardian.id)
+    )
+
+
+async def stream_recipients(
+    db: AsyncSession, query: Select, chunk_size: int = RECIPIENT_CHUNK_SIZE
+) -> AsyncIterator[List[Recipient]]:
+    """Run a recipient query on a server-side cursor and yield Recipients in chunks"""
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for rows in result.partitions(chunk_size):
+        yield [Recipient.from_row(row) for row in rows]
+
+
+async def fetch_recipients(db: AsyncSession, query: Select) -> List[Recipient]:
+    """Small recipient sets (one student) in a single round trip"""
+    return [Recipient.from_row(row) for row in (await db.execute(query)).all()]
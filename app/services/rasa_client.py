@@ -0,0 +1,186 @@
+# app/services/rasa_client.py - Shared, pooled HTTP client for talking to Rasa
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors raised before the request reached Rasa; safe to retry even for POST
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Statuses worth retrying for idempotent requests
+_RETRY_STATUSES = {502, 503, 504}
+
+
+class RasaClient:
+    """
+    App-wide Rasa HTTP client.
+
+    One ``httpx.AsyncClient`` is shared by every request so chat turns reuse
+    pooled keep-alive connections instead of paying TCP/TLS setup each time.
+    It is opened and closed by ``app.main.lifespan``; if something calls it
+    outside the lifespan (scripts, tests) it is created lazily.
+    """
+
+    def __init__(self):
+        self.timeout = settings.RASA_TIMEOUT_SECONDS
+        self.max_retries = settings.RASA_MAX_RETRIES
+        self.retry_delay = settings.RASA_RETRY_DELAY
+        self.max_connections = settings.RASA_POOL_MAX_CONNECTIONS
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Pool metrics
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.retries_total = 0
+        self.failures_total = 0
+        self.pool_timeouts = 0
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = settings.RASA_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("RASA_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=settings.RASA_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.RASA_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(self.timeout, pool=settings.RASA_POOL_TIMEOUT)
+
+        headers = {}
+        if settings.RASA_TOKEN:
+            headers["Authorization"] = f"Bearer {settings.RASA_TOKEN}"
+
+        logger.info(
+            f"Rasa client pool: max_connections={self.max_connections}, "
+            f"keepalive={settings.RASA_POOL_MAX_KEEPALIVE}, http2={http2}"
+        )
+        return httpx.AsyncClient(limits=limits, timeout=timeout, headers=headers, http2=http2)
+
+    async def start(self):
+        """Open the shared client (called from the app lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def close(self):
+        """Close pooled connections (called from the app lifespan)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Rasa client connections closed")
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def request(self, method: str, url: str, retries: Optional[int] = None, **kwargs) -> httpx.Response:
+        """
+        Send a request with retry/backoff (RASA_MAX_RETRIES, RASA_RETRY_DELAY doubling).
+
+        Connection failures (nothing reached Rasa) are retried for any method.
+        Read timeouts and 502/503/504 are only retried for GET, because
+        re-posting a webhook message would run the user's turn twice.
+        Pass ``retries=0`` for probes such as health checks.
+        """
+        idempotent = method.upper() in ("GET", "HEAD", "OPTIONS")
+        max_retries = self.max_retries if retries is None else retries
+        attempt = 0
+
+        while True:
+            self.requests_total += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                if not (idempotent and response.status_code in _RETRY_STATUSES and attempt < max_retries):
+                    return response
+                logger.warning(f"Rasa {method} {url} returned {response.status_code}, retrying")
+            except _CONNECT_ERRORS + (httpx.ReadTimeout,) as e:
+                if isinstance(e, httpx.PoolTimeout):
+                    self.pool_timeouts += 1
+                retryable = isinstance(e, _CONNECT_ERRORS) or idempotent
+                if not retryable or attempt >= max_retries:
+                    self.failures_total += 1
+                    raise
+                logger.warning(f"Rasa {method} {url} failed ({type(e).__name__}), retrying")
+            except httpx.HTTPError:
+                self.failures_total += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+            self.retries_total += 1
+            await asyncio.sleep(self.retry_delay * (2 ** attempt))
+            attempt += 1
+
+    async def stream_lines(self, method: str, url: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Send a request and yield non-empty body lines as Rasa writes them.
+
+        Only connection failures are retried: once the request is sent the
+        turn is running in Rasa. Non-2xx statuses raise httpx.HTTPStatusError.
+        """
+        attempt = 0
+
+        while True:
+            self.requests_total += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                async with self.client.stream(method, url, **kwargs) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield line
+                return
+            except _CONNECT_ERRORS as e:
+                if isinstance(e, httpx.PoolTimeout):
+                    self.pool_timeouts += 1
+                if attempt >= self.max_retries:
+                    self.failures_total += 1
+                    raise
+                logger.warning(f"Rasa {method} {url} failed ({type(e).__name__}), retrying")
+            except httpx.HTTPError:
+                self.failures_total += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+            self.retries_total += 1
+            await asyncio.sleep(self.retry_delay * (2 ** attempt))
+            attempt += 1
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage counters; saturation near 1.0 means requests queue for a connection"""
+        return {
+            "open": self._client is not None and not self._client.is_closed,
+            "max_connections": self.max_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "saturation": round(self.in_flight / self.max_connections, 4),
+            "requests_total": self.requests_total,
+            "retries_total": self.retries_total,
+            "failures_total": self.failures_total,
+            "pool_timeouts": self.pool_timeouts,
+        }
+
+
+# Singleton instance
+rasa_client = RasaClient()
@@ -0,0 +1,173 @@
+# app/services/school_overview.py - Dashboard overview for a school: one aggregate query plus a short-TTL cache
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, func, inspect, select, true
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.academic import AcademicTerm, AcademicYear
+from app.models.class_model import Class
+from app.models.enrollment import Enrollment
+from app.models.guardian import StudentGuardian
+from app.models.payment import Invoice, Payment
+from app.models.school import School
+from app.models.student import Student
+
+logger = logging.getLogger(__name__)
+
+# Keyed on str(school_id); the overview dict returned by get_school_overview
+_overview_cache = TTLCache(
+    ttl=settings.SCHOOL_OVERVIEW_CACHE_TTL_SECONDS,
+    max_entries=settings.SCHOOL_OVERVIEW_CACHE_MAX_ENTRIES,
+    name="school_overview",
+)
+
+# Writes to these models change some overview figure of their school
+_OVERVIEW_MODELS = (Invoice, Payment, Enrollment, Student, Class, StudentGuardian, AcademicYear, AcademicTerm)
+
+
+def invalidate_school_overview(school_id) -> None:
+    """Drop a school's cached overview (bulk Core writes must call this themselves)"""
+    _overview_cache.invalidate(str(school_id))
+
+
+def school_overview_cache_stats() -> Dict[str, Any]:
+    """Cache counters for health/metrics endpoints"""
+    return _overview_cache.stats()
+
+
+def overview_statement(school_id: uuid.UUID):
+    """
+    Every overview figure in one statement: the active year and term and
+    the invoice totals are CTEs, the remaining counts scalar subqueries.
+    No row comes back if the school does not exist.
+    """
+    current_year = (
+        select(AcademicYear.id, AcademicYear.year)
+        .where(AcademicYear.school_id == school_id, AcademicYear.state == "ACTIVE")
+        .limit(1)
+        .cte("current_year")
+    )
+    current_term = (
+        select(AcademicTerm.id, AcademicTerm.title)
+        .join(current_year, AcademicTerm.academic_year_id == current_year.c.id)
+        .where(AcademicTerm.state == "ACTIVE")
+        .limit(1)
+        .cte("current_term")
+    )
+    invoice_stats = (
+        select(
+            func.count().label("total"),
+            func.count().filter(Invoice.status.in_(["ISSUED", "PARTIAL"])).label("pending"),
+            func.count().filter(Invoice.status == "PAID").label("paid"),
+            # Payments are kept per invoice in amount_paid
+            func.coalesce(func.sum(Invoice.amount_paid), 0).label("collected"),
+        )
+        .where(Invoice.school_id == school_id)
+        .cte("invoice_stats")
+    )
+
+    students = select(func.count(Student.id)).where(Student.school_id == school_id).scalar_subquery()
+    classes = select(func.count(Class.id)).where(Class.school_id == school_id).scalar_subquery()
+    guardians = (
+        select(func.count(func.distinct(StudentGuardian.guardian_id)))
+        .join(Student, StudentGuardian.student_id == Student.id)
+        .where(Student.school_id == school_id)
+        .scalar_subquery()
+    )
+    enrolled = (
+        select(func.count(func.distinct(Enrollment.student_id)))
+        .where(Enrollment.school_id == school_id, Enrollment.term_id == current_term.c.id)
+        .scalar_subquery()
+    )
+
+    return (
+        select(
+            School.name.label("school_name"),
+            current_year.c.year.label("academic_year"),
+            current_term.c.title.label("current_term"),
+            students.label("students_total"),
+            enrolled.label("students_enrolled"),
+            classes.label("classes"),
+            guardians.label("guardians"),
+            invoice_stats.c.total.label("invoices_total"),
+            invoice_stats.c.pending.label("invoices_pending"),
+            invoice_stats.c.paid.label("invoices_paid"),
+            invoice_stats.c.collected.label("fees_collected"),
+        )
+        .select_from(School)
+        .outerjoin(current_year, true())
+        .outerjoin(current_term, true())
+        .join(invoice_stats, true())
+        .where(School.id == school_id)
+    )
+
+
+def get_school_overview(db: Session, school_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+    """The school's overview figures (cached per school), or None if it does not exist"""
+    cache_key = str(school_id)
+    overview = _overview_cache.get(cache_key)
+    if overview is not None:
+        return overview
+
+    row = db.execute(overview_statement(school_id)).one_or_none()
+    if row is None:
+        return None
+
+    overview = {
+        "school_name": row.school_name,
+        "academic_year": row.academic_year,
+        "current_term": row.current_term,
+        "students_total": row.students_total,
+        # Enrollment only counts once there is an active term
+        "students_enrolled": row.students_enrolled,
+        "students_unassigned": row.students_total - row.students_enrolled,
+        "classes": row.classes,
+        "guardians": row.guardians,
+        "invoices_total": row.invoices_total,
+        # Issued and pending both mean ISSUED or PARTIAL
+        "invoices_issued": row.invoices_pending,
+        "invoices_paid": row.invoices_paid,
+        "invoices_pending": row.invoices_pending,
+        "fees_collected": float(row.fees_collected),
+    }
+    if settings.SCHOOL_OVERVIEW_CACHE_TTL_SECONDS > 0:
+        _overview_cache.set(cache_key, overview)
+    return overview
+
+
+# --- Invalidation hooks ------------------------------------------------------
+# ORM writes to overview inputs drop the school's entry on flush and again on
+# commit (so a concurrent request cannot re-cache pre-commit figures).
+
+_PENDING_KEY = "school_overview_invalidate"
+
+
+@event.listens_for(Session, "after_flush")
+def _on_flush(session, flush_context) -> None:
+    schools = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, _OVERVIEW_MODELS):
+            # Read the already-loaded state only; never trigger a refresh here
+            schools.add(inspect(obj).dict.get("school_id"))
+        elif isinstance(obj, School):
+            schools.add(inspect(obj).dict.get("id"))
+    schools.discard(None)
+    if schools:
+        for school_id in schools:
+            invalidate_school_overview(school_id)
+        session.info.setdefault(_PENDING_KEY, set()).update(schools)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session) -> None:
+    for school_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_school_overview(school_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,29 @@
+"""Add invoice listing index for keyset pagination
+
+Revision ID: 3b7e9c1d4a2f
+Revises: 82044c16df04
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9c1d4a2f'
+down_revision: Union[str, Sequence[str], None] = '82044c16df04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Invoice listings page by (year, term, id) descending within a school
+    op.create_index(
+        'ix_invoices_school_year_term_id',
+        'invoices',
+        ['school_id', 'year', 'term', 'id'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_invoices_school_year_term_id', table_name='invoices')
@@ -0,0 +1,56 @@
+"""Add denormalized amount_paid and balance to invoices
+
+Revision ID: 8d2f4a6c9e1b
+Revises: 3b7e9c1d4a2f
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a6c9e1b'
+down_revision: Union[str, Sequence[str], None] = '3b7e9c1d4a2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('invoices', sa.Column('amount_paid', sa.Numeric(12, 2), nullable=False, server_default='0'))
+    op.add_column('invoices', sa.Column('balance', sa.Numeric(12, 2), nullable=False, server_default='0'))
+
+    # Back-fill from payments: balance = max(total - paid, 0), 0 for CANCELLED
+    op.execute("""
+        UPDATE invoices AS i
+        SET amount_paid = COALESCE(p.paid, 0),
+            balance = CASE
+                WHEN i.status = 'CANCELLED' THEN 0
+                ELSE GREATEST(i.total - COALESCE(p.paid, 0), 0)
+            END
+        FROM invoices AS src
+        LEFT JOIN (
+            SELECT invoice_id, SUM(amount) AS paid
+            FROM payments
+            GROUP BY invoice_id
+        ) AS p ON p.invoice_id = src.id
+        WHERE src.id = i.id
+    """)
+
+    op.create_check_constraint(op.f('ck_invoices_ck_invoice_amount_paid_positive'), 'invoices', 'amount_paid >= 0')
+    op.create_check_constraint(op.f('ck_invoices_ck_invoice_balance_positive'), 'invoices', 'balance >= 0')
+    op.create_index(
+        'ix_invoices_school_term_unpaid',
+        'invoices',
+        ['school_id', 'year', 'term'],
+        postgresql_where=sa.text('balance > 0'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_invoices_school_term_unpaid', table_name='invoices')
+    op.drop_constraint(op.f('ck_invoices_ck_invoice_balance_positive'), 'invoices', type_='check')
+    op.drop_constraint(op.f('ck_invoices_ck_invoice_amount_paid_positive'), 'invoices', type_='check')
+    op.drop_column('invoices', 'balance')
+    op.drop_column('invoices', 'amount_paid')
@@ -0,0 +1,46 @@
+"""Make invoices unique per student, term and year
+
+Revision ID: 5e1a7c3b9d2f
+Revises: 8d2f4a6c9e1b
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a7c3b9d2f'
+down_revision: Union[str, Sequence[str], None] = '8d2f4a6c9e1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Duplicates carry payments, so they are not merged automatically
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM invoices
+            GROUP BY school_id, student_id, term, year
+            HAVING COUNT(*) > 1
+        ) d
+    """)).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} student/term combinations have more than one invoice; "
+            "cancel or merge the extras before applying this migration"
+        )
+
+    # The unique index serves the same lookups as the index it replaces
+    op.create_unique_constraint(
+        'uix_invoice_student_term', 'invoices', ['school_id', 'student_id', 'term', 'year']
+    )
+    op.drop_index('ix_invoices_school_student_term', table_name='invoices')
+
+
+def downgrade():
+    op.create_index(
+        'ix_invoices_school_student_term', 'invoices', ['school_id', 'student_id', 'term', 'year']
+    )
+    op.drop_constraint('uix_invoice_student_term', 'invoices', type_='unique')
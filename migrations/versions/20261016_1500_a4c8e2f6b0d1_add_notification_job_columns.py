@@ -0,0 +1,31 @@
+"""Add email job tracking columns to notification
+
+Revision ID: a4c8e2f6b0d1
+Revises: 5e1a7c3b9d2f
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f6b0d1'
+down_revision: Union[str, Sequence[str], None] = '5e1a7c3b9d2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('notification', sa.Column('job_id', sa.String(length=36), nullable=True))
+    op.add_column('notification', sa.Column('error', sa.String(length=255), nullable=True))
+    op.add_column('notification', sa.Column('sent_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_notification_job_id'), 'notification', ['job_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_notification_job_id'), table_name='notification')
+    op.drop_column('notification', 'sent_at')
+    op.drop_column('notification', 'error')
+    op.drop_column('notification', 'job_id')
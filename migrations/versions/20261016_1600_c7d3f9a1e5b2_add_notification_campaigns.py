@@ -0,0 +1,82 @@
+"""Store campaign subject/body once and index notification history
+
+Revision ID: c7d3f9a1e5b2
+Revises: a4c8e2f6b0d1
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3f9a1e5b2'
+down_revision: Union[str, Sequence[str], None] = 'a4c8e2f6b0d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table('notification_campaign',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('school_id', sa.String(length=36), nullable=False),
+    sa.Column('type', sa.String(length=16), nullable=False),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('created_by', sa.String(length=255), nullable=True),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_notification_campaign'))
+    )
+    op.create_index(
+        'ix_notification_campaign_school_created', 'notification_campaign', ['school_id', 'created_at']
+    )
+
+    # Email jobs queued before this revision become campaigns; their rows keep their own bodies
+    op.execute("""
+        INSERT INTO notification_campaign (id, school_id, type, kind, subject, body, total, created_at)
+        SELECT job_id, MIN(school_id), MIN(type), 'legacy', MIN(subject), MIN(body), COUNT(*), MIN(created_at)
+        FROM notification
+        WHERE job_id IS NOT NULL
+        GROUP BY job_id
+    """)
+
+    op.drop_index(op.f('ix_notification_job_id'), table_name='notification')
+    op.alter_column('notification', 'job_id', new_column_name='campaign_id')
+    op.create_index(op.f('ix_notification_campaign_id'), 'notification', ['campaign_id'], unique=False)
+    op.create_foreign_key(
+        op.f('fk_notification_campaign_id_notification_campaign'),
+        'notification', 'notification_campaign', ['campaign_id'], ['id'], ondelete='CASCADE'
+    )
+    op.alter_column('notification', 'body', existing_type=sa.String(length=2000), nullable=True)
+
+    # History pages by (created_at, id) within a school; the prefix replaces the school_id index
+    op.create_index(
+        'ix_notification_school_created_id', 'notification', ['school_id', 'created_at', 'id']
+    )
+    op.drop_index(op.f('ix_notification_school_id'), table_name='notification')
+
+
+def downgrade():
+    op.create_index(op.f('ix_notification_school_id'), 'notification', ['school_id'], unique=False)
+    op.drop_index('ix_notification_school_created_id', table_name='notification')
+
+    op.execute("""
+        UPDATE notification n
+        SET body = LEFT(c.body, 2000), subject = COALESCE(n.subject, c.subject)
+        FROM notification_campaign c
+        WHERE n.campaign_id = c.id AND n.body IS NULL
+    """)
+    op.alter_column('notification', 'body', existing_type=sa.String(length=2000), nullable=False)
+
+    op.drop_constraint(
+        op.f('fk_notification_campaign_id_notification_campaign'), 'notification', type_='foreignkey'
+    )
+    op.drop_index(op.f('ix_notification_campaign_id'), table_name='notification')
+    op.alter_column('notification', 'campaign_id', new_column_name='job_id')
+    op.create_index(op.f('ix_notification_job_id'), 'notification', ['job_id'], unique=False)
+
+    op.drop_index('ix_notification_campaign_school_created', table_name='notification_campaign')
+    op.drop_table('notification_campaign')
@@ -0,0 +1,95 @@
+"""Store Rasa metadata of chat messages as deduplicated context snapshots
+
+Revision ID: e2b6d8f4a0c3
+Revises: c7d3f9a1e5b2
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+import hashlib
+import json
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6d8f4a0c3'
+down_revision: Union[str, Sequence[str], None] = 'c7d3f9a1e5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.services.chat_writer.context_snapshot, so compacted rows
+# share snapshot ids with the ones the application writes
+UNSTORED_CONTEXT_KEYS = frozenset({
+    "auth_token", "authorization", "jwt_token", "access_token", "refresh_token", "password",
+    "conversation_id", "context",
+})
+
+BATCH_SIZE = 1000
+
+
+def context_snapshot(metadata):
+    data = {key: value for key, value in (metadata or {}).items() if key not in UNSTORED_CONTEXT_KEYS}
+    if not data:
+        return None
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return uuid.UUID(bytes=hashlib.sha256(canonical.encode()).digest()[:16]), canonical
+
+
+def upgrade():
+    op.create_table('chat_context_snapshots',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_chat_context_snapshots'))
+    )
+    op.add_column('chat_messages', sa.Column('context_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        op.f('fk_chat_messages_context_id_chat_context_snapshots'),
+        'chat_messages', 'chat_context_snapshots', ['context_id'], ['id']
+    )
+
+    # Compact assistant messages in batches: the metadata (with the JWT) becomes a shared snapshot
+    bind = op.get_bind()
+    select_batch = sa.text("""
+        SELECT id, context_data FROM chat_messages
+        WHERE message_type = 'ASSISTANT' AND context_data IS NOT NULL
+        LIMIT :limit
+    """)
+    insert_snapshot = sa.text("""
+        INSERT INTO chat_context_snapshots (id, data, created_at)
+        VALUES (:id, CAST(:data AS json), now())
+        ON CONFLICT (id) DO NOTHING
+    """)
+    compact_message = sa.text("""
+        UPDATE chat_messages SET context_id = :context_id, context_data = NULL WHERE id = :id
+    """)
+    while True:
+        batch = bind.execute(select_batch, {"limit": BATCH_SIZE}).all()
+        if not batch:
+            break
+        snapshots, updates = {}, []
+        for message_id, context_data in batch:
+            snapshot = context_snapshot(context_data if isinstance(context_data, dict) else None)
+            if snapshot is not None:
+                snapshots[snapshot[0]] = snapshot[1]
+            updates.append({"id": message_id, "context_id": snapshot[0] if snapshot else None})
+        if snapshots:
+            bind.execute(insert_snapshot, [{"id": key, "data": data} for key, data in snapshots.items()])
+        bind.execute(compact_message, updates)
+
+
+def downgrade():
+    # Secrets were never kept, so restored metadata has no auth_token/authorization
+    op.execute("""
+        UPDATE chat_messages m
+        SET context_data = s.data
+        FROM chat_context_snapshots s
+        WHERE m.context_id = s.id
+    """)
+    op.drop_constraint(
+        op.f('fk_chat_messages_context_id_chat_context_snapshots'), 'chat_messages', type_='foreignkey'
+    )
+    op.drop_column('chat_messages', 'context_id')
+    op.drop_table('chat_context_snapshots')
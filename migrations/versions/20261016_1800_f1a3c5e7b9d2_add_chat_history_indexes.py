@@ -0,0 +1,36 @@
+"""Add chat history indexes for keyset pagination
+
+Revision ID: f1a3c5e7b9d2
+Revises: e2b6d8f4a0c3
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a3c5e7b9d2'
+down_revision: Union[str, Sequence[str], None] = 'e2b6d8f4a0c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # A user's conversations in a school page by (last_activity, id) descending
+    op.create_index(
+        'ix_chat_conversations_user_school_activity',
+        'chat_conversations',
+        ['user_id', 'school_id', 'last_activity', 'id'],
+    )
+    # A conversation's messages page by (created_at, id), newest page first
+    op.create_index(
+        'ix_chat_messages_conversation_created',
+        'chat_messages',
+        ['conversation_id', 'created_at', 'id'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_chat_messages_conversation_created', table_name='chat_messages')
+    op.drop_index('ix_chat_conversations_user_school_activity', table_name='chat_conversations')
@@ -0,0 +1,33 @@
+"""Add trigram index for fee structure name search
+
+Revision ID: a9c1e3b5d7f0
+Revises: f1a3c5e7b9d2
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c1e3b5d7f0'
+down_revision: Union[str, Sequence[str], None] = 'f1a3c5e7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Fee structure search matches names with ILIKE '%term%', which only a trigram index serves
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_fee_structures_name_trgm',
+        'fee_structures',
+        ['name'],
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade():
+    # pg_trgm is left installed; other objects may depend on it
+    op.drop_index('ix_fee_structures_name_trgm', table_name='fee_structures')
@@ -0,0 +1,45 @@
+"""Add guardian directory indexes
+
+Revision ID: b4d6f8a0c2e1
+Revises: a9c1e3b5d7f0
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d6f8a0c2e1'
+down_revision: Union[str, Sequence[str], None] = 'a9c1e3b5d7f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # The guardian directory lists a school's guardians by (last_name, first_name, id)
+    op.create_index(
+        'ix_guardians_school_name',
+        'guardians',
+        ['school_id', 'last_name', 'first_name', 'id'],
+    )
+    # Directory search matches name, email and phone with ILIKE '%term%'
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_guardians_search_trgm',
+        'guardians',
+        ['first_name', 'last_name', 'email', 'phone'],
+        postgresql_using='gin',
+        postgresql_ops={
+            'first_name': 'gin_trgm_ops',
+            'last_name': 'gin_trgm_ops',
+            'email': 'gin_trgm_ops',
+            'phone': 'gin_trgm_ops',
+        },
+    )
+
+
+def downgrade():
+    # pg_trgm is left installed; other objects may depend on it
+    op.drop_index('ix_guardians_search_trgm', table_name='guardians')
+    op.drop_index('ix_guardians_school_name', table_name='guardians')
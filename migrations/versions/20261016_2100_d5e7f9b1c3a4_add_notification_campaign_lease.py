@@ -0,0 +1,41 @@
+"""Record the process holding each email campaign and its lease
+
+Revision ID: d5e7f9b1c3a4
+Revises: b4d6f8a0c2e1
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e7f9b1c3a4'
+down_revision: Union[str, Sequence[str], None] = 'b4d6f8a0c2e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('notification_campaign', sa.Column('queued_by', sa.String(length=128), nullable=True))
+    op.add_column('notification_campaign', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'ix_notification_campaign_lease', 'notification_campaign', ['lease_expires_at'],
+        postgresql_where=sa.text('lease_expires_at IS NOT NULL')
+    )
+
+    # Campaigns still QUEUED from before leases existed have no owner left: expire them now
+    op.execute("""
+        UPDATE notification_campaign c
+        SET lease_expires_at = c.created_at
+        WHERE EXISTS (
+            SELECT 1 FROM notification n WHERE n.campaign_id = c.id AND n.status = 'QUEUED'
+        )
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_notification_campaign_lease', table_name='notification_campaign')
+    op.drop_column('notification_campaign', 'lease_expires_at')
+    op.drop_column('notification_campaign', 'queued_by')
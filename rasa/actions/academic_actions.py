@@ -7,7 +7,7 @@ Handles academic years, terms, classes, and enrollment operations
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
-import requests
+from actions.api_client import api, ApiError
 import logging
 from datetime import datetime
 from typing import Dict, Text, Any, List
@@ -55,7 +55,7 @@ class ActionCreateAcademicYear(Action):
     def name(self) -> Text:
         return "action_create_academic_year"
 
-def run(self, dispatcher: CollectingDispatcher, 
+async def run(self, dispatcher: CollectingDispatcher, 
         tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
     
     metadata = tracker.latest_message.get("metadata", {})
@@ -74,14 +74,14 @@ def run(self, dispatcher: CollectingDispatcher,
         }
         
         # Check academic setup
-        setup_response = requests.get(
+        setup_response = await api.get(
             f"{FASTAPI_BASE_URL}/academic/current-setup",
             headers=headers
         )
         
         if setup_response.status_code != 200:
             # Check if ANY academic years exist
-            years_response = requests.get(
+            years_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/years",
                 headers=headers
             )
@@ -107,7 +107,7 @@ def run(self, dispatcher: CollectingDispatcher,
             return [SlotSet("prerequisites_met", False)]
         
         # Check if there are any classes
-        classes_response = requests.get(
+        classes_response = await api.get(
             f"{FASTAPI_BASE_URL}/classes",
             headers=headers
         )
@@ -123,7 +123,7 @@ def run(self, dispatcher: CollectingDispatcher,
         # All checks passed
         return [SlotSet("prerequisites_met", True)]
     
-    except requests.exceptions.RequestException as e:
+    except ApiError as e:
         logger.error(f"Error validating prerequisites: {e}")
         dispatcher.utter_message(
             text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -160,7 +160,7 @@ class ActionCreateAcademicTerm(Action):
     def name(self) -> Text:
         return "action_create_academic_term"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -189,7 +189,7 @@ class ActionCreateAcademicTerm(Action):
             
             # Get current academic year if not specified
             if not academic_year:
-                current_year_response = requests.get(
+                current_year_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-year",
                     headers=headers
                 )
@@ -212,7 +212,7 @@ class ActionCreateAcademicTerm(Action):
                 "title": f"Term {term}"
             }
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/academic/terms",
                 json=term_data,
                 headers=headers
@@ -224,7 +224,7 @@ class ActionCreateAcademicTerm(Action):
                 msg = f"Term {term} created successfully for Academic Year {academic_year}!\n\n"
                 
                 # Check if there are any active terms
-                terms_response = requests.get(
+                terms_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/terms?academic_year={academic_year}",
                     headers=headers
                 )
@@ -286,7 +286,7 @@ class ActionCheckAcademicSetup(Action):
     def name(self) -> Text:
         return "action_check_academic_setup"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -304,7 +304,7 @@ class ActionCheckAcademicSetup(Action):
                 "X-School-ID": school_id
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -364,7 +364,7 @@ class ActionCheckAcademicSetup(Action):
                     text="Unable to check academic setup status. Please try again."
                 )
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error checking academic setup: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -382,7 +382,7 @@ class ActionGetCurrentAcademicYear(Action):
     def name(self) -> Text:
         return "action_get_current_academic_year"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -400,7 +400,7 @@ class ActionGetCurrentAcademicYear(Action):
                 "X-School-ID": school_id
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -414,7 +414,7 @@ class ActionGetCurrentAcademicYear(Action):
                         text=f"Current Academic Year: {current_year['year']} ({current_year['state']})"
                     )
                 else:
-                    years_response = requests.get(
+                    years_response = await api.get(
                         f"{FASTAPI_BASE_URL}/academic/years",
                         headers=headers
                     )
@@ -461,7 +461,7 @@ class ActionGetCurrentAcademicYear(Action):
                     text="Unable to retrieve academic year information. Please try again."
                 )
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error getting current academic year: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -479,7 +479,7 @@ class ActionGetCurrentTerm(Action):
     def name(self) -> Text:
         return "action_get_current_term"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -497,7 +497,7 @@ class ActionGetCurrentTerm(Action):
                 "X-School-ID": school_id
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -543,7 +543,7 @@ class ActionGetCurrentTerm(Action):
                     text="Unable to retrieve term information. Please try again."
                 )
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error getting current term: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -561,7 +561,7 @@ class ActionActivateAcademicYear(Action):
     def name(self) -> Text:
         return "action_activate_academic_year"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -585,7 +585,7 @@ class ActionActivateAcademicYear(Action):
                 "X-School-ID": school_id
             }
             
-            years_response = requests.get(
+            years_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/years",
                 headers=headers
             )
@@ -612,7 +612,7 @@ class ActionActivateAcademicYear(Action):
                 dispatcher.utter_message(text=f"Academic year {academic_year} is already active.")
                 return []
             
-            activate_response = requests.put(
+            activate_response = await api.put(
                 f"{FASTAPI_BASE_URL}/academic/years/{year_id}/activate",
                 headers=headers
             )
@@ -639,7 +639,7 @@ class ActionDeactivateAcademicYear(Action):
     def name(self) -> Text:
         return "action_deactivate_academic_year"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -660,7 +660,7 @@ class ActionDeactivateAcademicYear(Action):
             }
             
             if not academic_year:
-                setup_response = requests.get(
+                setup_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-setup",
                     headers=headers
                 )
@@ -678,7 +678,7 @@ class ActionDeactivateAcademicYear(Action):
                     dispatcher.utter_message(text="Could not check current academic setup.")
                     return []
             else:
-                years_response = requests.get(
+                years_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/years",
                     headers=headers
                 )
@@ -698,7 +698,7 @@ class ActionDeactivateAcademicYear(Action):
                     dispatcher.utter_message(text="Could not retrieve academic years.")
                     return []
             
-            deactivate_response = requests.put(
+            deactivate_response = await api.put(
                 f"{FASTAPI_BASE_URL}/academic/years/{year_id}/deactivate",
                 headers=headers
             )
@@ -723,7 +723,7 @@ class ActionActivateTerm(Action):
     def name(self) -> Text:
         return "action_activate_term"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -748,7 +748,7 @@ class ActionActivateTerm(Action):
             }
             
             # FIXED: Get current setup to get year ID
-            setup_response = requests.get(
+            setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -768,7 +768,7 @@ class ActionActivateTerm(Action):
             year_id = current_year['id']
             
             # FIXED: Get terms using year ID
-            terms_response = requests.get(
+            terms_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/years/{year_id}/terms",
                 headers=headers
             )
@@ -792,7 +792,7 @@ class ActionActivateTerm(Action):
                 return []
             
             # Activate the term
-            activate_response = requests.put(
+            activate_response = await api.put(
                 f"{FASTAPI_BASE_URL}/academic/terms/{target_term['id']}/activate",
                 headers=headers
             )
@@ -816,7 +816,7 @@ class ActionListAcademicTerms(Action):
     def name(self) -> Text:
         return "action_list_academic_terms"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -837,7 +837,7 @@ class ActionListAcademicTerms(Action):
             }
             
             # FIXED: First get the current academic year to get its ID
-            setup_response = requests.get(
+            setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -858,7 +858,7 @@ class ActionListAcademicTerms(Action):
             year_to_check = academic_year or str(current_year["year"])
             
             # FIXED: Use the correct endpoint with year_id
-            terms_response = requests.get(
+            terms_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/years/{year_id}/terms",
                 headers=headers
             )
@@ -925,7 +925,7 @@ class ActionPromoteStudents(Action):
     def name(self) -> Text:
         return "action_promote_students"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -955,7 +955,7 @@ class ActionPromoteStudents(Action):
             
             # If source term not specified, use current active term
             if not source_term:
-                current_term_response = requests.get(
+                current_term_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-term",
                     headers=headers
                 )
@@ -975,7 +975,7 @@ class ActionPromoteStudents(Action):
             if source_term:
                 promotion_data["source_term"] = int(source_term)
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/academic/promote-students",
                 json=promotion_data,
                 headers=headers
@@ -1018,7 +1018,7 @@ class ActionCreateClass(Action):
     def name(self) -> Text:
         return "action_create_class"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1284,7 +1284,7 @@ class ActionCreateClass(Action):
             
             # Get current academic year if not specified
             if not academic_year:
-                academic_setup_response = requests.get(
+                academic_setup_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-setup",
                     headers=headers
                 )
@@ -1331,7 +1331,7 @@ class ActionCreateClass(Action):
                 
                 logger.info(f"Creating base class with payload: {class_payload}")
                 
-                response = requests.post(
+                response = await api.post(
                     f"{FASTAPI_BASE_URL}/classes/level-stream",
                     json=class_payload,
                     headers=headers
@@ -1383,7 +1383,7 @@ class ActionCreateClass(Action):
             
             logger.info(f"Step 1: Creating/checking base class {level}")
             
-            base_response = requests.post(
+            base_response = await api.post(
                 f"{FASTAPI_BASE_URL}/classes/level-stream",
                 json=base_class_payload,
                 headers=headers
@@ -1400,7 +1400,7 @@ class ActionCreateClass(Action):
             elif base_response.status_code == 409:
                 # Class already exists, fetch it
                 logger.info(f"Base class {level} already exists, fetching ID")
-                fetch_response = requests.get(
+                fetch_response = await api.get(
                     f"{FASTAPI_BASE_URL}/classes?search={level}&academic_year={academic_year}",
                     headers=headers
                 )
@@ -1439,7 +1439,7 @@ class ActionCreateClass(Action):
                 
                 logger.info(f"Adding stream '{stream_name}' to class {class_id}")
                 
-                stream_response = requests.post(
+                stream_response = await api.post(
                     f"{FASTAPI_BASE_URL}/classes/{class_id}/streams",
                     json=stream_payload,
                     headers=headers
@@ -1501,7 +1501,7 @@ class ActionCreateClass(Action):
                 SlotSet("academic_year", None)
             ]
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error creating class: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again."
@@ -1523,7 +1523,7 @@ class ActionListClasses(Action):
     def name(self) -> Text:
         return "action_list_classes"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1541,7 +1541,7 @@ class ActionListClasses(Action):
                 "X-School-ID": school_id
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers
             )
@@ -1583,7 +1583,7 @@ class ActionListClasses(Action):
                     text="Sorry, I couldn't retrieve the class list. Please try again."
                 )
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error listing classes: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -1601,7 +1601,7 @@ class ActionListEmptyClasses(Action):
     def name(self) -> Text:
         return "action_list_empty_classes"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1619,7 +1619,7 @@ class ActionListEmptyClasses(Action):
                 "X-School-ID": school_id
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers
             )
@@ -1660,7 +1660,7 @@ class ActionListEmptyClasses(Action):
                     text="Sorry, I couldn't retrieve the class list. Please try again."
                 )
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error listing empty classes: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -1678,7 +1678,7 @@ class ActionDeleteClass(Action):
     def name(self) -> Text:
         return "action_delete_class"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1703,7 +1703,7 @@ class ActionDeleteClass(Action):
                 "X-School-ID": school_id
             }
             
-            class_response = requests.get(
+            class_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers,
                 params={"search": class_name}
@@ -1741,7 +1741,7 @@ class ActionDeleteClass(Action):
                 )
                 return []
             
-            delete_response = requests.delete(
+            delete_response = await api.delete(
                 f"{FASTAPI_BASE_URL}/classes/{target_class['id']}",
                 headers=headers
             )
@@ -1821,7 +1821,7 @@ class ActionCompleteTerm(Action):
     def name(self) -> Text:
         return "action_complete_term"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1850,7 +1850,7 @@ class ActionCompleteTerm(Action):
             
             # Get current year if not specified
             if not academic_year:
-                year_response = requests.get(
+                year_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-year",
                     headers=headers
                 )
@@ -1868,7 +1868,7 @@ class ActionCompleteTerm(Action):
             academic_year = str(academic_year)
             
             # Complete the term
-            response = requests.put(
+            response = await api.put(
                 f"{FASTAPI_BASE_URL}/academic/terms/{academic_year}/{term}/complete",
                 headers=headers
             )
@@ -1909,7 +1909,7 @@ class ActionListAcademicYears(Action):
     def name(self) -> Text:
         return "action_list_academic_years"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1927,7 +1927,7 @@ class ActionListAcademicYears(Action):
                 "X-School-ID": school_id
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/years",
                 headers=headers
             )
@@ -1997,7 +1997,7 @@ class ActionAddStreamToClass(Action):
     def name(self) -> Text:
         return "action_add_stream_to_class"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2125,7 +2125,7 @@ class ActionAddStreamToClass(Action):
             }
             
             # Get current academic year
-            setup_response = requests.get(
+            setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -2144,7 +2144,7 @@ class ActionAddStreamToClass(Action):
             academic_year = current_year.get("year")
             
             # Find the class
-            classes_response = requests.get(
+            classes_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes?search={class_name}&academic_year={academic_year}",
                 headers=headers
             )
@@ -2174,7 +2174,7 @@ class ActionAddStreamToClass(Action):
             
             # Try to add each stream
             for stream_name in normalized_streams:
-                stream_response = requests.post(
+                stream_response = await api.post(
                     f"{FASTAPI_BASE_URL}/classes/{class_id}/streams",
                     json={"name": stream_name},
                     headers=headers
@@ -2222,7 +2222,7 @@ class ActionAddStreamToClass(Action):
                 messages.append("No streams were processed.")
             
             # Get updated streams list
-            streams_response = requests.get(
+            streams_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes/{class_id}/streams",
                 headers=headers
             )
@@ -2250,7 +2250,7 @@ class ActionListStreams(Action):
     def name(self) -> Text:
         return "action_list_streams"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2274,7 +2274,7 @@ class ActionListStreams(Action):
             }
             
             # Get current academic year
-            setup_response = requests.get(
+            setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -2293,7 +2293,7 @@ class ActionListStreams(Action):
             academic_year = current_year.get("year")
             
             # Find the class
-            classes_response = requests.get(
+            classes_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes?search={class_name}&academic_year={academic_year}",
                 headers=headers
             )
@@ -2314,7 +2314,7 @@ class ActionListStreams(Action):
             class_display_name = target_class["name"]
             
             # Get streams
-            streams_response = requests.get(
+            streams_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes/{class_id}/streams",
                 headers=headers
             )
@@ -2349,7 +2349,7 @@ class ActionRenameClass(Action):
     def name(self) -> Text:
         return "action_rename_class"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2377,7 +2377,7 @@ class ActionRenameClass(Action):
             }
             
             # Find the class
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers,
                 params={"search": old_class_name}
@@ -2405,7 +2405,7 @@ class ActionRenameClass(Action):
             # Update the class name
             update_data = {"name": new_name}
             
-            update_response = requests.put(
+            update_response = await api.put(
                 f"{FASTAPI_BASE_URL}/classes/{class_id}",
                 json=update_data,
                 headers=headers
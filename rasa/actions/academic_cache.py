@@ -0,0 +1,125 @@
+# rasa/actions/academic_cache.py
+"""
+Per-school TTL cache for the academic context the actions keep re-reading.
+
+Most actions start by asking the API for the current setup, year, term or
+class list before doing their real work, often more than once per turn.
+ActionsApiClient consults this cache for those GETs, so repeated lookups
+within a turn (and across turns, for ACADEMIC_CACHE_TTL seconds) are served
+from memory.
+
+Entries are keyed by school (the X-School-ID header), a digest of the
+caller's bearer token, and path plus query params, so a response is only
+ever replayed to the token the backend authorised it for. Any write through the client to an academic, class, student or
+enrollment endpoint drops that school's entries, so activating a year/term,
+completing a term or assigning students is visible on the next lookup.
+Changes made outside the action server (web UI, other workers) show up once
+the TTL expires.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ACADEMIC_CACHE_TTL = float(os.getenv("ACTIONS_ACADEMIC_CACHE_TTL", "60"))
+ACADEMIC_CACHE_MAX_ENTRIES = int(os.getenv("ACTIONS_ACADEMIC_CACHE_MAX_ENTRIES", "2000"))
+
+# GET paths (relative to FASTAPI_BASE_URL, no trailing slash) that are cached
+CACHED_PATHS = {
+    "/academic/current-setup",
+    "/academic/current-year",
+    "/academic/current-term",
+    "/terms/current",
+    "/classes",
+}
+
+# Writes under these prefixes change something the cached responses show
+# (class lists include student counts)
+INVALIDATING_PREFIXES = ("/academic", "/terms", "/classes", "/students", "/enrollments")
+
+
+def _cache_key(school_id: str, authorization: str, path: str, params: Optional[Dict[str, Any]]) -> Tuple:
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    token_digest = hashlib.sha256(authorization.encode()).hexdigest()
+    return (school_id, token_digest, path, items)
+
+
+class AcademicContextCache:
+    """Small LRU/TTL store of successful academic GET responses, grouped by school"""
+
+    def __init__(self, ttl: float = ACADEMIC_CACHE_TTL, max_entries: int = ACADEMIC_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, school_id: Optional[str], authorization: Optional[str], path: str,
+            params: Optional[Dict[str, Any]] = None):
+        """Cached response for a GET made with this exact Authorization header, or None"""
+        if not self.enabled or not school_id or not authorization or path not in CACHED_PATHS:
+            return None
+
+        key = _cache_key(school_id, authorization, path, params)
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, school_id: Optional[str], authorization: Optional[str], path: str,
+            params: Optional[Dict[str, Any]], response) -> None:
+        """Remember a successful (i.e. backend-authorised) GET response for this token"""
+        if (not self.enabled or not school_id or not authorization or path not in CACHED_PATHS
+                or response.status_code != 200):
+            return
+
+        key = _cache_key(school_id, authorization, path, params)
+        self._data[key] = (time.monotonic() + self.ttl, response)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def note_write(self, school_id: Optional[str], path: str) -> None:
+        """Drop a school's entries after a write that may change academic context"""
+        if school_id and path.startswith(INVALIDATING_PREFIXES):
+            self.invalidate_school(school_id)
+
+    def invalidate_school(self, school_id) -> None:
+        """Drop every cached entry for a school"""
+        school_id = str(school_id)
+        doomed = [key for key in self._data if key[0] == school_id]
+        for key in doomed:
+            del self._data[key]
+        if doomed:
+            logger.debug(f"Academic cache: dropped {len(doomed)} entries for school {school_id}")
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Shared per-process cache
+academic_cache = AcademicContextCache()
@@ -0,0 +1,180 @@
+# rasa/actions/api_client.py
+"""
+Shared async HTTP client for calling the FastAPI backend from Rasa actions.
+
+One pooled httpx.AsyncClient per event loop, so consecutive calls inside an
+action (and across actions) reuse keep-alive connections to FASTAPI_BASE_URL,
+and independent lookups can run concurrently with asyncio.gather.
+Every request gets a default timeout; connection failures are retried for
+any verb, read timeouts and 502/503/504 only for idempotent verbs.
+Current academic setup/year/term and class-list GETs are served from
+academic_cache and invalidated by writes made through this client.
+
+Usage:
+    from actions.api_client import api, FASTAPI_BASE_URL
+
+    response = await api.get(f"{FASTAPI_BASE_URL}/classes", headers=headers)
+    response = await api.get("/classes", tracker=tracker)   # auth + X-School-ID from metadata
+
+    term_response, classes_response = await asyncio.gather(
+        api.get("/academic/current-term", tracker=tracker),
+        api.get("/classes", tracker=tracker),
+    )
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from actions.academic_cache import academic_cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+FASTAPI_BASE_URL = os.getenv("FASTAPI_BASE_URL", "http://127.0.0.1:8000/api")
+
+CONNECT_TIMEOUT = float(os.getenv("ACTIONS_API_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("ACTIONS_API_TIMEOUT", "30"))
+POOL_SIZE = int(os.getenv("ACTIONS_API_POOL_SIZE", "20"))
+MAX_RETRIES = int(os.getenv("ACTIONS_API_MAX_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("ACTIONS_API_RETRY_BACKOFF", "0.3"))
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+RETRY_STATUSES = {502, 503, 504}
+
+# Raised for transport problems (connection refused, timeouts, ...)
+ApiError = httpx.HTTPError
+
+
+def auth_headers(tracker) -> Dict[str, str]:
+    """Authorization and X-School-ID headers from the latest message metadata"""
+    metadata = tracker.latest_message.get("metadata", {}) or {}
+    headers = {}
+    if metadata.get("auth_token"):
+        headers["Authorization"] = f"Bearer {metadata['auth_token']}"
+    if metadata.get("school_id"):
+        headers["X-School-ID"] = str(metadata["school_id"])
+    return headers
+
+
+def _api_path(url: str) -> str:
+    """Path relative to FASTAPI_BASE_URL without query or trailing slash ('' for other hosts)"""
+    if not url.startswith(FASTAPI_BASE_URL):
+        return ""
+    return url[len(FASTAPI_BASE_URL):].split("?", 1)[0].rstrip("/")
+
+
+class ActionsApiClient:
+    """Thin wrapper over a pooled httpx.AsyncClient with actions-specific defaults"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+        timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+        logger.info(f"Actions API client created for {FASTAPI_BASE_URL} (pool={POOL_SIZE}, retries={MAX_RETRIES})")
+        # follow_redirects matches requests' behaviour for FastAPI's trailing-slash redirects
+        return httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # httpx clients are bound to the loop they were first used on
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = self._build_client()
+            self._loop = loop
+        return self._client
+
+    async def request(self, method: str, url: str, tracker=None, headers: Optional[Dict[str, str]] = None,
+                      params: Optional[Dict[str, Any]] = None, **kwargs) -> httpx.Response:
+        """
+        Send a request through the shared client.
+
+        Relative paths ("/classes") are resolved against FASTAPI_BASE_URL.
+        When ``tracker`` is given its auth headers are injected; explicit
+        ``headers`` still win. None-valued headers and params are dropped.
+        """
+        if url.startswith("/"):
+            url = f"{FASTAPI_BASE_URL}{url}"
+
+        merged = auth_headers(tracker) if tracker is not None else {}
+        if headers:
+            merged.update({k: v for k, v in headers.items() if v is not None})
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+
+        method = method.upper()
+        path = _api_path(url)
+        school_id = merged.get("X-School-ID")
+        # Cache entries are scoped to the exact token the backend accepted
+        authorization = merged.get("Authorization")
+
+        if method == "GET":
+            cached = academic_cache.get(school_id, authorization, path, params)
+            if cached is not None:
+                return cached
+            response = await self._send(method, url, merged, params, **kwargs)
+            academic_cache.set(school_id, authorization, path, params, response)
+            return response
+
+        try:
+            return await self._send(method, url, merged, params, **kwargs)
+        finally:
+            # Even a failed write may have changed state server-side
+            academic_cache.note_write(school_id, path)
+
+    async def _send(self, method: str, url: str, headers: Dict[str, str],
+                    params: Optional[Dict[str, Any]], **kwargs) -> httpx.Response:
+        retryable_read = method in IDEMPOTENT_METHODS
+        attempt = 0
+
+        while True:
+            try:
+                response = await self.client.request(method, url, headers=headers, params=params, **kwargs)
+                if not (retryable_read and response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES):
+                    return response
+                logger.warning(f"{method} {url} returned {response.status_code}, retrying")
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Nothing reached the API; safe to retry any verb
+                if attempt >= MAX_RETRIES:
+                    raise
+                logger.warning(f"{method} {url} failed ({type(e).__name__}), retrying")
+            except httpx.ReadTimeout:
+                if not retryable_read or attempt >= MAX_RETRIES:
+                    raise
+                logger.warning(f"{method} {url} timed out, retrying")
+
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+
+# Shared per-process client
+api = ActionsApiClient()
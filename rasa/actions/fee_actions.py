@@ -2,7 +2,7 @@
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
-import requests
+from actions.api_client import api
 import logging
 import re
 from typing import Dict, Text, Any, List
@@ -63,7 +63,7 @@ class ActionCreateFeeStructure(Action):
     def name(self) -> Text:
         return "action_create_fee_structure"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -107,7 +107,7 @@ class ActionCreateFeeStructure(Action):
                     "X-School-ID": school_id
                 }
                 
-                current_year_response = requests.get(
+                current_year_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-year",
                     headers=headers
                 )
@@ -138,7 +138,7 @@ class ActionCreateFeeStructure(Action):
             }
             
             # CHECK FOR EXISTING STRUCTURES FIRST
-            check_response = requests.get(
+            check_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
                 headers=headers,
                 params={"year": academic_year, "term": term}
@@ -200,7 +200,7 @@ class ActionCreateFeeStructure(Action):
                 "is_default": (level == "ALL")
             }
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
                 json=payload,
                 headers=headers
@@ -251,7 +251,7 @@ class ActionListFeeStructures(Action):
     def name(self) -> Text:
         return "action_list_fee_structures"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -277,7 +277,7 @@ class ActionListFeeStructures(Action):
             if term:
                 params["term"] = term
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
                 headers=headers,
                 params=params
@@ -376,7 +376,7 @@ class ActionGenerateInvoices(Action):
     def name(self) -> Text:
         return "action_generate_invoices"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -468,7 +468,7 @@ class ActionGenerateInvoices(Action):
                 class_name = normalize_class_name(class_name)
                 
                 # Find class ID
-                class_response = requests.get(
+                class_response = await api.get(
                     f"{FASTAPI_BASE_URL}/classes",
                     headers=headers,
                     params={"search": class_name}
@@ -480,7 +480,7 @@ class ActionGenerateInvoices(Action):
                         payload["class_id"] = classes[0]["id"]
                         logger.info(f"Added class_id to payload: {payload}")
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/invoices/generate/",
                 json=payload,
                 headers=headers
@@ -516,7 +516,7 @@ class ActionGenerateInvoices(Action):
                 
                 if 'default fee structure' in error_detail.lower():
                     # Check what published structures exist
-                    structures_response = requests.get(
+                    structures_response = await api.get(
                         f"{FASTAPI_BASE_URL}/fees/structures/",
                         headers=headers,
                         params={"year": academic_year, "term": term}
@@ -571,7 +571,7 @@ class ActionSetStructureAsDefault(Action):
     def name(self) -> Text:
         return "action_set_structure_as_default"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -601,7 +601,7 @@ class ActionSetStructureAsDefault(Action):
             }
             
             # Find the structure
-            structures_response = requests.get(
+            structures_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
                 headers=headers
             )
@@ -631,7 +631,7 @@ class ActionSetStructureAsDefault(Action):
                 return []
             
             # Set as default
-            response = requests.put(
+            response = await api.put(
                 f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}",
                 params={"is_default": True},
                 headers=headers
@@ -659,7 +659,7 @@ class ActionGetInvoice(Action):
     def name(self) -> Text:
         return "action_get_invoice"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -694,7 +694,7 @@ class ActionGetInvoice(Action):
             elif student_name:
                 search_params["search"] = student_name
             
-            students_response = requests.get(
+            students_response = await api.get(
                 f"{FASTAPI_BASE_URL}/students",
                 headers=headers,
                 params=search_params
@@ -719,7 +719,7 @@ class ActionGetInvoice(Action):
             full_name = f"{student['first_name']} {student['last_name']}"
             
             # Get current term
-            term_response = requests.get(
+            term_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-term",
                 headers=headers
             )
@@ -736,7 +736,7 @@ class ActionGetInvoice(Action):
             term = term_data.get("term")
             
             # Get student's invoices (returns a LIST)
-            invoice_response = requests.get(
+            invoice_response = await api.get(
                 f"{FASTAPI_BASE_URL}/invoices/student/{student['id']}",
                 headers=headers,
                 params={"year": academic_year, "term": term}
@@ -766,10 +766,10 @@ class ActionGetInvoice(Action):
                     dispatcher.utter_message(text=msg)
                 else:
                     # No invoice for current term - guide user
-                    self._guide_no_invoice(dispatcher, full_name, academic_year, term, headers)
+                    await self._guide_no_invoice(dispatcher, full_name, academic_year, term, headers)
             else:
                 # API error
-                self._guide_no_invoice(dispatcher, full_name, academic_year, term, headers)
+                await self._guide_no_invoice(dispatcher, full_name, academic_year, term, headers)
         
         except Exception as e:
             logger.error(f"Error getting invoice: {e}", exc_info=True)
@@ -780,10 +780,10 @@ class ActionGetInvoice(Action):
             SlotSet("admission_no", None)
         ]
     
-    def _guide_no_invoice(self, dispatcher, student_name, academic_year, term, headers):
+    async def _guide_no_invoice(self, dispatcher, student_name, academic_year, term, headers):
         """Helper method to guide user when no invoice found"""
         # Check if fee structure exists
-        fee_structure_response = requests.get(
+        fee_structure_response = await api.get(
             f"{FASTAPI_BASE_URL}/fees/structures",
             headers=headers,
             params={"year": academic_year, "term": term}
@@ -820,12 +820,11 @@ class ActionAddFeeItem(Action):
     def name(self) -> Text:
         return "action_add_fee_item"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
         auth_token = metadata.get("auth_token")
-        school_id = metadata.get("school_id")
         
         if not auth_token:
             dispatcher.utter_message(text="Authentication required.")
@@ -893,21 +892,16 @@ class ActionAddFeeItem(Action):
         
         if not structure_name:
             try:
-                headers = {
-                    "Authorization": f"Bearer {auth_token}",
-                    "X-School-ID": school_id
-                }
-                
-                current_response = requests.get(
+                current_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-term",
-                    headers=headers
+                    tracker=tracker
                 )
                 
                 if current_response.status_code == 200:
                     current_term_data = current_response.json()
-                    structures_response = requests.get(
+                    structures_response = await api.get(
                         f"{FASTAPI_BASE_URL}/fees/structures/",
-                        headers=headers,
+                        tracker=tracker,
                         params={
                             "year": current_term_data['academic_year'],
                             "term": current_term_data['term']
@@ -947,12 +941,6 @@ class ActionAddFeeItem(Action):
             return []
         
         try:
-            headers = {
-                "Authorization": f"Bearer {auth_token}",
-                "Content-Type": "application/json",
-                "X-School-ID": school_id
-            }
-            
             # Clean and convert amount - handle "bob" slang
             amount_clean = amount.replace(",", "").replace("bob", "").replace("kes", "").strip()
             try:
@@ -964,9 +952,9 @@ class ActionAddFeeItem(Action):
                 return []
             
             # Get all fee structures
-            structures_response = requests.get(
+            structures_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
-                headers=headers
+                tracker=tracker
             )
             
             if structures_response.status_code != 200:
@@ -1039,9 +1027,9 @@ class ActionAddFeeItem(Action):
                 return []
             
             # Get structure details with items to check for existing fee
-            structure_detail_response = requests.get(
+            structure_detail_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}",
-                headers=headers
+                tracker=tracker
             )
             
             is_update = False
@@ -1070,16 +1058,16 @@ class ActionAddFeeItem(Action):
             
             # UPDATE or CREATE
             if is_update and existing_item_id:
-                response = requests.put(
+                response = await api.put(
                     f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}/items/{existing_item_id}",
                     json=fee_item_payload,
-                    headers=headers
+                    tracker=tracker
                 )
             else:
-                response = requests.post(
+                response = await api.post(
                     f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}/items/",
                     json=fee_item_payload,
-                    headers=headers
+                    tracker=tracker
                 )
             
             if response.status_code in [200, 201]:
@@ -1124,7 +1112,7 @@ class ActionViewFeeStructureDetails(Action):
     def name(self) -> Text:
         return "action_view_fee_structure_details"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1173,7 +1161,7 @@ class ActionViewFeeStructureDetails(Action):
             }
             
             # Get all structures to find the right one
-            structures_response = requests.get(
+            structures_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
                 headers=headers
             )
@@ -1238,7 +1226,7 @@ class ActionViewFeeStructureDetails(Action):
                 return []
             
             # Get detailed structure with items
-            detail_response = requests.get(
+            detail_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}",
                 headers=headers
             )
@@ -1303,7 +1291,7 @@ class ActionDeleteFeeItems(Action):
     def name(self) -> Text:
         return "action_delete_fee_items"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1335,7 +1323,7 @@ class ActionDeleteFeeItems(Action):
             }
             
             # Find structure
-            structures_response = requests.get(
+            structures_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
                 headers=headers
             )
@@ -1380,7 +1368,7 @@ class ActionDeleteFeeItems(Action):
                 return []
             
             # Delete all items
-            response = requests.delete(
+            response = await api.delete(
                 f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}/items",
                 headers=headers
             )
@@ -1408,7 +1396,7 @@ class ActionDeleteSpecificFeeItem(Action):
     def name(self) -> Text:
         return "action_delete_specific_fee_item"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1448,7 +1436,7 @@ class ActionDeleteSpecificFeeItem(Action):
             }
             
             # Find structure
-            structures_response = requests.get(
+            structures_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
                 headers=headers
             )
@@ -1477,7 +1465,7 @@ class ActionDeleteSpecificFeeItem(Action):
                 return []
             
             # Get structure details
-            detail_response = requests.get(
+            detail_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}",
                 headers=headers
             )
@@ -1501,7 +1489,7 @@ class ActionDeleteSpecificFeeItem(Action):
             # Delete all matching items
             deleted_count = 0
             for item in matching_items:
-                response = requests.delete(
+                response = await api.delete(
                     f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}/items/{item['id']}",
                     headers=headers
                 )
@@ -1534,7 +1522,7 @@ class ActionPublishFeeStructure(Action):
     def name(self) -> Text:
         return "action_publish_fee_structure"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1578,7 +1566,7 @@ class ActionPublishFeeStructure(Action):
             if term:
                 params["term"] = term
             
-            structures_response = requests.get(
+            structures_response = await api.get(
                 f"{FASTAPI_BASE_URL}/fees/structures/",
                 headers=headers,
                 params=params
@@ -1695,7 +1683,7 @@ class ActionPublishFeeStructure(Action):
                 return []
             
             # Publish the structure
-            response = requests.put(
+            response = await api.put(
                 f"{FASTAPI_BASE_URL}/fees/structures/{target_structure['id']}",
                 params={"is_published": True},
                 headers=headers
@@ -1713,7 +1701,7 @@ class ActionPublishFeeStructure(Action):
                     msg += "This structure is now locked and ready for invoicing.\n\n"
                     
                     # Check if there's already a default for this term/year
-                    check_default_response = requests.get(
+                    check_default_response = await api.get(
                         f"{FASTAPI_BASE_URL}/fees/structures/",
                         headers=headers,
                         params={"year": target_structure['year'], "term": target_structure['term']}
@@ -1784,7 +1772,7 @@ class ActionSetDefaultFeeStructure(Action):
     def name(self) -> Text:
         return "action_set_default_fee_structure"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1815,7 +1803,7 @@ class ActionSetDefaultFeeStructure(Action):
             }
             
             # Set as default
-            response = requests.put(
+            response = await api.put(
                 f"{FASTAPI_BASE_URL}/fees/structures/{structure_id}",
                 params={"is_default": True},
                 headers=headers
@@ -1848,7 +1836,7 @@ class ActionIssueInvoices(Action):
     def name(self) -> Text:
         return "action_issue_invoices"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1919,7 +1907,7 @@ class ActionIssueInvoices(Action):
                     "X-School-ID": school_id
                 }
                 
-                current_term_response = requests.get(
+                current_term_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-term",
                     headers=headers
                 )
@@ -1960,7 +1948,7 @@ class ActionIssueInvoices(Action):
                 from actions.actions import normalize_class_name
                 class_name = normalize_class_name(class_name)
                 
-                class_response = requests.get(
+                class_response = await api.get(
                     f"{FASTAPI_BASE_URL}/classes",
                     headers=headers,
                     params={"search": class_name}
@@ -1972,7 +1960,7 @@ class ActionIssueInvoices(Action):
                         params["class_id"] = classes[0]["id"]
                         logger.info(f"Added class_id to params: {params}")
             
-            response = requests.put(
+            response = await api.put(
                 f"{FASTAPI_BASE_URL}/invoices/bulk-issue/",
                 headers=headers,
                 params=params
@@ -2016,7 +2004,7 @@ class ActionListInvoices(Action):
     def name(self) -> Text:
         return "action_list_invoices"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2038,7 +2026,7 @@ class ActionListInvoices(Action):
                     "X-School-ID": school_id
                 }
                 
-                current_response = requests.get(
+                current_response = await api.get(
                     f"{FASTAPI_BASE_URL}/terms/current",
                     headers=headers
                 )
@@ -2067,7 +2055,7 @@ class ActionListInvoices(Action):
                 "term": int(term)
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/invoices/",
                 headers=headers,
                 params=params
@@ -2134,7 +2122,7 @@ class ActionListInvoicesByClass(Action):
     def name(self) -> Text:
         return "action_list_invoices_by_class"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2163,7 +2151,7 @@ class ActionListInvoicesByClass(Action):
                     "X-School-ID": school_id
                 }
                 
-                current_response = requests.get(
+                current_response = await api.get(
                     f"{FASTAPI_BASE_URL}/terms/current",
                     headers=headers
                 )
@@ -2187,7 +2175,7 @@ class ActionListInvoicesByClass(Action):
             from actions.actions import normalize_class_name
             class_name = normalize_class_name(class_name)
             
-            class_response = requests.get(
+            class_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers,
                 params={"search": class_name}
@@ -2210,7 +2198,7 @@ class ActionListInvoicesByClass(Action):
                 "class_id": class_id
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/invoices/",
                 headers=headers,
                 params=params
@@ -2256,7 +2244,7 @@ class ActionListUnpaidInvoices(Action):
     def name(self) -> Text:
         return "action_list_unpaid_invoices"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2327,7 +2315,7 @@ class ActionListUnpaidInvoices(Action):
                     "X-School-ID": school_id
                 }
                 
-                current_response = requests.get(
+                current_response = await api.get(
                     f"{FASTAPI_BASE_URL}/terms/current",
                     headers=headers
                 )
@@ -2350,7 +2338,9 @@ class ActionListUnpaidInvoices(Action):
             
             params = {
                 "year": int(academic_year),
-                "term": int(term)
+                "term": int(term),
+                "include": "student",  # names come back with the invoices
+                "outstanding": "true"  # paid and cancelled invoices are never listed
             }
             
             logger.info(f"Calling API with params: {params}")
@@ -2359,7 +2349,7 @@ class ActionListUnpaidInvoices(Action):
                 from actions.actions import normalize_class_name
                 class_name = normalize_class_name(class_name)
                 
-                class_response = requests.get(
+                class_response = await api.get(
                     f"{FASTAPI_BASE_URL}/classes",
                     headers=headers,
                     params={"search": class_name}
@@ -2371,7 +2361,7 @@ class ActionListUnpaidInvoices(Action):
                         params["class_id"] = classes[0]["id"]
                         logger.info(f"Added class_id to params: {params}")
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/invoices/",
                 headers=headers,
                 params=params
@@ -2434,9 +2424,10 @@ class ActionListUnpaidInvoices(Action):
                 
                 # Show top 5 highest balances
                 unpaid_sorted = sorted(unpaid, key=lambda x: float(x['balance']), reverse=True)
+                top_unpaid = unpaid_sorted[:5]
                 msg += "Top Outstanding Balances:\n"
                 
-                for i, inv in enumerate(unpaid_sorted[:5], 1):
+                for i, inv in enumerate(top_unpaid, 1):
                     balance = float(inv['balance'])
                     status_icon = {
                         "ISSUED": "●",
@@ -2447,16 +2438,9 @@ class ActionListUnpaidInvoices(Action):
                     student_id = inv['student_id']
                     student_display = f"#{student_id[:8]}..."
                     
-                    try:
-                        student_response = requests.get(
-                            f"{FASTAPI_BASE_URL}/students/{student_id}",
-                            headers=headers
-                        )
-                        if student_response.status_code == 200:
-                            student = student_response.json()
-                            student_display = f"{student['first_name']} {student['last_name']} (#{student['admission_no']})"
-                    except:
-                        pass
+                    student = inv.get('student')
+                    if student:
+                        student_display = f"{student['full_name']} (#{student['admission_no']})"
                     
                     msg += f"{i}. {status_icon} {student_display} - KES {balance:,.2f}\n"
                 
@@ -2482,17 +2466,17 @@ class ActionListStudentsWithBalances(Action):
     def name(self) -> Text:
         return "action_list_students_with_balances"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         # Delegate to the unpaid invoices action
         action = ActionListUnpaidInvoices()
-        return action.run(dispatcher, tracker, domain)
+        return await action.run(dispatcher, tracker, domain)
 
 class ActionCancelInvoice(Action):
     def name(self) -> Text:
         return "action_cancel_invoice"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2525,7 +2509,7 @@ class ActionCancelInvoice(Action):
             elif student_name:
                 search_params["search"] = student_name
             
-            students_response = requests.get(
+            students_response = await api.get(
                 f"{FASTAPI_BASE_URL}/students",
                 headers=headers,
                 params=search_params
@@ -2553,7 +2537,7 @@ class ActionCancelInvoice(Action):
             full_name = f"{student['first_name']} {student['last_name']}"
             
             # Get student's current invoices
-            invoices_response = requests.get(
+            invoices_response = await api.get(
                 f"{FASTAPI_BASE_URL}/invoices/student/{student_id}",
                 headers=headers
             )
@@ -2580,7 +2564,7 @@ class ActionCancelInvoice(Action):
             # Cancel the most recent one
             latest = cancellable[0]
             
-            cancel_response = requests.put(
+            cancel_response = await api.put(
                 f"{FASTAPI_BASE_URL}/invoices/{latest['id']}/cancel",
                 headers=headers
             )
@@ -2610,7 +2594,7 @@ class ActionRecordPayment(Action):
     def name(self) -> Text:
         return "action_record_payment"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2654,7 +2638,7 @@ class ActionRecordPayment(Action):
             elif student_name:
                 search_params["search"] = student_name
             
-            students_response = requests.get(
+            students_response = await api.get(
                 f"{FASTAPI_BASE_URL}/students",
                 headers=headers,
                 params=search_params
@@ -2682,7 +2666,7 @@ class ActionRecordPayment(Action):
             full_name = f"{student['first_name']} {student['last_name']}"
             
             # Get student's current invoices
-            invoices_response = requests.get(
+            invoices_response = await api.get(
                 f"{FASTAPI_BASE_URL}/invoices/student/{student_id}",
                 headers=headers
             )
@@ -2732,7 +2716,7 @@ class ActionRecordPayment(Action):
                 "txn_ref": txn_ref
             }
             
-            payment_response = requests.post(
+            payment_response = await api.post(
                 f"{FASTAPI_BASE_URL}/payments/",
                 json=payment_data,
                 headers=headers
@@ -2799,7 +2783,7 @@ class ActionSendPaymentNotification(Action):
     def name(self) -> Text:
         return "action_send_payment_notification"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2832,7 +2816,7 @@ class ActionSendPaymentNotification(Action):
                 "notification_type": "PAYMENT_RECEIVED"
             }
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/notifications/payment",
                 json=notification_data,
                 headers=headers
@@ -2878,7 +2862,7 @@ class ActionNotifyParentsWithBalances(Action):
     def name(self) -> Text:
         return "action_notify_parents_with_balances"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -2901,7 +2885,7 @@ class ActionNotifyParentsWithBalances(Action):
                 }
                 
                 # FIXED: Use correct endpoint
-                current_response = requests.get(
+                current_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-term",
                     headers=headers
                 )
@@ -2944,7 +2928,7 @@ class ActionNotifyParentsWithBalances(Action):
             }
             
             # Call bulk notification endpoint
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/notifications/unpaid-balances",
                 headers=headers,
                 json={
@@ -2953,10 +2937,11 @@ class ActionNotifyParentsWithBalances(Action):
                 }
             )
             
-            if response.status_code in [200, 201]:
+            if response.status_code in [200, 201, 202]:
                 data = response.json()
-                count = data.get("notifications_sent", 0)
-                failed = data.get("failed", 0)
+                # Emails go out in the background; the API returns once they are queued
+                count = data.get("queued", 0)
+                failed = data.get("skipped", 0)
                 
                 if count == 0:
                     msg = f"No guardians notified.\n\n"
@@ -2965,11 +2950,11 @@ class ActionNotifyParentsWithBalances(Action):
                     dispatcher.utter_message(text=msg)
                     return []
                 
-                msg = f"**Fee reminder notifications sent successfully!**\n\n"
-                msg += f"**Notifications sent:** {count}\n"
+                msg = f"**Fee reminder notifications queued for delivery!**\n\n"
+                msg += f"**Notifications queued:** {count}\n"
                 
                 if failed > 0:
-                    msg += f"**Failed:** {failed}\n"
+                    msg += f"**Skipped (no email):** {failed}\n"
                 
                 msg += f"**Term:** {term} {academic_year}\n\n"
                 msg += f"---\n\n"
@@ -2988,7 +2973,7 @@ class ActionNotifyParentsWithBalances(Action):
                 msg += f"Best regards,\n"
                 msg += f"School Administration\n"
                 msg += f"```\n\n"
-                msg += f"Guardians have been notified about outstanding balances."
+                msg += f"Guardians will be notified about outstanding balances shortly."
                 
                 dispatcher.utter_message(text=msg)
             else:
@@ -3010,7 +2995,7 @@ class ActionBroadcastMessageToAllParents(Action):
     def name(self) -> Text:
         return "action_broadcast_message_to_all_parents"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -3043,17 +3028,16 @@ class ActionBroadcastMessageToAllParents(Action):
             }
             
             # Send broadcast
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/notifications/broadcast",
                 json=notification_data,
                 headers=headers
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):
                 data = response.json()
                 
-                sent_count = data.get("sent_count", 0)
-                failed_count = data.get("failed_count", 0)
+                sent_count = data.get("queued", 0)
                 total_guardians = data.get("total_guardians", 0)
                 
                 if sent_count == 0 and total_guardians == 0:
@@ -3063,12 +3047,9 @@ class ActionBroadcastMessageToAllParents(Action):
                     return [SlotSet("message", None)]
                 
                 # Build success message with email preview
-                msg = f"**Broadcast message sent successfully!**\n\n"
+                msg = f"**Broadcast message queued for delivery!**\n\n"
                 msg += f"**Recipients:** {sent_count} guardian(s)\n"
                 
-                if failed_count > 0:
-                    msg += f"**Failed:** {failed_count}\n"
-                
                 msg += f"\n---\n\n"
                 msg += f"**Email Preview:**\n\n"
                 msg += f"```\n"
@@ -3079,7 +3060,7 @@ class ActionBroadcastMessageToAllParents(Action):
                 msg += f"Best regards,\n"
                 msg += f"School Administration\n"
                 msg += f"```\n\n"
-                msg += f"All guardians have been notified."
+                msg += f"All guardians will be notified shortly."
                 
                 dispatcher.utter_message(text=msg)
             else:
@@ -3,7 +3,7 @@ from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet  # Remove FollowupAction import
 from typing import Dict, Text, Any, List
 from dotenv import load_dotenv
-import requests
+from actions.api_client import api, ApiError
 import logging
 import os
 
@@ -20,7 +20,7 @@ class ActionValidateStudentCreationPrerequisites(Action):
     def name(self) -> Text:
         return "action_validate_student_creation_prerequisites"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -39,14 +39,14 @@ class ActionValidateStudentCreationPrerequisites(Action):
             }
             
             # Check academic setup
-            setup_response = requests.get(
+            setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
             
             if setup_response.status_code != 200:
                 # Check if ANY academic years exist first
-                years_response = requests.get(
+                years_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/years",
                     headers=headers
                 )
@@ -72,7 +72,7 @@ class ActionValidateStudentCreationPrerequisites(Action):
                 return [SlotSet("prerequisites_met", False)]
             
             # Check if there are any classes
-            classes_response = requests.get(
+            classes_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers
             )
@@ -88,7 +88,7 @@ class ActionValidateStudentCreationPrerequisites(Action):
             # All checks passed
             return [SlotSet("prerequisites_met", True)]
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error validating prerequisites: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -3,7 +3,7 @@ from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
 from rasa_sdk.types import DomainDict
 from dotenv import load_dotenv
-import requests
+from actions.api_client import api
 import logging
 import re  # CRITICAL: Add this import
 from typing import Dict, Text, Any, List
@@ -19,7 +19,7 @@ class ActionAddGuardian(Action):
     def name(self) -> Text:
         return "action_add_guardian"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -70,7 +70,7 @@ class ActionAddGuardian(Action):
                 dispatcher.utter_message(text="Could not identify student.")
                 return []
             
-            students_response = requests.get(
+            students_response = await api.get(
                 f"{FASTAPI_BASE_URL}/students",
                 headers=headers,
                 params=search_params
@@ -118,7 +118,7 @@ class ActionAddGuardian(Action):
                 "student_id": student_id
             }
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/guardians/",
                 json=guardian_data,
                 headers=headers
@@ -161,7 +161,7 @@ class ActionGetGuardians(Action):
     def name(self) -> Text:
         return "action_get_guardians"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -194,7 +194,7 @@ class ActionGetGuardians(Action):
             elif student_name:
                 search_params["search"] = student_name
             
-            students_response = requests.get(
+            students_response = await api.get(
                 f"{FASTAPI_BASE_URL}/students",
                 headers=headers,
                 params=search_params
@@ -220,7 +220,7 @@ class ActionGetGuardians(Action):
             full_name = f"{student['first_name']} {student['last_name']}"
             
             # Get guardians
-            guardians_response = requests.get(
+            guardians_response = await api.get(
                 f"{FASTAPI_BASE_URL}/guardians/student/{student_id}",
                 headers=headers
             )
@@ -278,7 +278,7 @@ class ActionListStudentsWithoutGuardians(Action):
     def name(self) -> Text:
         return "action_list_students_without_guardians"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -295,7 +295,7 @@ class ActionListStudentsWithoutGuardians(Action):
                 "X-School-ID": school_id
             }
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/guardians/unlinked-students",
                 headers=headers
             )
@@ -334,7 +334,7 @@ class ActionSetPrimaryGuardian(Action):
     def name(self) -> Text:
         return "action_set_primary_guardian"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -376,7 +376,7 @@ class ActionSetPrimaryGuardian(Action):
             elif student_name:
                 search_params["search"] = student_name
             
-            students_response = requests.get(
+            students_response = await api.get(
                 f"{FASTAPI_BASE_URL}/students",
                 headers=headers,
                 params=search_params
@@ -404,7 +404,7 @@ class ActionSetPrimaryGuardian(Action):
             full_name = f"{student['first_name']} {student['last_name']}"
             
             # Find guardian linked to this student
-            guardians_response = requests.get(
+            guardians_response = await api.get(
                 f"{FASTAPI_BASE_URL}/guardians/student/{student_id}",
                 headers=headers
             )
@@ -444,7 +444,7 @@ class ActionSetPrimaryGuardian(Action):
                 "primary_guardian_id": target_guardian['id']
             }
             
-            update_response = requests.put(
+            update_response = await api.put(
                 f"{FASTAPI_BASE_URL}/students/{student_id}",
                 json=update_data,
                 headers=headers
@@ -482,7 +482,7 @@ class ActionUpdateGuardian(Action):
     def name(self) -> Text:
         return "action_update_guardian"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -519,7 +519,7 @@ class ActionUpdateGuardian(Action):
             }
             
             # Search for guardian across all students
-            students_response = requests.get(
+            students_response = await api.get(
                 f"{FASTAPI_BASE_URL}/students",
                 headers=headers,
                 params={"limit": 100}
@@ -535,7 +535,7 @@ class ActionUpdateGuardian(Action):
             guardian_name_lower = guardian_name.lower().strip()
             
             for student in students:
-                guardians_response = requests.get(
+                guardians_response = await api.get(
                     f"{FASTAPI_BASE_URL}/guardians/student/{student['id']}",
                     headers=headers
                 )
@@ -568,7 +568,7 @@ class ActionUpdateGuardian(Action):
                 update_data["relationship"] = clean_rel
             
             # Call update endpoint
-            response = requests.put(
+            response = await api.put(
                 f"{FASTAPI_BASE_URL}/guardians/{target_guardian['id']}",
                 json=update_data,
                 headers=headers
@@ -608,7 +608,7 @@ class ActionListAllGuardians(Action):
     def name(self) -> Text:
         return "action_list_all_guardians"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -626,7 +626,7 @@ class ActionListAllGuardians(Action):
             }
             
             # Get all guardians
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/guardians/",
                 headers=headers
             )
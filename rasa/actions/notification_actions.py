@@ -1,7 +1,7 @@
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
-import requests
+from actions.api_client import api
 import logging
 from typing import Dict, Text, Any, List
 import os
@@ -18,7 +18,7 @@ class ActionNotifyPendingInvoices(Action):
     def name(self) -> Text:
         return "action_notify_pending_invoices"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -53,7 +53,7 @@ class ActionNotifyPendingInvoices(Action):
                     "X-School-ID": school_id
                 }
                 
-                current_response = requests.get(
+                current_response = await api.get(
                     f"{FASTAPI_BASE_URL}/academic/current-term",
                     headers=headers
                 )
@@ -87,17 +87,18 @@ class ActionNotifyPendingInvoices(Action):
                 params["due_date_override"] = due_date
             
             # Call notification endpoint
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/notifications/notify-pending-invoices",
                 headers=headers,
                 params=params
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):
                 data = response.json()
                 
-                sent = data.get("sent", 0)
-                failed = data.get("failed", 0)
+                # Emails go out in the background; the API returns once they are queued
+                sent = data.get("queued", 0)
+                failed = data.get("skipped", 0)
                 errors = data.get("errors", [])
                 
                 if sent == 0 and failed == 0:
@@ -106,11 +107,11 @@ class ActionNotifyPendingInvoices(Action):
                     return []
                 
                 # Build success message with email preview
-                msg = f"**Fee reminder notifications sent successfully!**\n\n"
-                msg += f"**Notifications sent:** {sent}\n"
+                msg = f"**Fee reminder notifications queued for delivery!**\n\n"
+                msg += f"**Notifications queued:** {sent}\n"
                 
                 if failed > 0:
-                    msg += f"**Failed:** {failed}\n"
+                    msg += f"**Skipped:** {failed}\n"
                 
                 msg += f"**Term:** {term} {academic_year}\n"
                 
@@ -158,7 +159,7 @@ class ActionNotifyPendingInvoices(Action):
                     
                     msg += f"\n**Action needed:** Add email addresses for affected guardians to ensure they receive notifications."
                 else:
-                    msg += f"All guardians have been notified."
+                    msg += f"All guardians will be notified shortly."
                 
                 dispatcher.utter_message(text=msg)
             else:
@@ -181,7 +182,7 @@ class ActionSendGuardianMessage(Action):
     def name(self) -> Text:
         return "action_send_guardian_message"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -224,7 +225,7 @@ class ActionSendGuardianMessage(Action):
             elif student_name:
                 search_params["search"] = student_name
             
-            students_response = requests.get(
+            students_response = await api.get(
                 f"{FASTAPI_BASE_URL}/students",
                 headers=headers,
                 params=search_params
@@ -250,7 +251,7 @@ class ActionSendGuardianMessage(Action):
             full_name = f"{student['first_name']} {student['last_name']}"
             
             # Check if student has guardians
-            guardians_response = requests.get(
+            guardians_response = await api.get(
                 f"{FASTAPI_BASE_URL}/guardians/student/{student_id}",
                 headers=headers
             )
@@ -281,18 +282,18 @@ class ActionSendGuardianMessage(Action):
                 "message": message
             }
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/notifications/guardian-message",
                 json=notification_data,
                 headers=headers
             )
             
-            if response.status_code in [200, 201]:
+            if response.status_code in [200, 201, 202]:
                 data = response.json()
-                sent_count = data.get("sent_count", len(guardians))
+                sent_count = data.get("queued", len(guardians))
                 
                 # Build preview message
-                msg = f"**Message sent successfully!**\n\n"
+                msg = f"**Message queued for delivery!**\n\n"
                 msg += f"**Student:** {full_name} (#{student['admission_no']})\n"
                 msg += f"**Recipients:** {sent_count} guardian(s)\n\n"
                 msg += f"---\n\n"
@@ -1,7 +1,7 @@
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from typing import Dict, Text, Any, List
-import requests
+from actions.api_client import api
 import logging
 import os
 from dotenv import load_dotenv
@@ -17,7 +17,7 @@ class ActionGetSchoolInfo(Action):
     def name(self) -> Text:
         return "action_get_school_info"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -35,7 +35,7 @@ class ActionGetSchoolInfo(Action):
             }
             
             # Fetch school overview
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/schools/{school_id}/overview",
                 headers=headers
             )
@@ -9,7 +9,8 @@ from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
 from rasa_sdk.forms import FormValidationAction
 from rasa_sdk.types import DomainDict
-import requests
+from actions.api_client import api, ApiError
+import asyncio
 import logging
 import re
 from datetime import datetime
@@ -66,7 +67,7 @@ class ActionCreateStudent(Action):
     def name(self) -> Text:
         return "action_create_student"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -133,9 +134,17 @@ class ActionCreateStudent(Action):
                 "X-School-ID": school_id
             }
             
-            academic_setup_response = requests.get(
-                f"{FASTAPI_BASE_URL}/academic/current-setup",
-                headers=headers
+            # Setup and class lookups are independent; fetch them together
+            academic_setup_response, class_response = await asyncio.gather(
+                api.get(
+                    f"{FASTAPI_BASE_URL}/academic/current-setup",
+                    headers=headers
+                ),
+                api.get(
+                    f"{FASTAPI_BASE_URL}/classes",
+                    headers=headers,
+                    params={"search": class_name}
+                )
             )
             
             if academic_setup_response.status_code != 200:
@@ -203,12 +212,6 @@ class ActionCreateStudent(Action):
             current_year_id = setup_data["current_year"]["id"]
             current_term_id = setup_data["current_term"]["id"]
             
-            class_response = requests.get(
-                f"{FASTAPI_BASE_URL}/classes",
-                headers=headers,
-                params={"search": class_name}
-            )
-            
             if class_response.status_code != 200:
                 dispatcher.utter_message(text="Error checking classes. Please try again.")
                 return [
@@ -237,7 +240,7 @@ class ActionCreateStudent(Action):
                     "academic_year": current_year
                 }
                 
-                create_class_response = requests.post(
+                create_class_response = await api.post(
                     f"{FASTAPI_BASE_URL}/classes",
                     json=class_payload,
                     headers=headers
@@ -267,7 +270,7 @@ class ActionCreateStudent(Action):
             
             logger.info(f"Student payload: {student_payload}")
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/students",
                 json=student_payload,
                 headers=headers
@@ -374,7 +377,7 @@ class ActionCreateStudent(Action):
                     pass
                 dispatcher.utter_message(text=f"```\n❌ {error_msg}\n```")
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error creating student: {e}")
             lines = [
                 "```",
@@ -402,7 +405,7 @@ class ActionListStudents(Action):
     def name(self) -> Text:
         return "action_list_students"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -420,10 +423,17 @@ class ActionListStudents(Action):
                 "X-School-ID": school_id
             }
             
-            response = requests.get(
-                f"{FASTAPI_BASE_URL}/students",
-                headers=headers,
-                params={"limit": 15}
+            # Students and current academic info are independent; fetch together
+            response, setup_response = await asyncio.gather(
+                api.get(
+                    f"{FASTAPI_BASE_URL}/students",
+                    headers=headers,
+                    params={"limit": 15}
+                ),
+                api.get(
+                    f"{FASTAPI_BASE_URL}/academic/current-setup",
+                    headers=headers
+                )
             )
             
             if response.status_code == 200:
@@ -434,12 +444,6 @@ class ActionListStudents(Action):
                     dispatcher.utter_message(text="No students found in the system.")
                     return []
                 
-                # Get current academic info
-                setup_response = requests.get(
-                    f"{FASTAPI_BASE_URL}/academic/current-setup",
-                    headers=headers
-                )
-                
                 current_term_info = ""
                 if setup_response.status_code == 200:
                     setup_data = setup_response.json()
@@ -473,7 +477,7 @@ class ActionListStudents(Action):
             else:
                 dispatcher.utter_message(text="Could not retrieve the student list. Please try again.")
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error listing students: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -489,7 +493,7 @@ class ActionListStudentsByClass(Action):
     def name(self) -> Text:
         return "action_list_students_by_class"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -528,7 +532,7 @@ class ActionListStudentsByClass(Action):
                 "X-School-ID": school_id
             }
             
-            class_response = requests.get(
+            class_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers
             )
@@ -561,7 +565,7 @@ class ActionListStudentsByClass(Action):
             if len(matching_classes) == 1:
                 cls = matching_classes[0]
                 
-                students_response = requests.get(
+                students_response = await api.get(
                     f"{FASTAPI_BASE_URL}/students",
                     headers=headers,
                     params={"class_id": cls["id"], "limit": 50}
@@ -616,7 +620,7 @@ class ActionSearchStudent(Action):
     def name(self) -> Text:
         return "action_search_student"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -668,7 +672,7 @@ class ActionSearchStudent(Action):
             if is_admission_search:
                 search_params = {"admission_no": query}
                 
-                students_response = requests.get(
+                students_response = await api.get(
                     f"{FASTAPI_BASE_URL}/students",
                     headers=headers,
                     params=search_params
@@ -718,7 +722,7 @@ class ActionSearchStudent(Action):
             else:
                 search_params = {"search": query}
                 
-                students_response = requests.get(
+                students_response = await api.get(
                     f"{FASTAPI_BASE_URL}/students",
                     headers=headers,
                     params=search_params
@@ -799,7 +803,7 @@ class ActionListUnassignedStudents(Action):
     def name(self) -> Text:
         return "action_list_unassigned_students"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -817,7 +821,7 @@ class ActionListUnassignedStudents(Action):
                 "X-School-ID": school_id
             }
             
-            setup_response = requests.get(
+            setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -839,7 +843,7 @@ class ActionListUnassignedStudents(Action):
             current_year = setup_data["current_year"]["year"]
             current_term_state = setup_data["current_term"]["state"]
             
-            response = requests.get(
+            response = await api.get(
                 f"{FASTAPI_BASE_URL}/students/unassigned/current-term",
                 headers=headers,
                 params={"limit": 20}
@@ -925,7 +929,7 @@ class ActionListUnassignedStudents(Action):
                     text="Sorry, I couldn't retrieve unassigned students. Please try again."
                 )
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error listing unassigned students: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -943,7 +947,7 @@ class ActionAssignStudentToClass(Action):
     def name(self) -> Text:
         return "action_assign_student_to_class"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1003,7 +1007,7 @@ class ActionAssignStudentToClass(Action):
                 "X-School-ID": school_id
             }
             
-            academic_setup_response = requests.get(
+            academic_setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -1046,7 +1050,7 @@ class ActionAssignStudentToClass(Action):
             current_year = setup_data["current_year"]["year"]
             current_term = setup_data["current_term"]["title"]
             
-            class_response = requests.get(
+            class_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers,
                 params={"search": class_name}
@@ -1078,7 +1082,7 @@ class ActionAssignStudentToClass(Action):
                     "academic_year": current_year
                 }
                 
-                create_class_response = requests.post(
+                create_class_response = await api.post(
                     f"{FASTAPI_BASE_URL}/classes",
                     json=class_payload,
                     headers=headers
@@ -1104,7 +1108,7 @@ class ActionAssignStudentToClass(Action):
             
             logger.info(f"Student payload: {student_payload}")
             
-            response = requests.post(
+            response = await api.post(
                 f"{FASTAPI_BASE_URL}/students",
                 json=student_payload,
                 headers=headers
@@ -1166,7 +1170,7 @@ class ActionAssignStudentToClass(Action):
                     pass
                 dispatcher.utter_message(text=error_msg)
         
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
             logger.error(f"Error creating student: {e}")
             dispatcher.utter_message(
                 text="Sorry, I'm having trouble connecting to the system. Please try again in a moment."
@@ -1257,7 +1261,7 @@ class ActionReenrollStudent(Action):
     def name(self) -> Text:
         return "action_reenroll_student"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1300,10 +1304,22 @@ class ActionReenrollStudent(Action):
             elif student_name:
                 search_params["search"] = student_name
             
-            students_response = requests.get(
-                f"{FASTAPI_BASE_URL}/students",
-                headers=headers,
-                params=search_params
+            # Student, class and current-term lookups are independent
+            students_response, classes_response, term_response = await asyncio.gather(
+                api.get(
+                    f"{FASTAPI_BASE_URL}/students",
+                    headers=headers,
+                    params=search_params
+                ),
+                api.get(
+                    f"{FASTAPI_BASE_URL}/classes",
+                    headers=headers,
+                    params={"search": class_name}
+                ),
+                api.get(
+                    f"{FASTAPI_BASE_URL}/academic/current-term",
+                    headers=headers
+                )
             )
             
             if students_response.status_code != 200:
@@ -1325,12 +1341,6 @@ class ActionReenrollStudent(Action):
             student_id = student["id"]
             
             # Find class
-            classes_response = requests.get(
-                f"{FASTAPI_BASE_URL}/classes",
-                headers=headers,
-                params={"search": class_name}
-            )
-            
             if classes_response.status_code != 200:
                 dispatcher.utter_message(text="Could not find class.")
                 return []
@@ -1350,12 +1360,7 @@ class ActionReenrollStudent(Action):
                 )
                 return []
             
-            # Get current term
-            term_response = requests.get(
-                f"{FASTAPI_BASE_URL}/academic/current-term",
-                headers=headers
-            )
-            
+            # Current term
             if term_response.status_code != 200:
                 dispatcher.utter_message(
                     text="No active term found.\n"
@@ -1373,7 +1378,7 @@ class ActionReenrollStudent(Action):
                 "term_id": term_id
             }
             
-            enroll_response = requests.post(
+            enroll_response = await api.post(
                 f"{FASTAPI_BASE_URL}/enrollments",
                 json=enrollment_data,
                 headers=headers
@@ -1414,10 +1419,10 @@ class ActionShowUnassignedStudents(Action):
     def name(self) -> Text:
         return "action_show_unassigned_students"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         action = ActionListUnassignedStudents()
-        return action.run(dispatcher, tracker, domain)
+        return await action.run(dispatcher, tracker, domain)
 
 
 class ActionGetStudentDetails(Action):
@@ -1425,10 +1430,10 @@ class ActionGetStudentDetails(Action):
     def name(self) -> Text:
         return "action_get_student_details"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         action = ActionSearchStudent()
-        return action.run(dispatcher, tracker, domain)
+        return await action.run(dispatcher, tracker, domain)
 
 
 class ValidateStudentCreationForm(FormValidationAction):
@@ -1638,7 +1643,7 @@ class ValidateStudentCreationForm(FormValidationAction):
         # No valid admission number found
         return {"admission_no": None}
 
-    def validate_class_name(
+    async def validate_class_name(
         self,
         slot_value: Any,
         dispatcher: CollectingDispatcher,
@@ -1679,7 +1684,7 @@ class ValidateStudentCreationForm(FormValidationAction):
             }
             
             # Get current academic year
-            setup_response = requests.get(
+            setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -1698,7 +1703,7 @@ class ValidateStudentCreationForm(FormValidationAction):
                 return {"class_name": normalized}
             
             # Get classes for current year
-            classes_response = requests.get(
+            classes_response = await api.get(
                 f"{FASTAPI_BASE_URL}/classes",
                 headers=headers,
                 params={"academic_year": current_year}
@@ -1812,11 +1817,11 @@ class ActionListStudentsWithBalances(Action):
     def name(self) -> Text:
         return "action_list_students_with_balances"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         # Delegate to the unpaid invoices action
         action = ActionListUnpaidInvoices()
-        return action.run(dispatcher, tracker, domain)
+        return await action.run(dispatcher, tracker, domain)
     
     
 class ActionHandleFormInterruption(Action):
@@ -1870,7 +1875,7 @@ class ActionAskClassName(Action):
     def name(self) -> Text:
         return "action_ask_class_name"
 
-    def run(self, dispatcher: CollectingDispatcher, 
+    async def run(self, dispatcher: CollectingDispatcher, 
             tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         metadata = tracker.latest_message.get("metadata", {})
@@ -1892,7 +1897,7 @@ class ActionAskClassName(Action):
             }
             
             # Get current academic year
-            setup_response = requests.get(
+            setup_response = await api.get(
                 f"{FASTAPI_BASE_URL}/academic/current-setup",
                 headers=headers
             )
@@ -1902,7 +1907,7 @@ class ActionAskClassName(Action):
                 current_year = setup_data.get("current_year", {}).get("year")
                 
                 # Get classes for current year
-                classes_response = requests.get(
+                classes_response = await api.get(
                     f"{FASTAPI_BASE_URL}/classes",
                     headers=headers,
                     params={"academic_year": current_year} if current_year else {}
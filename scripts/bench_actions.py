@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# scripts/bench_actions.py - Rasa action latency/throughput benchmark against a local API stub
+"""
+Runs a handful of custom actions against an in-process FastAPI stub that
+answers every endpoint after a fixed delay, so the numbers isolate how the
+actions talk to the API (pooling, sequential vs concurrent calls) from how
+fast the real API is.
+
+For each action it reports:
+  - calls: API requests the action made on a cold run
+  - warm: API requests once the academic-context cache is populated
+  - serial: the latency the warm calls would cost back-to-back (warm x delay)
+  - p50/p95: measured single-run latency (lower than serial => fan-out works)
+  - rps: runs per second with --concurrency actions in flight on one loop
+
+    python scripts/bench_actions.py --latency-ms 25 --runs 50 --concurrency 20
+
+Numbers against the real backend need a live action server and API.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+# Add the project root and the Rasa project (for the ``actions`` package) to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "rasa"))
+
+STUDENT_IDS = [str(uuid.uuid4()) for _ in range(8)]
+SCHOOL_ID = str(uuid.uuid4())
+
+# (module, action class, slots)
+ACTIONS = [
+    ("school_info_actions", "ActionGetSchoolInfo", {}),
+    ("student_actions", "ActionListStudents", {}),
+    ("fee_actions", "ActionListUnpaidInvoices", {"academic_year": "2025", "term": "1"}),
+]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def build_stub_app(latency, call_counts):
+    """FastAPI app returning canned payloads for the endpoints the benchmarked actions use"""
+    from fastapi import FastAPI, Request
+
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def delay(request: Request, call_next):
+        call_counts[request.url.path] += 1
+        await asyncio.sleep(latency)
+        return await call_next(request)
+
+    def student(student_id, i=0):
+        return {
+            "id": student_id, "first_name": f"Student{i}", "last_name": "Bench",
+            "admission_no": f"B{i:03d}", "class_name": "Grade 4A",
+        }
+
+    @app.get("/api/schools/{school_id}/overview")
+    async def overview(school_id: str):
+        return {
+            "school_name": "Bench School", "academic_year": 2025, "current_term": "Term 1",
+            "students_total": 8, "students_enrolled": 8, "students_unassigned": 0,
+            "classes": 2, "guardians": 8, "invoices_total": 8, "invoices_paid": 0,
+            "invoices_pending": 8, "fees_collected": 0.0,
+        }
+
+    @app.get("/api/students")
+    async def students():
+        return {"students": [student(sid, i) for i, sid in enumerate(STUDENT_IDS)], "total": len(STUDENT_IDS)}
+
+    @app.get("/api/students/{student_id}")
+    async def get_student(student_id: str):
+        return student(student_id)
+
+    @app.get("/api/academic/current-setup")
+    async def current_setup():
+        return {"current_year": {"year": 2025}, "current_term": {"title": "Term 1", "term": 1}}
+
+    @app.get("/api/invoices/")
+    async def invoices(include: str = ""):
+        embed = "student" in include.split(",")
+        return [
+            {"id": str(uuid.uuid4()), "student_id": sid, "status": "ISSUED",
+             "total": 1000.0 + i, "balance": 1000.0 + i,
+             "student": {**student(sid, i), "full_name": f"Student{i} Bench"} if embed else None}
+            for i, sid in enumerate(STUDENT_IDS)
+        ]
+
+    return app
+
+
+def start_stub(app):
+    """Serve the stub on a free local port in a background thread; returns the base URL"""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/api"
+
+
+def make_tracker(slots):
+    from rasa_sdk import Tracker
+
+    latest_message = {
+        "text": "", "intent": {"name": "bench"}, "entities": [],
+        "metadata": {"auth_token": "bench-token", "school_id": SCHOOL_ID},
+    }
+    return Tracker("bench", dict(slots), latest_message, [], False, None, {}, "action_listen")
+
+
+async def run_action(action, slots):
+    from rasa_sdk.executor import CollectingDispatcher
+
+    dispatcher = CollectingDispatcher()
+    started = time.perf_counter()
+    await action.run(dispatcher, make_tracker(slots), {})
+    return (time.perf_counter() - started) * 1000, dispatcher.messages
+
+
+async def run_benchmark(args, call_counts):
+    import importlib
+
+    from actions.academic_cache import academic_cache
+    from actions.api_client import api
+
+    # Per-request action logging would dominate the timings
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    print("Rasa Action Benchmark")
+    print("=" * 84)
+    print(f"Stub latency: {args.latency_ms}ms  runs={args.runs}  concurrency={args.concurrency}")
+    print("-" * 84)
+    print(f"{'action':<32}{'calls':>7}{'warm':>6}{'serial':>9}{'p50':>9}{'p95':>9}{'rps':>10}")
+
+    for module_name, class_name, slots in ACTIONS:
+        action = getattr(importlib.import_module(f"actions.{module_name}"), class_name)()
+
+        # Cold run: opens pooled connections and counts calls per run
+        academic_cache.clear()
+        call_counts.clear()
+        _, messages = await run_action(action, slots)
+        calls = sum(call_counts.values())
+
+        call_counts.clear()
+        await run_action(action, slots)
+        warm_calls = sum(call_counts.values())
+        if args.verbose:
+            print(f"  {class_name}: {messages[0].get('text', '')[:70]!r}" if messages else f"  {class_name}: no output")
+
+        latencies = []
+        for _ in range(args.runs):
+            elapsed, _ = await run_action(action, slots)
+            latencies.append(elapsed)
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded():
+            async with semaphore:
+                await run_action(action, slots)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(bounded() for _ in range(args.runs)))
+        wall = time.perf_counter() - wall_start
+
+        print(
+            f"{class_name:<32}{calls:>7}{warm_calls:>6}{warm_calls * args.latency_ms:>9.1f}"
+            f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 95):>9.1f}{args.runs / wall:>10.1f}"
+        )
+
+    print("-" * 84)
+    print("(latencies in ms; serial = warm calls x stub latency)")
+    await api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Rasa custom actions against a local API stub')
+    parser.add_argument('--latency-ms', type=float, default=25.0, help='Artificial delay per stub request')
+    parser.add_argument('--runs', type=int, default=50, help='Runs per action')
+    parser.add_argument('--concurrency', type=int, default=20, help='Actions in flight for the throughput pass')
+    parser.add_argument('--verbose', action='store_true', help='Print the first reply of each action')
+    args = parser.parse_args()
+
+    call_counts = defaultdict(int)
+    base_url = start_stub(build_stub_app(args.latency_ms / 1000.0, call_counts))
+
+    # The actions read FASTAPI_BASE_URL at import time
+    os.environ["FASTAPI_BASE_URL"] = base_url
+
+    asyncio.run(run_benchmark(args, call_counts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# scripts/bench_chat_stream.py - Time-to-first-byte benchmark: blocking vs streaming chat endpoint
+"""
+Sends the same message to POST /api/chat/conversations/{id}/messages and
+to .../messages/stream and reports, per endpoint, p50/p95 of:
+
+  ttfb           first response byte
+  first_message  first Rasa bot message (the whole reply for the blocking endpoint)
+  total          complete response
+
+    python scripts/bench_chat_stream.py --base-url http://localhost:8000 \\
+        --token <JWT> --school-id <UUID> --message "Show unpaid invoices" --requests 20
+
+A conversation is created for the run unless --conversation-id is given.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bench_mixed_latency import percentile
+
+
+async def create_conversation(client, message):
+    response = await client.post(
+        "/api/chat/conversations",
+        json={"title": "Streaming benchmark", "first_message": message}
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def time_blocking(client, conversation_id, message):
+    """(ttfb, first_message, total) in ms for the non-streaming endpoint"""
+    start = time.perf_counter()
+    ttfb = None
+    async with client.stream(
+        "POST", f"/api/chat/conversations/{conversation_id}/messages", json={"message": message}
+    ) as response:
+        response.raise_for_status()
+        async for _ in response.aiter_bytes():
+            if ttfb is None:
+                ttfb = (time.perf_counter() - start) * 1000
+    total = (time.perf_counter() - start) * 1000
+    return ttfb or total, total, total
+
+
+async def time_streaming(client, conversation_id, message):
+    """(ttfb, first_message, total) in ms for the SSE endpoint"""
+    start = time.perf_counter()
+    ttfb = first_message = None
+    async with client.stream(
+        "POST", f"/api/chat/conversations/{conversation_id}/messages/stream", json={"message": message}
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            elapsed = (time.perf_counter() - start) * 1000
+            if ttfb is None:
+                ttfb = elapsed
+            if first_message is None and line in ("event: message", "event: done", "event: error"):
+                first_message = elapsed
+    total = (time.perf_counter() - start) * 1000
+    return ttfb or total, first_message or total, total
+
+
+def report(name, samples):
+    print(f"\n{name} ({len(samples)} requests)")
+    for index, label in enumerate(("ttfb", "first_message", "total")):
+        values = [s[index] for s in samples]
+        print(f"  {label:<14} p50={percentile(values, 50):8.1f}ms  p95={percentile(values, 95):8.1f}ms")
+
+
+async def run_benchmark(args):
+    headers = {"Authorization": f"Bearer {args.token}", "X-School-ID": args.school_id}
+
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=120.0) as client:
+        conversation_id = args.conversation_id or await create_conversation(client, args.message)
+        print(f"Conversation {conversation_id}, message {args.message!r}")
+
+        results = {"blocking": [], "streaming": []}
+        for _ in range(args.requests):
+            # Alternate so both endpoints see the same Rasa/DB conditions
+            results["blocking"].append(await time_blocking(client, conversation_id, args.message))
+            results["streaming"].append(await time_streaming(client, conversation_id, args.message))
+
+    report("POST .../messages", results["blocking"])
+    report("POST .../messages/stream", results["streaming"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare time-to-first-byte of blocking and streaming chat')
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--token', required=True, help='JWT for an existing user')
+    parser.add_argument('--school-id', required=True)
+    parser.add_argument('--conversation-id', help='Reuse a conversation instead of creating one')
+    parser.add_argument('--message', default='Show unpaid invoices')
+    parser.add_argument('--requests', type=int, default=20, help='Requests per endpoint')
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args))
+
+
+if __name__ == '__main__':
+    main()
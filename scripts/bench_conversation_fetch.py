@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# scripts/bench_conversation_fetch.py - Chat storage size and conversation fetch latency
+"""
+Reports how much space chat messages take (table sizes and the average
+stored context per assistant message, read from DATABASE_URL) and the
+p50/p95 latency and payload size of GET /api/chat/conversations/{id}
+with its messages.
+
+Run it before and after a storage change to compare:
+
+    python scripts/bench_conversation_fetch.py --base-url http://localhost:8000 \\
+        --token <JWT> --school-id <UUID> --conversation-id <UUID> --requests 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+from sqlalchemy import text
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db import db_manager
+from scripts.bench_mixed_latency import percentile
+
+SIZE_QUERY = text("""
+    SELECT
+        pg_total_relation_size('chat_messages') AS messages_bytes,
+        COALESCE(pg_total_relation_size(to_regclass('chat_context_snapshots')), 0) AS snapshots_bytes,
+        (SELECT COUNT(*) FROM chat_messages) AS messages,
+        (SELECT AVG(pg_column_size(context_data)) FROM chat_messages WHERE message_type = 'ASSISTANT')
+            AS assistant_context_bytes
+""")
+
+
+def kib(value):
+    return f"{(value or 0) / 1024:,.1f} KiB"
+
+
+async def report_storage():
+    async for session in db_manager.get_async_session():
+        row = (await session.execute(SIZE_QUERY)).one()
+    await db_manager.close_async()
+    print(f"chat_messages            {kib(row.messages_bytes)} ({row.messages} rows)")
+    print(f"chat_context_snapshots   {kib(row.snapshots_bytes)}")
+    print(f"context per assistant    {row.assistant_context_bytes or 0:,.0f} bytes")
+
+
+async def time_fetch(args):
+    headers = {"Authorization": f"Bearer {args.token}", "X-School-ID": args.school_id}
+    path = f"/api/chat/conversations/{args.conversation_id}"
+
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=60.0) as client:
+        samples, size, messages = [], 0, 0
+        for i in range(args.requests + 1):
+            start = time.perf_counter()
+            response = await client.get(path)
+            elapsed = (time.perf_counter() - start) * 1000
+            response.raise_for_status()
+            if i == 0:
+                continue  # Warm-up
+            samples.append(elapsed)
+            size = len(response.content)
+            messages = len(response.json().get("messages", []))
+
+    print(f"\nGET {path} ({messages} messages, {size / 1024:,.1f} KiB, {len(samples)} requests)")
+    print(f"  p50={percentile(samples, 50):8.1f}ms  p95={percentile(samples, 95):8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure chat storage and conversation fetch latency')
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--token', help='JWT for the conversation owner (latency is skipped without it)')
+    parser.add_argument('--school-id')
+    parser.add_argument('--conversation-id', help='Conversation to fetch')
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(report_storage())
+    if args.token and args.conversation_id:
+        asyncio.run(time_fetch(args))
+
+
+if __name__ == '__main__':
+    main()
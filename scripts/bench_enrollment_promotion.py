@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# scripts/bench_enrollment_promotion.py - Term rollover benchmark: per-student promotion loop vs one upsert
+"""
+Seeds a dedicated benchmark school (students over a few grades, all
+enrolled in term 1, an empty term 2) and times promoting the whole roll
+from term 1 to term 2 with every grade mapped to the next one:
+
+  legacy     the previous handler: one SELECT per student, then ORM adds
+  dry-run    app.services.enrollment_promoter.promote_enrollments(dry_run=True)
+  bulk       promote_enrollments into the empty term (all rows created)
+  re-run     promote_enrollments again (nothing changes, nothing written)
+
+Each timed run is rolled back, so every scenario starts from the same data.
+Run against a disposable database (it writes rows under short_code BENCHPRM):
+
+    python scripts/bench_enrollment_promotion.py --students 5000
+    python scripts/bench_enrollment_promotion.py --drop        # remove the seeded school
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import delete, event, func, insert, select
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db import get_session_maker
+from app.models import School, Student, User
+from app.models.academic import AcademicYear, AcademicTerm
+from app.models.class_model import Class
+from app.models.class_stream import ClassStream  # noqa: F401 - needed to configure Class.streams
+from app.models.enrollment import Enrollment
+from app.services.enrollment_promoter import promote_enrollments
+
+SHORT_CODE = "BENCHPRM"
+YEAR = 2026
+GRADES = 8
+CHUNK = 5000
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def get_bench_school(db):
+    return db.execute(select(School).where(School.short_code == SHORT_CODE)).scalar_one_or_none()
+
+
+def drop_bench_school(db):
+    school = get_bench_school(db)
+    if not school:
+        print("No benchmark school to drop")
+        return
+    for model in (Enrollment, Student, AcademicTerm, AcademicYear, Class):
+        db.execute(delete(model).where(model.school_id == school.id))
+    db.delete(school)
+    db.commit()
+    print(f"Dropped benchmark school {school.id}")
+
+
+def insert_chunked(db, model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.execute(insert(model), rows[start:start + CHUNK])
+
+
+def load_fixture(db, school):
+    """(source term id, target term id, grade -> next grade class mapping)"""
+    terms = dict(db.execute(
+        select(AcademicTerm.term, AcademicTerm.id).where(AcademicTerm.school_id == school.id)
+    ).all())
+    classes = db.execute(
+        select(Class.id).where(Class.school_id == school.id).order_by(Class.name)
+    ).scalars().all()
+    # Grade N moves to Grade N+1; the top grade stays put
+    mappings = {classes[i]: classes[i + 1] for i in range(len(classes) - 1)}
+    return terms[1], terms[2], mappings
+
+
+def seed(db, student_count):
+    """Create the benchmark school and its data; reuse it if already seeded"""
+    school = get_bench_school(db)
+    if school:
+        existing = db.execute(select(func.count(Student.id)).where(Student.school_id == school.id)).scalar()
+        if existing == student_count:
+            print(f"Reusing benchmark school {school.id} ({existing} students)")
+            return school
+        drop_bench_school(db)
+
+    owner_id = db.execute(select(User.id).order_by(User.created_at).limit(1)).scalar()
+    if owner_id is None:
+        sys.exit("No users found; create one first (the benchmark school needs created_by)")
+
+    school = School(
+        name="Promotion Benchmark School", short_code=SHORT_CODE,
+        academic_year_start=date(YEAR, 1, 1), created_by=owner_id,
+    )
+    db.add(school)
+    db.flush()
+
+    # Zero-padded names keep the grades in order when sorted by name
+    classes = [Class(school_id=school.id, name=f"Grade {i + 1:02d}", level=f"Grade {i + 1}", academic_year=YEAR)
+               for i in range(GRADES)]
+    db.add_all(classes)
+    year = AcademicYear(school_id=school.id, year=YEAR, title=f"Academic Year {YEAR}", state="ACTIVE")
+    db.add(year)
+    db.flush()
+    db.add_all([
+        AcademicTerm(school_id=school.id, academic_year_id=year.id, term=term, title=f"Term {term}",
+                     state="ACTIVE" if term == 1 else "PLANNED")
+        for term in (1, 2)
+    ])
+    db.flush()
+    source_term_id = db.execute(
+        select(AcademicTerm.id).where(AcademicTerm.school_id == school.id, AcademicTerm.term == 1)
+    ).scalar_one()
+
+    now = datetime.utcnow()
+    students = [
+        {
+            "id": uuid.uuid4(), "school_id": school.id, "admission_no": f"{SHORT_CODE}-{i:06d}",
+            "first_name": f"Student{i}", "last_name": "Bench", "status": "ACTIVE",
+            "class_id": classes[i % GRADES].id, "created_at": now, "updated_at": now,
+        }
+        for i in range(student_count)
+    ]
+    insert_chunked(db, Student, students)
+    insert_chunked(db, Enrollment, [
+        {
+            "id": uuid.uuid4(), "school_id": school.id, "student_id": s["id"], "class_id": s["class_id"],
+            "term_id": source_term_id, "status": "ENROLLED", "enrolled_date": date.today(),
+            "invoice_generated": True, "created_at": now, "updated_at": now,
+        }
+        for s in students
+    ])
+    db.commit()
+
+    print(f"Seeded school {school.id}: {student_count} students enrolled in term 1 over {GRADES} grades")
+    return school
+
+
+def legacy_promote(db, school_id, source_term_id, target_term_id, mappings):
+    """The previous handler's loop, kept here for comparison (with enrolled_date, the real column)"""
+    enrollments = db.execute(select(Enrollment).where(
+        Enrollment.term_id == source_term_id, Enrollment.status == "ENROLLED"
+    )).scalars().all()
+    for enrollment in enrollments:
+        target_class_id = mappings.get(enrollment.class_id, enrollment.class_id)
+        existing = db.execute(select(Enrollment).where(
+            Enrollment.student_id == enrollment.student_id, Enrollment.term_id == target_term_id
+        )).scalar_one_or_none()
+        if existing:
+            existing.class_id = target_class_id
+            existing.status = "ENROLLED"
+            existing.enrolled_date = date.today()
+        else:
+            db.add(Enrollment(
+                school_id=school_id, student_id=enrollment.student_id, class_id=target_class_id,
+                term_id=target_term_id, status="ENROLLED", enrolled_date=date.today(),
+            ))
+    db.flush()
+    return len(enrollments)
+
+
+def timed(db, label, fn, setup=None):
+    """Run ``fn`` once (after ``setup``) inside a transaction that is rolled back afterwards"""
+    engine = db.get_bind()
+    db.rollback()
+    if setup:
+        setup()
+    with QueryCounter(engine) as counter:
+        start = time.perf_counter()
+        outcome = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+    db.rollback()
+    print(f"{label:<16}{counter.count:>10}{elapsed:>12.1f}   {outcome}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark term rollover promotion on a seeded school')
+    parser.add_argument('--students', type=int, default=5000, help='Students to seed for the benchmark school')
+    parser.add_argument('--drop', action='store_true', help='Delete the benchmark school and exit')
+    args = parser.parse_args()
+
+    SessionLocal = get_session_maker()
+    with SessionLocal() as db:
+        if args.drop:
+            drop_bench_school(db)
+            return
+
+        school = seed(db, args.students)
+        school_id = school.id
+        source_term_id, target_term_id, mappings = load_fixture(db, school)
+
+        def bulk(dry_run=False):
+            result = promote_enrollments(
+                db, school_id, source_term_id, target_term_id, class_mappings=mappings, dry_run=dry_run
+            )
+            db.flush()
+            return f"created={result.created} updated={result.updated} unchanged={result.unchanged}"
+
+        print()
+        print(f"Enrollment Promotion Benchmark ({args.students} students)")
+        print("=" * 72)
+        print(f"{'scenario':<16}{'queries':>10}{'ms':>12}   outcome")
+        timed(db, "legacy (loop)",
+              lambda: f"promoted={legacy_promote(db, school_id, source_term_id, target_term_id, mappings)}")
+        timed(db, "dry-run", lambda: bulk(dry_run=True))
+        timed(db, "bulk", bulk)
+        timed(db, "re-run", bulk, setup=bulk)
+        print("-" * 72)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# scripts/bench_invoice_generation.py - Term invoice generation benchmark: per-student loop vs set-based engine
+"""
+Seeds a dedicated benchmark school (students spread over a few classes, a
+published default fee structure with general and class-specific items) and
+times generating a term's invoices:
+
+  legacy     the previous loop: existence SELECT + flush per student, lines added one by one
+  bulk       app.services.invoice_generator.generate_term_invoices
+  concurrent several bulk runs at once; checks the unique constraint keeps one invoice per student
+
+Invoices for the benchmark term are deleted before every run. Run against a
+disposable database (it writes rows under short_code BENCHGEN):
+
+    python scripts/bench_invoice_generation.py --students 10000 --repeat 3
+    python scripts/bench_invoice_generation.py --legacy           # include the old loop (slow)
+    python scripts/bench_invoice_generation.py --drop             # remove the seeded school
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db import get_async_engine, get_session_maker
+from app.models import School, Student, Invoice, User
+from app.models.class_model import Class
+from app.models.class_stream import ClassStream  # noqa: F401 - needed to configure Class.streams
+from app.models.fee import FeeStructure, FeeItem
+from app.models.payment import InvoiceLine
+from app.services.invoice_generator import generate_term_invoices
+
+SHORT_CODE = "BENCHGEN"
+TERM, YEAR = 1, 2026
+CLASSES = 8
+CHUNK = 5000
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def get_bench_school(db):
+    return db.execute(select(School).where(School.short_code == SHORT_CODE)).scalar_one_or_none()
+
+
+def drop_bench_school(db):
+    school = get_bench_school(db)
+    if not school:
+        print("No benchmark school to drop")
+        return
+    db.execute(delete(InvoiceLine).where(InvoiceLine.school_id == school.id))
+    db.execute(delete(Invoice).where(Invoice.school_id == school.id))
+    db.execute(delete(FeeItem).where(FeeItem.school_id == school.id))
+    db.execute(delete(FeeStructure).where(FeeStructure.school_id == school.id))
+    db.execute(delete(Student).where(Student.school_id == school.id))
+    db.execute(delete(Class).where(Class.school_id == school.id))
+    db.delete(school)
+    db.commit()
+    print(f"Dropped benchmark school {school.id}")
+
+
+def seed(db, student_count):
+    """Create the benchmark school, classes, students and fee structure; reuse it if already seeded"""
+    school = get_bench_school(db)
+    if school:
+        existing = db.execute(select(func.count(Student.id)).where(Student.school_id == school.id)).scalar()
+        if existing == student_count:
+            print(f"Reusing benchmark school {school.id} ({existing} students)")
+            return school
+        drop_bench_school(db)
+
+    owner_id = db.execute(select(User.id).order_by(User.created_at).limit(1)).scalar()
+    if owner_id is None:
+        sys.exit("No users found; create one first (the benchmark school needs created_by)")
+
+    school = School(
+        name="Invoice Generation Benchmark School", short_code=SHORT_CODE,
+        academic_year_start=date(YEAR, 1, 1), created_by=owner_id,
+    )
+    db.add(school)
+    db.flush()
+
+    classes = [Class(school_id=school.id, name=f"Grade {i + 1}", level=f"Grade {i + 1}", academic_year=YEAR)
+               for i in range(CLASSES)]
+    db.add_all(classes)
+
+    structure = FeeStructure(
+        school_id=school.id, name="Benchmark Fees", level="ALL", term=TERM, year=YEAR,
+        is_default=True, is_published=True,
+    )
+    db.add(structure)
+    db.flush()
+
+    # Three items for everyone plus one class-specific item per class
+    items = [
+        FeeItem(school_id=school.id, fee_structure_id=structure.id, item_name=name, amount=Decimal(amount))
+        for name, amount in (("Tuition", 15000), ("Lunch", 4000), ("Activity", 1500))
+    ]
+    items += [
+        FeeItem(school_id=school.id, fee_structure_id=structure.id, class_id=cls.id,
+                item_name="Books", amount=Decimal(1000 + 250 * i))
+        for i, cls in enumerate(classes)
+    ]
+    db.add_all(items)
+
+    now = datetime.utcnow()
+    students = [
+        {
+            "id": uuid.uuid4(), "school_id": school.id, "admission_no": f"{SHORT_CODE}-{i:06d}",
+            "first_name": f"Student{i}", "last_name": "Bench", "status": "ACTIVE",
+            "class_id": classes[i % CLASSES].id, "created_at": now, "updated_at": now,
+        }
+        for i in range(student_count)
+    ]
+    for start in range(0, len(students), CHUNK):
+        db.execute(insert(Student), students[start:start + CHUNK])
+    db.commit()
+
+    print(f"Seeded school {school.id}: {student_count} students in {CLASSES} classes, {len(items)} fee items")
+    return school
+
+
+def reset_term(db, school_id):
+    # The benchmark school only has invoices for the benchmark term
+    db.execute(delete(InvoiceLine).where(InvoiceLine.school_id == school_id))
+    db.execute(delete(Invoice).where(Invoice.school_id == school_id))
+    db.commit()
+
+
+def term_counts(db, school_id):
+    invoices = db.execute(select(func.count(Invoice.id)).where(Invoice.school_id == school_id)).scalar()
+    lines = db.execute(select(func.count(InvoiceLine.id)).where(InvoiceLine.school_id == school_id)).scalar()
+    return invoices, lines
+
+
+async def load_inputs(db: AsyncSession, school_id):
+    students = (await db.execute(
+        select(Student.id, Student.class_id).where(Student.school_id == school_id, Student.status == "ACTIVE")
+    )).all()
+    items = (await db.execute(
+        select(FeeItem).join(FeeStructure, FeeStructure.id == FeeItem.fee_structure_id)
+        .where(FeeStructure.school_id == school_id, FeeStructure.term == TERM, FeeStructure.year == YEAR)
+    )).scalars().all()
+    return students, items
+
+
+async def legacy_generate(db: AsyncSession, school_id, students, items, due_date):
+    """The previous implementation, kept here for comparison"""
+    created = 0
+    for student_id, class_id in students:
+        existing = (await db.execute(
+            select(Invoice).where(
+                Invoice.school_id == school_id, Invoice.student_id == student_id,
+                Invoice.term == TERM, Invoice.year == YEAR,
+            )
+        )).scalar_one_or_none()
+        if existing:
+            continue
+
+        applicable = [item for item in items if item.class_id is None or item.class_id == class_id]
+        invoice = Invoice(
+            school_id=school_id, student_id=student_id, term=TERM, year=YEAR,
+            total=sum(item.amount for item in applicable), status="DRAFT", due_date=due_date,
+        )
+        db.add(invoice)
+        await db.flush()
+        for item in applicable:
+            db.add(InvoiceLine(school_id=school_id, invoice_id=invoice.id, item_name=item.item_name, amount=item.amount))
+        created += 1
+    await db.commit()
+    return created
+
+
+async def bulk_generate(engine, school_id, students, items, due_date):
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        result = await generate_term_invoices(db, school_id, TERM, YEAR, students, items, due_date)
+        await db.commit()
+        return result
+
+
+async def run(args, school_id, sync_db):
+    engine = get_async_engine()
+    due_date = date.today() + timedelta(days=30)
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        students, items = await load_inputs(db, school_id)
+
+    print()
+    print(f"Invoice Generation Benchmark ({len(students)} students, {len(items)} fee items)")
+    print("=" * 84)
+    print(f"{'scenario':<28}{'invoices':>10}{'lines':>10}{'queries':>10}{'ms':>10}{'per 1k':>10}")
+
+    def report(label, invoices, lines, queries, ms):
+        per_k = ms / (invoices / 1000) if invoices else 0
+        print(f"{label:<28}{invoices:>10}{lines:>10}{queries:>10}{ms:>10.1f}{per_k:>10.1f}")
+
+    if args.legacy:
+        reset_term(sync_db, school_id)
+        with QueryCounter(engine.sync_engine) as counter:
+            started = time.perf_counter()
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                await legacy_generate(db, school_id, students, items, due_date)
+            legacy_ms = (time.perf_counter() - started) * 1000
+        report("legacy (per student)", *term_counts(sync_db, school_id), counter.count, legacy_ms)
+
+    samples = []
+    for _ in range(args.repeat):
+        reset_term(sync_db, school_id)
+        with QueryCounter(engine.sync_engine) as counter:
+            started = time.perf_counter()
+            result = await bulk_generate(engine, school_id, students, items, due_date)
+            samples.append((time.perf_counter() - started) * 1000)
+    invoices, lines = term_counts(sync_db, school_id)
+    assert invoices == len(students) == len(result.invoices), "bulk run missed students"
+    report(f"bulk (median of {args.repeat})", invoices, lines, counter.count, statistics.median(samples))
+
+    # Re-running is a no-op: everything is skipped by the preload
+    with QueryCounter(engine.sync_engine) as counter:
+        started = time.perf_counter()
+        result = await bulk_generate(engine, school_id, students, items, due_date)
+        rerun_ms = (time.perf_counter() - started) * 1000
+    assert not result.invoices and result.skipped_existing == len(students)
+    report("bulk re-run (all exist)", len(result.invoices), result.lines_created, counter.count, rerun_ms)
+
+    # Overlapping runs: the preload sees nothing, the unique constraint decides
+    if args.concurrent > 1:
+        reset_term(sync_db, school_id)
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            bulk_generate(engine, school_id, students, items, due_date) for _ in range(args.concurrent)
+        ])
+        concurrent_ms = (time.perf_counter() - started) * 1000
+        invoices, lines = term_counts(sync_db, school_id)
+        assert invoices == len(students), f"expected {len(students)} invoices, found {invoices}"
+        assert sum(len(r.invoices) for r in results) == invoices
+        report(f"{args.concurrent} concurrent runs", invoices, lines, 0, concurrent_ms)
+        print(
+            "  inserted per run: " + ", ".join(str(len(r.invoices)) for r in results)
+            + f"; conflicts skipped: {sum(r.skipped_conflict for r in results)}"
+        )
+
+    print("-" * 84)
+    print("(each run includes commit; invoices for the benchmark term are cleared before every run)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark term invoice generation on a seeded school')
+    parser.add_argument('--students', type=int, default=10000, help='Students to seed for the benchmark school')
+    parser.add_argument('--repeat', type=int, default=3, help='Bulk runs (median reported)')
+    parser.add_argument('--concurrent', type=int, default=3, help='Simultaneous bulk runs for the idempotency check')
+    parser.add_argument('--legacy', action='store_true', help='Also time the previous per-student loop (slow)')
+    parser.add_argument('--drop', action='store_true', help='Delete the benchmark school and exit')
+    args = parser.parse_args()
+
+    SessionLocal = get_session_maker()
+    with SessionLocal() as db:
+        if args.drop:
+            drop_bench_school(db)
+            return
+
+        school = seed(db, args.students)
+        asyncio.run(run(args, school.id, db))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# scripts/bench_invoice_listing.py - Invoice listing benchmark: per-invoice payment queries vs stored balances
+"""
+Seeds a dedicated benchmark school with ~50k invoices (and payments) and
+compares three ways of producing invoice listings with balances:
+
+  legacy     one SELECT for the invoices, then one payments SELECT per invoice
+  stored     invoice_listing_query(): amount_paid/balance read from the invoice row
+  keyset     walking every invoice in the school page by page via the cursor
+
+Run against a disposable database (it writes rows under short_code BENCHINV):
+
+    python scripts/bench_invoice_listing.py --invoices 50000 --repeat 5
+    python scripts/bench_invoice_listing.py --drop      # remove the seeded school
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import delete, event, func, insert, select
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db import get_engine, get_session_maker, set_rls_context
+from app.api.routers.invoices import invoice_listing_query, paginate_invoices
+from app.core.pagination import encode_cursor
+from app.models import School, Student, Invoice, Payment, User
+from app.models.class_stream import ClassStream  # noqa: F401 - needed to configure Class.streams
+
+SHORT_CODE = "BENCHINV"
+TERMS = (1, 2, 3)
+CHUNK = 5000
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def get_bench_school(db):
+    return db.execute(select(School).where(School.short_code == SHORT_CODE)).scalar_one_or_none()
+
+
+def drop_bench_school(db):
+    school = get_bench_school(db)
+    if not school:
+        print("No benchmark school to drop")
+        return
+    for model in (Payment, Invoice, Student):
+        db.execute(delete(model).where(model.school_id == school.id))
+    db.delete(school)
+    db.commit()
+    print(f"Dropped benchmark school {school.id}")
+
+
+def seed(db, invoice_target):
+    """Create the benchmark school with students x terms invoices; reuse it if already seeded"""
+    # Three terms per year over a few years, enough students to reach the target
+    years = list(range(2021, 2026))
+    student_count = max(1, invoice_target // (len(years) * len(TERMS)))
+    expected = student_count * len(years) * len(TERMS)
+
+    school = get_bench_school(db)
+    if school:
+        existing = db.execute(select(func.count(Invoice.id)).where(Invoice.school_id == school.id)).scalar()
+        if existing == expected:
+            print(f"Reusing benchmark school {school.id} ({existing} invoices)")
+            return school
+        drop_bench_school(db)
+
+    owner_id = db.execute(select(User.id).order_by(User.created_at).limit(1)).scalar()
+    if owner_id is None:
+        sys.exit("No users found; create one first (the benchmark school needs created_by)")
+
+    school = School(
+        name="Invoice Benchmark School", short_code=SHORT_CODE,
+        academic_year_start=date(2021, 1, 1), created_by=owner_id,
+    )
+    db.add(school)
+    db.flush()
+
+    now = datetime.utcnow()
+    rng = random.Random(42)
+
+    students = [
+        {
+            "id": uuid.uuid4(), "school_id": school.id, "admission_no": f"{SHORT_CODE}-{i:06d}",
+            "first_name": f"Student{i}", "last_name": "Bench", "status": "ACTIVE",
+            "created_at": now, "updated_at": now,
+        }
+        for i in range(student_count)
+    ]
+    for start in range(0, len(students), CHUNK):
+        db.execute(insert(Student), students[start:start + CHUNK])
+
+    invoices, payments = [], []
+    for student in students:
+        for year in years:
+            for term in TERMS:
+                total = Decimal(rng.choice([15000, 18000, 22000]))
+                invoice_id = uuid.uuid4()
+                amounts = [Decimal(rng.choice([2000, 5000, 8000])) for _ in range(rng.choice([0, 1, 1, 2, 3]))]
+                paid = sum(amounts, Decimal('0.00'))
+                invoices.append({
+                    "id": invoice_id, "school_id": school.id, "student_id": student["id"],
+                    "term": term, "year": year, "total": total,
+                    "status": "ISSUED" if not amounts else "PARTIAL",
+                    "amount_paid": paid, "balance": max(Decimal('0.00'), total - paid),
+                    "created_at": now, "updated_at": now,
+                })
+                for amount in amounts:
+                    payments.append({
+                        "id": uuid.uuid4(), "school_id": school.id, "invoice_id": invoice_id,
+                        "amount": amount, "method": "MPESA",
+                        "posted_at": now, "created_at": now, "updated_at": now,
+                    })
+
+    for start in range(0, len(invoices), CHUNK):
+        db.execute(insert(Invoice), invoices[start:start + CHUNK])
+    for start in range(0, len(payments), CHUNK):
+        db.execute(insert(Payment), payments[start:start + CHUNK])
+    db.commit()
+
+    print(f"Seeded school {school.id}: {len(students)} students, {len(invoices)} invoices, {len(payments)} payments")
+    return school
+
+
+def legacy_listing(db, conditions):
+    """The previous implementation: payments fetched per invoice and summed in Python"""
+    invoices = db.execute(
+        select(Invoice).where(*conditions).order_by(Invoice.year.desc(), Invoice.term.desc())
+    ).scalars().all()
+    result = []
+    for inv in invoices:
+        payments = db.execute(select(Payment).where(Payment.invoice_id == inv.id)).scalars().all()
+        amount_paid = sum(p.amount for p in payments)
+        result.append((inv, amount_paid, inv.total - amount_paid))
+    return result
+
+
+def stored_listing(db, conditions):
+    return db.execute(paginate_invoices(invoice_listing_query(conditions), None, None)).all()
+
+
+def keyset_walk(db, conditions, page_size):
+    """Fetch every page; returns (invoice count, pages)"""
+    cursor, total, pages = None, 0, 0
+    while True:
+        # Each page is a separate request in the API; don't let the identity map grow
+        db.expunge_all()
+        rows = db.execute(paginate_invoices(invoice_listing_query(conditions), cursor, page_size)).all()
+        pages += 1
+        total += min(len(rows), page_size)
+        if len(rows) <= page_size:
+            return total, pages
+        last = rows[page_size - 1][0]
+        cursor = encode_cursor((last.year, last.term, last.id))
+
+
+def timed(fn, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark invoice listing queries on a seeded dataset')
+    parser.add_argument('--invoices', type=int, default=50000, help='Invoices to seed for the benchmark school')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median reported)')
+    parser.add_argument('--page-size', type=int, default=500, help='Page size for the keyset walk')
+    parser.add_argument('--skip-legacy-full', action='store_true', help='Skip the legacy whole-school listing (slow)')
+    parser.add_argument('--drop', action='store_true', help='Delete the benchmark school and exit')
+    args = parser.parse_args()
+
+    engine = get_engine()
+    SessionLocal = get_session_maker()
+
+    with SessionLocal() as db:
+        if args.drop:
+            drop_bench_school(db)
+            return
+
+        school = seed(db, args.invoices)
+        set_rls_context(db, school_id=str(school.id))
+
+        one_student = db.execute(
+            select(Invoice.student_id).where(Invoice.school_id == school.id).limit(1)
+        ).scalar()
+
+        scenarios = [
+            ("term listing (2025 T1)", [Invoice.school_id == school.id, Invoice.year == 2025, Invoice.term == 1]),
+            ("student invoices", [Invoice.school_id == school.id, Invoice.student_id == one_student]),
+        ]
+        if not args.skip_legacy_full:
+            scenarios.append(("whole school", [Invoice.school_id == school.id]))
+
+        print()
+        print("Invoice Listing Benchmark")
+        print("=" * 84)
+        print(f"{'scenario':<26}{'rows':>8}{'legacy q':>10}{'legacy ms':>11}{'new q':>7}{'new ms':>10}{'speedup':>10}")
+
+        for label, conditions in scenarios:
+            with QueryCounter(engine) as legacy_q:
+                legacy_ms, legacy_rows = timed(lambda: legacy_listing(db, conditions), 1)
+            with QueryCounter(engine) as new_q:
+                new_ms, new_rows = timed(lambda: stored_listing(db, conditions), args.repeat)
+
+            # Stored totals must agree with summing the payments
+            legacy_balances = sorted((str(inv.id), paid) for inv, paid, _ in legacy_rows)
+            new_balances = sorted((str(row[0].id), row[0].amount_paid) for row in new_rows)
+            assert legacy_balances == new_balances, f"{label}: balances differ"
+
+            print(
+                f"{label:<26}{len(new_rows):>8}{legacy_q.count:>10}{legacy_ms:>11.1f}"
+                f"{new_q.count // args.repeat:>7}{new_ms:>10.1f}{legacy_ms / new_ms if new_ms else 0:>9.1f}x"
+            )
+
+        print("-" * 84)
+        with QueryCounter(engine) as walk_q:
+            walk_ms, (total, pages) = timed(lambda: keyset_walk(db, [Invoice.school_id == school.id], args.page_size), 1)
+        print(
+            f"keyset walk: {total} invoices in {pages} pages of {args.page_size}, "
+            f"{walk_q.count} queries, {walk_ms:.1f}ms ({walk_ms / pages:.1f}ms/page)"
+        )
+        print("(legacy measured once; new is the median of --repeat runs)")
+
+
+if __name__ == '__main__':
+    main()
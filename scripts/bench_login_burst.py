@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# scripts/bench_login_burst.py - Chat latency while a burst of logins hits the same API worker
+"""
+Measures GET /api/chat/conversations latency on its own, then again while
+a burst of concurrent logins (bcrypt verification) runs, and reports
+p50/p95/max for both plus how the logins were answered (200, 401, 429).
+
+With password hashing on the event loop, chat requests queue behind every
+~250 ms bcrypt call; with the hashing pool their latency should stay flat
+and excess logins are shed with 429.
+
+    python scripts/bench_login_burst.py --base-url http://localhost:8000 \\
+        --token <JWT> --school-id <UUID> --email user@example.com --password '...' --logins 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.bench_mixed_latency import percentile
+
+CHAT_PATH = "/api/chat/conversations"
+
+
+async def probe_chat(client, headers, stop: asyncio.Event, interval: float):
+    """Hit the chat endpoint back to back until ``stop`` is set; returns latencies in ms"""
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(CHAT_PATH, headers=headers, params={"limit": 20})
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def login(client, email, password):
+    start = time.perf_counter()
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    return response.status_code, (time.perf_counter() - start) * 1000
+
+
+def report(label, samples):
+    print(f"{label:<22}{len(samples):>8}{percentile(samples, 50):>10.1f}{percentile(samples, 95):>10.1f}"
+          f"{max(samples, default=0):>10.1f}")
+
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {args.token}", "X-School-ID": args.school_id}
+    limits = httpx.Limits(max_connections=args.logins + 10, max_keepalive_connections=args.logins + 10)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=120.0) as client:
+        # Baseline: chat alone
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_chat(client, headers, stop, args.interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        baseline = await probe
+
+        # Chat while the login burst runs
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_chat(client, headers, stop, args.interval))
+        started = time.perf_counter()
+        results = await asyncio.gather(*[login(client, args.email, args.password) for _ in range(args.logins)])
+        burst_ms = (time.perf_counter() - started) * 1000
+        stop.set()
+        during = await probe
+
+    print()
+    print(f"Login Burst Benchmark ({args.logins} concurrent logins)")
+    print("=" * 60)
+    print(f"{'chat requests':<22}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    report("baseline", baseline)
+    report("during login burst", during)
+    print("-" * 60)
+    statuses = Counter(status for status, _ in results)
+    print(f"logins: {dict(sorted(statuses.items()))} in {burst_ms:.0f} ms")
+    report("login latency", [ms for status, ms in results if status == 200])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure chat latency during a burst of logins')
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--token', required=True, help='JWT used for the chat probe')
+    parser.add_argument('--school-id', required=True)
+    parser.add_argument('--email', required=True, help='Account the burst logs in as')
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--logins', type=int, default=100, help='Concurrent logins in the burst')
+    parser.add_argument('--baseline-seconds', type=float, default=5.0, help='How long to probe chat before the burst')
+    parser.add_argument('--interval', type=float, default=0.05, help='Pause between chat probe requests (s)')
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
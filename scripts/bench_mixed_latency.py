@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# scripts/bench_mixed_latency.py - Mixed-traffic latency benchmark for the hot API routers
+"""
+Fires concurrent, mixed read traffic at a running API (chat, students,
+invoices, payments, notifications) and reports p50/p95/p99 per endpoint.
+
+Run it against a deployment before and after a change to compare tail latency:
+
+    python scripts/bench_mixed_latency.py --base-url http://localhost:8000 \\
+        --token <JWT> --school-id <UUID> --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINTS = [
+    "/api/chat/conversations",
+    "/api/students/",
+    "/api/invoices/",
+    "/api/payments/student/{student_id}",
+    "/api/notifications/history",
+]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def pick_student_id(client):
+    """Grab one student id so the per-student endpoints have something to hit"""
+    response = await client.get("/api/students/", params={"limit": 1})
+    response.raise_for_status()
+    students = response.json().get("students", [])
+    return students[0]["id"] if students else None
+
+
+async def run_benchmark(args):
+    headers = {"Authorization": f"Bearer {args.token}", "X-School-ID": args.school_id}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=30.0) as client:
+        student_id = await pick_student_id(client)
+        paths = [p for p in ENDPOINTS if "{student_id}" not in p or student_id]
+        paths = [p.format(student_id=student_id) for p in paths]
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        queue = asyncio.Queue()
+        for _ in range(args.requests):
+            queue.put_nowait(random.choice(paths))
+
+        async def worker():
+            while True:
+                try:
+                    path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors[path] += 1
+                except httpx.HTTPError:
+                    errors[path] += 1
+                latencies[path].append((time.perf_counter() - started) * 1000)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - wall_start
+
+    print("Mixed Latency Benchmark")
+    print("=" * 84)
+    print(f"Target: {args.base_url}  concurrency={args.concurrency}  requests={args.requests}")
+    print(f"Wall time: {wall:.2f}s  throughput: {args.requests / wall:.1f} req/s")
+    print("-" * 84)
+    print(f"{'endpoint':<44}{'n':>6}{'err':>6}{'p50':>9}{'p95':>9}{'p99':>9}")
+
+    all_samples = []
+    for path in sorted(latencies):
+        samples = latencies[path]
+        all_samples.extend(samples)
+        print(
+            f"{path[:43]:<44}{len(samples):>6}{errors[path]:>6}"
+            f"{percentile(samples, 50):>9.1f}{percentile(samples, 95):>9.1f}{percentile(samples, 99):>9.1f}"
+        )
+
+    print("-" * 84)
+    print(
+        f"{'ALL':<44}{len(all_samples):>6}{sum(errors.values()):>6}"
+        f"{percentile(all_samples, 50):>9.1f}{percentile(all_samples, 95):>9.1f}{percentile(all_samples, 99):>9.1f}"
+    )
+    if all_samples:
+        print(f"mean={statistics.mean(all_samples):.1f}ms  (latencies in ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mixed-traffic p50/p95/p99 benchmark for the API')
+    parser.add_argument('--base-url', default='http://localhost:8000', help='API base URL')
+    parser.add_argument('--token', required=True, help='Bearer token for an authenticated user')
+    parser.add_argument('--school-id', required=True, help='School UUID sent as X-School-ID')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent in-flight requests')
+    parser.add_argument('--requests', type=int, default=2000, help='Total requests to send')
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# scripts/bench_school_overview.py - School overview benchmark: per-figure queries vs one aggregate vs cache
+"""
+Seeds a dedicated benchmark school (students over a few classes, an active
+year and term with most students enrolled, an invoice per student in mixed
+states and guardians for half of them) and times building the dashboard
+overview:
+
+  legacy     the previous handler: one query per figure (about ten round trips)
+  aggregate  app.services.school_overview.overview_statement, cache bypassed
+  cached     get_school_overview with the per-school cache warm
+
+Run against a disposable database (it writes rows under short_code BENCHOVW):
+
+    python scripts/bench_school_overview.py --students 10000 --requests 200
+    python scripts/bench_school_overview.py --drop        # remove the seeded school
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import delete, event, func, insert, select
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db import get_session_maker
+from app.models import School, Student, Invoice, User
+from app.models.academic import AcademicYear, AcademicTerm
+from app.models.class_model import Class
+from app.models.class_stream import ClassStream  # noqa: F401 - needed to configure Class.streams
+from app.models.enrollment import Enrollment
+from app.models.guardian import Guardian, StudentGuardian
+from app.services.school_overview import (
+    get_school_overview, invalidate_school_overview, overview_statement
+)
+from scripts.bench_mixed_latency import percentile
+
+SHORT_CODE = "BENCHOVW"
+TERM, YEAR = 1, 2026
+CLASSES = 8
+CHUNK = 5000
+INVOICE_STATES = ("DRAFT", "ISSUED", "PARTIAL", "PAID")
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def get_bench_school(db):
+    return db.execute(select(School).where(School.short_code == SHORT_CODE)).scalar_one_or_none()
+
+
+def drop_bench_school(db):
+    school = get_bench_school(db)
+    if not school:
+        print("No benchmark school to drop")
+        return
+    for model in (StudentGuardian, Guardian, Invoice, Enrollment, Student, AcademicTerm, AcademicYear, Class):
+        db.execute(delete(model).where(model.school_id == school.id))
+    db.delete(school)
+    db.commit()
+    print(f"Dropped benchmark school {school.id}")
+
+
+def insert_chunked(db, model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.execute(insert(model), rows[start:start + CHUNK])
+
+
+def seed(db, student_count):
+    """Create the benchmark school and its data; reuse it if already seeded"""
+    school = get_bench_school(db)
+    if school:
+        existing = db.execute(select(func.count(Student.id)).where(Student.school_id == school.id)).scalar()
+        if existing == student_count:
+            print(f"Reusing benchmark school {school.id} ({existing} students)")
+            return school
+        drop_bench_school(db)
+
+    owner_id = db.execute(select(User.id).order_by(User.created_at).limit(1)).scalar()
+    if owner_id is None:
+        sys.exit("No users found; create one first (the benchmark school needs created_by)")
+
+    school = School(
+        name="Overview Benchmark School", short_code=SHORT_CODE,
+        academic_year_start=date(YEAR, 1, 1), created_by=owner_id,
+    )
+    db.add(school)
+    db.flush()
+
+    classes = [Class(school_id=school.id, name=f"Grade {i + 1}", level=f"Grade {i + 1}", academic_year=YEAR)
+               for i in range(CLASSES)]
+    db.add_all(classes)
+    year = AcademicYear(school_id=school.id, year=YEAR, title=f"Academic Year {YEAR}", state="ACTIVE")
+    db.add(year)
+    db.flush()
+    term = AcademicTerm(school_id=school.id, academic_year_id=year.id, term=TERM, title=f"Term {TERM}", state="ACTIVE")
+    db.add(term)
+    db.flush()
+
+    now = datetime.utcnow()
+    students = [
+        {
+            "id": uuid.uuid4(), "school_id": school.id, "admission_no": f"{SHORT_CODE}-{i:06d}",
+            "first_name": f"Student{i}", "last_name": "Bench", "status": "ACTIVE",
+            "class_id": classes[i % CLASSES].id, "created_at": now, "updated_at": now,
+        }
+        for i in range(student_count)
+    ]
+    insert_chunked(db, Student, students)
+
+    # Nine in ten students enrolled this term
+    insert_chunked(db, Enrollment, [
+        {
+            "id": uuid.uuid4(), "school_id": school.id, "student_id": s["id"], "class_id": s["class_id"],
+            "term_id": term.id, "status": "ENROLLED", "enrolled_date": date.today(),
+            "invoice_generated": True, "created_at": now, "updated_at": now,
+        }
+        for i, s in enumerate(students) if i % 10
+    ])
+
+    invoices = []
+    for i, s in enumerate(students):
+        state = INVOICE_STATES[i % len(INVOICE_STATES)]
+        paid = {"PAID": Decimal(20000), "PARTIAL": Decimal(5000)}.get(state, Decimal(0))
+        invoices.append({
+            "id": uuid.uuid4(), "school_id": school.id, "student_id": s["id"], "term": TERM, "year": YEAR,
+            "total": Decimal(20000), "status": state, "amount_paid": paid, "balance": Decimal(20000) - paid,
+            "created_at": now, "updated_at": now,
+        })
+    insert_chunked(db, Invoice, invoices)
+
+    # One guardian per pair of siblings
+    guardians, links = [], []
+    for i in range(0, student_count, 2):
+        guardian_id = uuid.uuid4()
+        guardians.append({
+            "id": guardian_id, "school_id": school.id, "first_name": f"Parent{i}", "last_name": "Bench",
+            "created_at": now, "updated_at": now,
+        })
+        links += [
+            {"id": uuid.uuid4(), "school_id": school.id, "student_id": s["id"], "guardian_id": guardian_id,
+             "created_at": now, "updated_at": now}
+            for s in students[i:i + 2]
+        ]
+    insert_chunked(db, Guardian, guardians)
+    insert_chunked(db, StudentGuardian, links)
+    db.commit()
+
+    print(f"Seeded school {school.id}: {student_count} students, {len(guardians)} guardians, {len(invoices)} invoices")
+    return school
+
+
+def legacy_overview(db, school_id):
+    """The previous handler's queries, kept here for comparison (active year matched on state)"""
+    school = db.get(School, school_id)
+    students = db.execute(select(func.count(Student.id)).where(Student.school_id == school_id)).scalar() or 0
+    classes = db.execute(select(func.count(Class.id)).where(Class.school_id == school_id)).scalar() or 0
+    guardians = db.execute(
+        select(func.count(func.distinct(Guardian.id)))
+        .join(StudentGuardian, Guardian.id == StudentGuardian.guardian_id)
+        .join(Student, StudentGuardian.student_id == Student.id)
+        .where(Student.school_id == school_id)
+    ).scalar() or 0
+    year = db.execute(
+        select(AcademicYear).where(AcademicYear.school_id == school_id, AcademicYear.state == "ACTIVE")
+    ).scalar_one_or_none()
+    term = db.execute(
+        select(AcademicTerm).where(AcademicTerm.academic_year_id == year.id, AcademicTerm.state == "ACTIVE")
+    ).scalar_one_or_none() if year else None
+    enrolled = db.execute(
+        select(func.count(func.distinct(Enrollment.student_id))).where(Enrollment.term_id == term.id)
+    ).scalar() or 0 if term else 0
+    counts = [
+        db.execute(select(func.count(Invoice.id)).where(Invoice.school_id == school_id, *conditions)).scalar() or 0
+        for conditions in (
+            (),
+            (Invoice.status.in_(["ISSUED", "PARTIAL"]),),
+            (Invoice.status == "PAID",),
+            (Invoice.status.in_(["ISSUED", "PARTIAL"]),),
+        )
+    ]
+    collected = db.execute(select(func.sum(Invoice.amount_paid)).where(Invoice.school_id == school_id)).scalar() or 0
+    return school.name, students, classes, guardians, enrolled, counts, collected
+
+
+def timed(db, label, fn, requests):
+    engine = db.get_bind()
+    samples = []
+    with QueryCounter(engine) as counter:
+        for i in range(requests + 1):
+            db.rollback()  # Fresh snapshot each time, like a new request
+            start = time.perf_counter()
+            fn()
+            elapsed = (time.perf_counter() - start) * 1000
+            if i:
+                samples.append(elapsed)  # First call is warm-up
+    queries = counter.count / (requests + 1)
+    print(f"{label:<24}{queries:>10.1f}{percentile(samples, 50):>12.2f}{percentile(samples, 95):>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the school overview on a seeded school')
+    parser.add_argument('--students', type=int, default=10000, help='Students to seed for the benchmark school')
+    parser.add_argument('--requests', type=int, default=200, help='Overview builds per scenario')
+    parser.add_argument('--drop', action='store_true', help='Delete the benchmark school and exit')
+    args = parser.parse_args()
+
+    SessionLocal = get_session_maker()
+    with SessionLocal() as db:
+        if args.drop:
+            drop_bench_school(db)
+            return
+
+        school_id = seed(db, args.students).id
+
+        def uncached():
+            invalidate_school_overview(school_id)
+            get_school_overview(db, school_id)
+
+        expected = db.execute(overview_statement(school_id)).one()
+        legacy = legacy_overview(db, school_id)
+        assert (expected.students_total, expected.guardians, expected.students_enrolled) == legacy[1:2] + legacy[3:5]
+        assert (expected.invoices_total, expected.invoices_pending, expected.invoices_paid) == tuple(legacy[5][:3])
+
+        print()
+        print(f"School Overview Benchmark ({args.students} students, {args.requests} requests per scenario)")
+        print("=" * 58)
+        print(f"{'scenario':<24}{'queries':>10}{'p50 ms':>12}{'p95 ms':>12}")
+        timed(db, "legacy (per figure)", lambda: legacy_overview(db, school_id), args.requests)
+        timed(db, "aggregate (uncached)", uncached, args.requests)
+        timed(db, "cached", lambda: get_school_overview(db, school_id), args.requests)
+        print("-" * 58)
+
+
+if __name__ == '__main__':
+    main()
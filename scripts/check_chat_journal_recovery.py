@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# scripts/check_chat_journal_recovery.py - Crash-safety check for journaled chat persistence
+"""
+Verifies that chat turns acknowledged in CHAT_PERSISTENCE_MODE=journaled
+survive a process crash:
+
+1. A child process records --turns chat turns through the write-behind
+   buffer (flush interval far in the future) and dies with os._exit()
+   before anything is flushed.
+2. The database must not have the messages yet; the journal must.
+3. A torn (half-written) line is appended to the journal, and a copy of
+   the segment is kept to replay again later (a crash after the DB commit
+   but before the segment was deleted).
+4. A fresh buffer replays the journal: every message must be inserted
+   and the conversation's message_count must match.
+5. Replaying the copy must change nothing (idempotent).
+
+Uses a throwaway conversation (deleted afterwards) in DATABASE_URL:
+
+    python scripts/check_chat_journal_recovery.py --turns 50
+"""
+import argparse
+import asyncio
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select
+
+from app.core.db import db_manager
+from app.models.chat import ChatConversation, ChatMessage, MessageType
+from app.models.class_stream import ClassStream  # noqa: F401 - needed to configure Class.streams
+from app.services.chat_writer import ChatWriteBuffer
+
+
+def journaled_writer(journal_dir: str) -> ChatWriteBuffer:
+    writer = ChatWriteBuffer()
+    writer.mode = "journaled"
+    writer.journal_dir = journal_dir
+    writer.flush_seconds = 3600.0
+    writer.batch_size = 1_000_000
+    return writer
+
+
+async def crash_after_recording(journal_dir: str, conversation_id: uuid.UUID, turns: int):
+    """Child process: record turns, then die without flushing or closing"""
+    writer = journaled_writer(journal_dir)
+    await writer.start()
+    for i in range(turns):
+        now = datetime.now(timezone.utc)
+        messages = [
+            ChatMessage(
+                conversation_id=conversation_id,
+                user_id=uuid.uuid4(),
+                school_id=uuid.uuid4(),
+                message_type=message_type,
+                content=f"turn {i} {message_type.value}",
+                context_data={"turn": i},
+                response_data={"check": True},
+                created_at=now
+            )
+            for message_type in (MessageType.USER, MessageType.ASSISTANT)
+        ]
+        await writer.record_turn(messages)
+    print(f"child: recorded {turns} turns, {writer.stats()['pending']} messages pending; crashing", flush=True)
+    os._exit(1)
+
+
+async def counts(conversation_id: uuid.UUID):
+    async for session in db_manager.get_async_session():
+        stored = (await session.execute(
+            select(func.count()).select_from(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+        )).scalar()
+        message_count = (await session.execute(
+            select(ChatConversation.message_count).where(ChatConversation.id == conversation_id)
+        )).scalar()
+        return stored, message_count
+
+
+async def run_check(args):
+    journal_dir = tempfile.mkdtemp(prefix="chat-journal-")
+    conversation_id = uuid.uuid4()
+    failures = []
+
+    def check(label, ok):
+        print(f"  [{'ok' if ok else 'FAIL'}] {label}")
+        if not ok:
+            failures.append(label)
+
+    async for session in db_manager.get_async_session():
+        session.add(ChatConversation(
+            id=conversation_id,
+            user_id=uuid.uuid4(),
+            school_id=uuid.uuid4(),
+            title="journal recovery check",
+            first_message="-",
+            message_count=0,
+            last_activity=datetime.now(timezone.utc)
+        ))
+        await session.commit()
+
+    try:
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", journal_dir, str(conversation_id), str(args.turns)],
+            capture_output=True, text=True
+        )
+        print(child.stdout.strip() or child.stderr.strip())
+
+        expected = args.turns * 2
+        stored, message_count = await counts(conversation_id)
+        segments = glob.glob(os.path.join(journal_dir, "*.jsonl"))
+        check("child exited without flushing", child.returncode == 1 and stored == 0)
+        check(f"journal holds the turns ({len(segments)} segment)", len(segments) == 1)
+
+        with open(segments[0], "a") as handle:
+            handle.write('[{"id":"torn')
+        replay_copy = tempfile.mkdtemp(prefix="chat-journal-copy-")
+        shutil.copy(segments[0], replay_copy)
+
+        writer = journaled_writer(journal_dir)
+        await writer.replay_journal()
+        stored, message_count = await counts(conversation_id)
+        check(f"replay inserted {stored}/{expected} messages", stored == expected)
+        check(f"message_count is {message_count}", message_count == expected)
+        check("replayed segment deleted", not glob.glob(os.path.join(journal_dir, "*.jsonl")))
+
+        writer = journaled_writer(replay_copy)
+        await writer.replay_journal()
+        stored, message_count = await counts(conversation_id)
+        check("second replay is a no-op", stored == expected and message_count == expected)
+        shutil.rmtree(replay_copy, ignore_errors=True)
+    finally:
+        async for session in db_manager.get_async_session():
+            await session.execute(delete(ChatConversation).where(ChatConversation.id == conversation_id))
+            await session.commit()
+        shutil.rmtree(journal_dir, ignore_errors=True)
+        await db_manager.close_async()
+
+    print("PASSED" if not failures else f"FAILED: {', '.join(failures)}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that journaled chat turns survive a crash')
+    parser.add_argument('--turns', type=int, default=50, help='Chat turns recorded before the crash')
+    parser.add_argument('--child', nargs=3, metavar=('JOURNAL_DIR', 'CONVERSATION_ID', 'TURNS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        journal_dir, conversation_id, turns = args.child
+        asyncio.run(crash_after_recording(journal_dir, uuid.UUID(conversation_id), int(turns)))
+        return
+
+    sys.exit(0 if asyncio.run(run_check(args)) else 1)
+
+
+if __name__ == '__main__':
+    main()
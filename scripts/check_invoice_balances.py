@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# scripts/check_invoice_balances.py - Verify (and optionally repair) denormalized invoice totals
+"""
+Invoices carry amount_paid and balance columns that record_payment keeps in
+step with the payments table. This recomputes both from payments and
+reports any invoice where the stored values drifted:
+
+    python scripts/check_invoice_balances.py                 # report, exit 1 on drift
+    python scripts/check_invoice_balances.py --school-id <UUID>
+    python scripts/check_invoice_balances.py --fix           # rewrite drifted rows
+
+Expected values: amount_paid = SUM(payments.amount);
+balance = max(total - amount_paid, 0), or 0 for CANCELLED invoices.
+"""
+import argparse
+import os
+import sys
+from uuid import UUID
+
+from sqlalchemy import text
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db import get_session_maker
+
+EXPECTED_SQL = """
+    SELECT i.id, i.school_id, i.status, i.total,
+           i.amount_paid, i.balance,
+           COALESCE(p.paid, 0) AS expected_paid,
+           CASE WHEN i.status = 'CANCELLED' THEN 0
+                ELSE GREATEST(i.total - COALESCE(p.paid, 0), 0)
+           END AS expected_balance
+    FROM invoices i
+    LEFT JOIN (
+        SELECT invoice_id, SUM(amount) AS paid FROM payments GROUP BY invoice_id
+    ) p ON p.invoice_id = i.id
+    WHERE (CAST(:school_id AS uuid) IS NULL OR i.school_id = CAST(:school_id AS uuid))
+"""
+
+DRIFT_SQL = f"""
+    SELECT * FROM ({EXPECTED_SQL}) e
+    WHERE e.amount_paid <> e.expected_paid OR e.balance <> e.expected_balance
+    ORDER BY e.school_id, e.id
+"""
+
+# Same row lock record_payment takes, so no payment lands mid-repair
+LOCK_SQL = "SELECT id FROM invoices WHERE id = ANY(:ids) ORDER BY id FOR UPDATE"
+
+# Runs after LOCK_SQL, so (READ COMMITTED) it recomputes from a fresh snapshot
+FIX_SQL = f"""
+    UPDATE invoices AS i
+    SET amount_paid = e.expected_paid, balance = e.expected_balance
+    FROM ({EXPECTED_SQL}) e
+    WHERE e.id = i.id
+      AND i.id = ANY(:ids)
+      AND (e.amount_paid <> e.expected_paid OR e.balance <> e.expected_balance)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check invoice amount_paid/balance against payments')
+    parser.add_argument('--school-id', help='Only check one school')
+    parser.add_argument('--fix', action='store_true', help='Rewrite drifted invoices with the expected values')
+    parser.add_argument('--show', type=int, default=20, help='How many drifted invoices to print')
+    args = parser.parse_args()
+
+    school_id = str(UUID(args.school_id)) if args.school_id else None
+
+    print("Invoice Balance Consistency Check")
+    print("=" * 84)
+
+    SessionLocal = get_session_maker()
+    with SessionLocal() as db:
+        checked = db.execute(
+            text(f"SELECT COUNT(*) FROM ({EXPECTED_SQL}) e"), {"school_id": school_id}
+        ).scalar()
+        drifted = db.execute(text(DRIFT_SQL), {"school_id": school_id}).all()
+
+        print(f"Invoices checked: {checked}")
+        print(f"Drifted: {len(drifted)}")
+
+        if drifted:
+            print("-" * 84)
+            print(f"{'invoice':<38}{'status':<11}{'paid':>11}{'expected':>11}{'balance':>11}{'expected':>11}")
+            for row in drifted[:args.show]:
+                print(
+                    f"{str(row.id):<38}{row.status:<11}{row.amount_paid:>11}{row.expected_paid:>11}"
+                    f"{row.balance:>11}{row.expected_balance:>11}"
+                )
+            if len(drifted) > args.show:
+                print(f"... and {len(drifted) - args.show} more")
+
+        if drifted and args.fix:
+            ids = [row.id for row in drifted]
+            db.execute(text(LOCK_SQL), {"ids": ids})
+            fixed = db.execute(text(FIX_SQL), {"school_id": school_id, "ids": ids}).rowcount
+            db.commit()
+            print("-" * 84)
+            print(f"✅ Fixed {fixed} invoices")
+            return
+
+    if drifted:
+        print("❌ Stored balances differ from payments; re-run with --fix to repair")
+        sys.exit(1)
+    print("✅ All invoice balances match payments")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# scripts/smtp_sink.py - Local debugging SMTP server for exercising the email job queue
+"""
+Accepts mail on a local port without TLS or authentication, discards it,
+and prints how many connections and messages it saw. Point the API at it
+to exercise campaigns end to end:
+
+    python scripts/smtp_sink.py --port 1025 --delay-ms 50
+    SMTP_HOST=127.0.0.1 SMTP_PORT=1025 SMTP_USE_TLS=false SMTP_FROM_EMAIL=school@example.com uvicorn app.main:app
+
+With pooled SMTP connections, "connections" should stay near SMTP_POOL_SIZE
+however many messages are sent. --reject makes RCPT fail for addresses
+containing that text, to test per-recipient FAILED statuses; --show prints
+each message's envelope.
+"""
+import argparse
+import asyncio
+import time
+
+
+class SinkStats:
+    def __init__(self):
+        self.connections = 0
+        self.open = 0
+        self.messages = 0
+        self.rejected = 0
+        self.started = time.monotonic()
+        self.first_message = None
+        self.last_message = None
+
+    def line(self) -> str:
+        rate = ""
+        if self.first_message and self.last_message and self.last_message > self.first_message:
+            rate = f", {self.messages / (self.last_message - self.first_message):.1f} msg/s"
+        return (
+            f"connections={self.connections} open={self.open} "
+            f"messages={self.messages} rejected={self.rejected}{rate}"
+        )
+
+
+async def handle(reader, writer, stats: SinkStats, args):
+    stats.connections += 1
+    stats.open += 1
+
+    async def reply(text: str):
+        writer.write(f"{text}\r\n".encode())
+        await writer.drain()
+
+    mail_from, rcpts = None, []
+    try:
+        await reply("220 smtp-sink ready")
+        while True:
+            raw = await reader.readline()
+            if not raw:
+                break
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            verb = line[:4].upper()
+
+            if verb in ("EHLO", "HELO"):
+                await reply("250-smtp-sink\r\n250-8BITMIME\r\n250 SMTPUTF8" if verb == "EHLO" else "250 smtp-sink")
+            elif verb == "MAIL":
+                mail_from, rcpts = line[10:].strip(), []
+                await reply("250 OK")
+            elif verb == "RCPT":
+                rcpt = line[8:].strip()
+                if args.reject and args.reject in rcpt:
+                    stats.rejected += 1
+                    await reply("550 Mailbox unavailable")
+                else:
+                    rcpts.append(rcpt)
+                    await reply("250 OK")
+            elif verb == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                    pass
+                if args.delay_ms:
+                    await asyncio.sleep(args.delay_ms / 1000)
+                stats.messages += 1
+                stats.last_message = time.monotonic()
+                stats.first_message = stats.first_message or stats.last_message
+                if args.show:
+                    print(f"  {mail_from} -> {', '.join(rcpts)}")
+                await reply("250 OK queued")
+            elif verb == "RSET":
+                mail_from, rcpts = None, []
+                await reply("250 OK")
+            elif verb == "NOOP":
+                await reply("250 OK")
+            elif verb == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+    except ConnectionError:
+        pass
+    finally:
+        stats.open -= 1
+        writer.close()
+
+
+async def report(stats: SinkStats, every: float):
+    last = None
+    while True:
+        await asyncio.sleep(every)
+        line = stats.line()
+        if line != last:
+            print(line, flush=True)
+            last = line
+
+
+async def serve(args):
+    stats = SinkStats()
+    server = await asyncio.start_server(lambda r, w: handle(r, w, stats, args), args.host, args.port)
+    print(f"SMTP sink listening on {args.host}:{args.port} (delay {args.delay_ms}ms)", flush=True)
+    asyncio.create_task(report(stats, args.report_every))
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local SMTP sink for testing email campaigns')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--delay-ms', type=int, default=0, help='Simulated per-message server latency')
+    parser.add_argument('--reject', help='Reject recipients whose address contains this text')
+    parser.add_argument('--report-every', type=float, default=2.0, help='Seconds between stats lines')
+    parser.add_argument('--show', action='store_true', help='Print every message envelope')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()